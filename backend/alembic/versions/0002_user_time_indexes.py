@@ -0,0 +1,38 @@
+"""composite indexes for per-user, time-ordered queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 07:25:03.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns); must match __table_args__ on the models
+INDEXES = [
+    ('ix_routes_user_id_created_at', 'routes', ['user_id', 'created_at']),
+    ('ix_route_events_route_id_timestamp', 'route_events', ['route_id', 'timestamp']),
+    ('ix_goals_user_id_created_at', 'goals', ['user_id', 'created_at']),
+    ('ix_goal_progress_logs_goal_id_logged_at', 'goal_progress_logs', ['goal_id', 'logged_at']),
+    ('ix_ai_conversations_user_id_updated_at', 'ai_conversations', ['user_id', 'updated_at']),
+    ('ix_ai_messages_conversation_id_created_at', 'ai_messages', ['conversation_id', 'created_at']),
+    ('ix_user_achievements_user_id_achievement_id', 'user_achievements', ['user_id', 'achievement_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
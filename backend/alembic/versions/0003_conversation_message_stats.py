@@ -0,0 +1,39 @@
+"""denormalized message_count / last_message_at on ai_conversations
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 08:02:41.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('ai_conversations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill from the existing messages
+    op.execute(
+        "UPDATE ai_conversations SET "
+        "message_count = (SELECT count(*) FROM ai_messages "
+        "WHERE ai_messages.conversation_id = ai_conversations.id), "
+        "last_message_at = (SELECT max(ai_messages.created_at) FROM ai_messages "
+        "WHERE ai_messages.conversation_id = ai_conversations.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('ai_conversations', schema=None) as batch_op:
+        batch_op.drop_column('last_message_at')
+        batch_op.drop_column('message_count')
@@ -1,22 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List
+from sqlalchemy import delete, select, func, update
+from sqlalchemy.orm import selectinload
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import datetime
+import asyncio
+import importlib.util
 import json
+import logging
 import os
+import re
+import time
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.pagination import keyset_paginate, page_items
+from app.core.responses import ModelResponse
 from app.models.user import User
 from app.models.ai_chat import AIConversation, AIMessage, MessageType, MessageSender
 from app.schemas.ai_chat import (
     ChatRequest, ChatResponse, AIConversation as AIConversationSchema,
     AIMessage as AIMessageSchema, ConversationSummary
 )
+from app.schemas.common import BulkDeleteRequest, BulkDeleteResponse
+from app.services.chat_context import ChatContext, load_chat_context, prompt_messages
+from app.services.intents import ChatIntent, IntentResult, classify_intent
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+ASSISTANT_PROMPT = (
+    "You are PathFinder AI, a navigation assistant. Help users plan routes, track "
+    "their wellness goals and stay safe and comfortable on their journeys. Keep answers short."
+)
+
+_openai_client = None
+
 
 class FeedbackSchema(BaseModel):
     rating: int = 0
@@ -32,50 +54,47 @@ async def chat_with_ai(
     db: AsyncSession = Depends(get_db)
 ):
     """Chat with AI assistant"""
-    # Get or create conversation
-    conversation_id = chat_request.conversation_id
-    if not conversation_id:
-        # Create new conversation
-        conversation = AIConversation(
-            user_id=current_user.id,
-            title=chat_request.message[:50] + "..." if len(chat_request.message) > 50 else chat_request.message,
-            context_data=chat_request.context
-        )
-        db.add(conversation)
-        await db.commit()
-        await db.refresh(conversation)
-        conversation_id = conversation.id
+    # Classify once; the reply, suggestions and quick actions all use it
+    intent = classify_intent(chat_request.message)
+    context = await load_prompt_context(db, chat_request, current_user)
     
-    # Save user message
+    # Generate AI response first, timing it and counting the chunks it arrives
+    # in, so the write transaction below stays short
+    started = time.perf_counter()
+    chunks = [
+        chunk async for chunk in stream_ai_response(chat_request.message, current_user, intent.intent, context)
+    ]
+    processing_time = time.perf_counter() - started
+    ai_response_content = "".join(chunks)
+    
+    # Insert the conversation (if new) and both messages in one flush; ids and
+    # created_at come back via RETURNING where the database supports it
+    conversation = conversation_link(chat_request, current_user)
     user_message = AIMessage(
-        conversation_id=int(conversation_id) if conversation_id is not None else 0,
+        **conversation,
         sender=MessageSender.USER,
         content=chat_request.message,
         message_metadata=chat_request.context or {}
     )
-    db.add(user_message)
-    
-    # Generate AI response (mock for now)
-    # TODO: Integrate with real AI model or API here
-    ai_response_content = generate_ai_response(chat_request.message, current_user)
-    
-    # Save AI message
     ai_message = AIMessage(
-        conversation_id=int(conversation_id) if conversation_id is not None else 0,
+        **conversation,
         sender=MessageSender.AI,
         content=ai_response_content,
         message_type=MessageType.TEXT,
-        tokens_used=len(ai_response_content.split()),  # Simple token estimation
-        processing_time=0.5  # Mock processing time
+        tokens_used=len(chunks),
+        processing_time=processing_time,
+        message_metadata=intent_metadata(intent)
     )
-    db.add(ai_message)
+    db.add_all([user_message, ai_message])
+    await db.flush()
+    conversation_id = ai_message.conversation_id
     
+    await record_new_messages(db, conversation_id, current_user.id, 2, ai_message.created_at, context)
     await db.commit()
-    await db.refresh(ai_message)
     
     # Generate suggestions and quick actions
-    suggestions = generate_suggestions(chat_request.message)
-    quick_actions = generate_quick_actions(chat_request.message)
+    suggestions = generate_suggestions(intent.intent)
+    quick_actions = generate_quick_actions(intent.intent)
     
     return ChatResponse(
         message=ai_message,
@@ -85,49 +104,150 @@ async def chat_with_ai(
     )
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_ai(
+    chat_request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Chat with AI assistant, streaming the reply as Server-Sent Events: `start`
+    once the user message is saved, a `token` per chunk of the reply, then
+    `done` with the saved AI message (same body as POST /chat) or `error`
+    """
+    intent = classify_intent(chat_request.message)
+    # Read before the new message is added, which goes to the LLM on its own
+    context = await load_prompt_context(db, chat_request, current_user)
+    
+    # The user message is saved before streaming, so it survives a dropped stream
+    user_message = AIMessage(
+        **conversation_link(chat_request, current_user),
+        sender=MessageSender.USER,
+        content=chat_request.message,
+        message_metadata=chat_request.context or {}
+    )
+    db.add(user_message)
+    await db.flush()
+    conversation_id = user_message.conversation_id
+    await record_new_messages(db, conversation_id, current_user.id, 1, user_message.created_at, context)
+    await db.commit()
+    user_message_id = user_message.id
+    bind = db.bind
+    
+    async def events() -> AsyncIterator[str]:
+        yield sse_event("start", {"conversation_id": conversation_id, "user_message_id": user_message_id})
+        
+        chunks: List[str] = []
+        started = time.perf_counter()
+        first_token_at = None
+        try:
+            async for chunk in stream_ai_response(chat_request.message, current_user, intent.intent, context):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                chunks.append(chunk)
+                yield sse_event("token", {"content": chunk})
+        except Exception as e:
+            logger.error(f"AI reply failed for conversation {conversation_id}: {e}")
+            yield sse_event("error", {"detail": "The assistant could not finish its reply"})
+            return
+        processing_time = time.perf_counter() - started
+        
+        content = "".join(chunks)
+        if not content.strip():
+            yield sse_event("error", {"detail": "The assistant returned an empty reply"})
+            return
+        
+        # Persist the reply once, after the last token; the request's session
+        # belongs to the endpoint, so the stream writes through its own
+        async with AsyncSession(bind=bind, expire_on_commit=False) as session:
+            ai_message = AIMessage(
+                conversation_id=conversation_id,
+                sender=MessageSender.AI,
+                content=content,
+                message_type=MessageType.TEXT,
+                tokens_used=len(chunks),
+                processing_time=processing_time,
+                message_metadata={
+                    **intent_metadata(intent),
+                    "streamed": True,
+                    "time_to_first_token": first_token_at - started
+                }
+            )
+            session.add(ai_message)
+            await session.flush()
+            await record_new_messages(session, conversation_id, current_user.id, 1, ai_message.created_at)
+            await session.commit()
+            
+            done = ChatResponse(
+                message=ai_message,
+                conversation_id=conversation_id,
+                suggestions=generate_suggestions(intent.intent),
+                quick_actions=generate_quick_actions(intent.intent)
+            )
+        yield sse_event("done", done.model_dump(mode="json"))
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/conversations", response_model=List[ConversationSummary])
 async def get_conversations(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-    limit: int = 20,
-    offset: int = 0
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page")
 ):
-    """Get user's conversation history"""
-    result = await db.execute(
-        select(AIConversation)
-        .where(AIConversation.user_id == current_user.id)
-        .order_by(AIConversation.updated_at.desc())
-        .limit(limit)
-        .offset(offset)
-    )
-    conversations = result.scalars().all()
-    
-    summaries = []
-    for conv in conversations:
-        # Get message count
-        msg_count_result = await db.execute(
-            select(func.count(AIMessage.id)).where(AIMessage.conversation_id == conv.id)
+    """Get user's conversation history, most recently updated first (keyset paginated)"""
+    if settings.AI_CONVERSATION_DENORMALIZED_COUNTS:
+        message_count = AIConversation.message_count
+        last_message_at = AIConversation.last_message_at
+        query = select(AIConversation, message_count, last_message_at)
+    else:
+        # Aggregate the user's message stats in one grouped subquery
+        message_stats = (
+            select(
+                AIMessage.conversation_id,
+                func.count(AIMessage.id).label("message_count"),
+                func.max(AIMessage.created_at).label("last_message_at")
+            )
+            .where(AIMessage.conversation_id.in_(
+                select(AIConversation.id).where(AIConversation.user_id == current_user.id)
+            ))
+            .group_by(AIMessage.conversation_id)
+            .subquery()
         )
-        message_count = msg_count_result.scalar() or 0
-        
-        # Get last message time
-        last_msg_result = await db.execute(
-            select(AIMessage.created_at)
-            .where(AIMessage.conversation_id == conv.id)
-            .order_by(AIMessage.created_at.desc())
-            .limit(1)
+        message_count = func.coalesce(message_stats.c.message_count, 0)
+        last_message_at = message_stats.c.last_message_at
+        query = (
+            select(AIConversation, message_count, last_message_at)
+            .outerjoin(message_stats, message_stats.c.conversation_id == AIConversation.id)
         )
-        last_message_at = last_msg_result.scalar()
-        
-        summaries.append(ConversationSummary(
+    
+    query = keyset_paginate(
+        query.where(AIConversation.user_id == current_user.id),
+        AIConversation.updated_at, AIConversation.id, cursor, limit, db.bind.dialect.name
+    )
+    if cursor is None and offset:
+        query = query.offset(offset)
+    
+    result = await db.execute(query)
+    rows, _ = page_items(result.all(), limit, lambda row: (row[0].updated_at, row[0].id), response)
+    
+    return [
+        ConversationSummary(
             id=conv.id,  # type: ignore
             title=conv.title,  # type: ignore
-            message_count=message_count,
-            last_message_at=last_message_at,
+            message_count=count or 0,
+            last_message_at=last_at,
             is_active=conv.is_active  # type: ignore
-        ))
-    
-    return summaries
+        )
+        for conv, count, last_at in rows
+    ]
 
 
 @router.get("/conversations/{conversation_id}", response_model=AIConversationSchema)
@@ -138,7 +258,9 @@ async def get_conversation(
 ):
     """Get a specific conversation with all messages"""
     result = await db.execute(
-        select(AIConversation).where(
+        select(AIConversation)
+        .options(selectinload(AIConversation.messages))
+        .where(
             AIConversation.id == conversation_id,
             AIConversation.user_id == current_user.id
         )
@@ -151,7 +273,10 @@ async def get_conversation(
             detail="Conversation not found"
         )
     
-    return conversation
+    # Validate the history once here and serialize it directly
+    history = AIConversationSchema.model_validate(conversation)
+    history.messages.sort(key=lambda message: (message.created_at, message.id))
+    return ModelResponse(history)
 
 
 @router.delete("/conversations/{conversation_id}")
@@ -160,34 +285,33 @@ async def delete_conversation(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Delete a conversation"""
-    result = await db.execute(
-        select(AIConversation).where(
-            AIConversation.id == conversation_id,
-            AIConversation.user_id == current_user.id
-        )
-    )
-    conversation = result.scalar_one_or_none()
-    
-    if not conversation:
+    """Delete a conversation and its messages"""
+    if not await delete_user_conversations(db, current_user.id, [conversation_id]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
-    
-    # Delete all messages using ORM
-    messages_result = await db.execute(select(AIMessage).where(AIMessage.conversation_id == conversation_id))
-    messages = messages_result.scalars().all()
-    for msg in messages:
-        await db.delete(msg)
-    
-    # Delete conversation
-    await db.delete(conversation)
     await db.commit()
     
     return {"message": "Conversation deleted successfully"}
 
 
+@router.post("/conversations/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete_conversations(
+    request: BulkDeleteRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete several conversations and their messages in one transaction"""
+    deleted = await delete_user_conversations(db, current_user.id, request.ids)
+    await db.commit()
+    
+    return BulkDeleteResponse(
+        deleted=deleted,
+        not_found=[conversation_id for conversation_id in dict.fromkeys(request.ids) if conversation_id not in deleted]
+    )
+
+
 @router.post("/conversations/{conversation_id}/feedback")
 async def provide_feedback(
     conversation_id: int,
@@ -218,86 +342,225 @@ async def provide_feedback(
 
 
 # Helper functions for AI responses
-def generate_ai_response(user_message: str, user: User) -> str:
-    """Generate AI response based on user message"""
-    message_lower = user_message.lower()
-    
-    if "route" in message_lower or "directions" in message_lower:
-        return "I can help you find the best route! What's your destination? I'll consider your preferences for scenic routes and safety."
-    
-    elif "goal" in message_lower or "progress" in message_lower:
-        return "Great! I can help you track your goals. Would you like to see your current progress or set a new goal?"
-    
-    elif "weather" in message_lower:
-        return "I can check the weather for your route. This will help ensure you have the best experience on your journey."
-    
-    elif "safety" in message_lower or "secure" in message_lower:
-        return "Safety is my top priority! I'll always recommend the safest routes and provide real-time safety updates."
-    
-    elif "wellness" in message_lower or "health" in message_lower:
-        return "I'm here to support your wellness journey! I can suggest routes that promote physical activity and mental well-being."
-    
-    else:
-        return "Hello! I'm your AI navigation assistant. I can help you with routes, goals, weather updates, and wellness tips. What would you like to know?"
+def conversation_link(chat_request: ChatRequest, user: User) -> Dict[str, Any]:
+    """
+    AIMessage kwargs tying a message to the requested conversation, or to a
+    new one that is inserted in the same flush as the message
+    """
+    if chat_request.conversation_id:
+        return {"conversation_id": chat_request.conversation_id}
+    message = chat_request.message
+    return {
+        "conversation": AIConversation(
+            user_id=user.id,
+            title=message[:50] + "..." if len(message) > 50 else message,
+            context_data=chat_request.context
+        )
+    }
 
 
-def generate_suggestions(user_message: str) -> List[str]:
-    """Generate follow-up suggestions based on user message"""
-    message_lower = user_message.lower()
-    
-    if "route" in message_lower:
-        return [
-            "Find scenic route to destination",
-            "Check weather for my route",
-            "Show me the safest path"
-        ]
-    
-    elif "goal" in message_lower:
-        return [
-            "View my goal progress",
-            "Set a new fitness goal",
-            "Track my wellness score"
-        ]
-    
-    elif "weather" in message_lower:
-        return [
-            "Check current weather",
-            "Get weather forecast",
-            "Find weather-safe routes"
-        ]
+async def delete_user_conversations(db: AsyncSession, user_id: int, conversation_ids: List[int]) -> List[int]:
+    """
+    Delete the user's conversations among conversation_ids, with their
+    messages, in the caller's transaction: one DELETE per table however many
+    messages there are. Returns the ids actually deleted.
+    """
+    result = await db.execute(
+        select(AIConversation.id).where(
+            AIConversation.id.in_(conversation_ids),
+            AIConversation.user_id == user_id
+        )
+    )
+    deleted = list(result.scalars().all())
+    if not deleted:
+        return []
     
-    else:
-        return [
-            "Find a route",
-            "Set a goal",
-            "Check weather"
-        ]
+    await db.execute(delete(AIMessage).where(AIMessage.conversation_id.in_(deleted)))
+    await db.execute(delete(AIConversation).where(AIConversation.id.in_(deleted)))
+    return deleted
 
 
-def generate_quick_actions(user_message: str) -> List[dict]:
-    """Generate quick action buttons based on user message"""
-    message_lower = user_message.lower()
-    
-    if "route" in message_lower:
-        return [
-            {"label": "Find Route", "action": "find_route", "icon": "map"},
-            {"label": "Recent Routes", "action": "recent_routes", "icon": "history"},
-            {"label": "Favorites", "action": "favorites", "icon": "star"}
-        ]
-    
-    elif "goal" in message_lower:
-        return [
-            {"label": "View Goals", "action": "view_goals", "icon": "target"},
-            {"label": "Add Goal", "action": "add_goal", "icon": "plus"},
-            {"label": "Progress", "action": "progress", "icon": "trending-up"}
-        ]
+async def record_new_messages(
+    db: AsyncSession,
+    conversation_id: int,
+    user_id: int,
+    added: int,
+    last_message_at: datetime,
+    context: Optional[ChatContext] = None
+) -> None:
+    """
+    Keep the denormalized message stats in step with flushed message inserts,
+    writing an advanced context summary in the same UPDATE. The update also
+    checks ownership: if the conversation isn't the user's, the transaction
+    is rolled back and a 404 raised.
+    """
+    values: Dict[str, Any] = {
+        "message_count": AIConversation.message_count + added,
+        "last_message_at": last_message_at
+    }
+    if context is not None and context.context_data is not None:
+        values["context_data"] = context.context_data
+    result = await db.execute(
+        update(AIConversation)
+        .where(AIConversation.id == conversation_id, AIConversation.user_id == user_id)
+        .values(**values)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+
+
+async def load_prompt_context(
+    db: AsyncSession,
+    chat_request: ChatRequest,
+    user: User
+) -> Optional[ChatContext]:
+    """
+    Recent history and rolling summary of the requested conversation for the
+    LLM prompt. None when there is no LLM to send it to or the conversation is
+    new; a summary update is passed to record_new_messages to be written with
+    the rest of the turn. A conversation that is missing or not the user's is
+    a 404 here, before any reply is generated or message inserted. The read
+    transaction is ended before returning, so none is held open while the
+    reply is generated.
+    """
+    if not chat_request.conversation_id:
+        return None
+    result = await db.execute(
+        select(AIConversation).where(
+            AIConversation.id == chat_request.conversation_id,
+            AIConversation.user_id == user.id
+        )
+    )
+    conversation = result.scalar_one_or_none()
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    context = await load_chat_context(db, conversation) if openai_enabled() else None
+    await db.commit()
+    return context
+
+
+def intent_metadata(intent: IntentResult) -> Dict[str, Any]:
+    """How the message was classified, stored on the AI reply"""
+    return {"intent": intent.intent.value, "intent_confidence": intent.confidence, "intent_source": intent.source}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def openai_enabled() -> bool:
+    """Whether replies come from OpenAI rather than the canned responses"""
+    return bool(settings.OPENAI_API_KEY) and importlib.util.find_spec("openai") is not None
+
+
+def _get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+
+        _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    return _openai_client
+
+
+async def stream_ai_response(
+    user_message: str,
+    user: User,
+    intent: ChatIntent,
+    context: Optional[ChatContext] = None
+) -> AsyncIterator[str]:
+    """
+    Yield the AI reply in chunks as they are produced: tokens streamed from
+    OpenAI (with the conversation context, if any) when an API key is
+    configured, otherwise the canned generate_ai_response reply word by word
+    """
+    if openai_enabled():
+        stream = await _get_openai_client().chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=prompt_messages(context or ChatContext("", []), ASSISTANT_PROMPT, user_message),
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        return
     
-    else:
-        return [
-            {"label": "Quick Route", "action": "quick_route", "icon": "navigation"},
-            {"label": "Goals", "action": "goals", "icon": "target"},
-            {"label": "Weather", "action": "weather", "icon": "cloud"}
-        ]
+    for word in re.findall(r"\S+\s*", generate_ai_response(intent, user)):
+        yield word
+        await asyncio.sleep(0)
+
+
+AI_RESPONSES = {
+    ChatIntent.ROUTE: "I can help you find the best route! What's your destination? I'll consider your preferences for scenic routes and safety.",
+    ChatIntent.GOAL: "Great! I can help you track your goals. Would you like to see your current progress or set a new goal?",
+    ChatIntent.WEATHER: "I can check the weather for your route. This will help ensure you have the best experience on your journey.",
+    ChatIntent.SAFETY: "Safety is my top priority! I'll always recommend the safest routes and provide real-time safety updates.",
+    ChatIntent.WELLNESS: "I'm here to support your wellness journey! I can suggest routes that promote physical activity and mental well-being.",
+    ChatIntent.GENERAL: "Hello! I'm your AI navigation assistant. I can help you with routes, goals, weather updates, and wellness tips. What would you like to know?"
+}
+
+SUGGESTIONS = {
+    ChatIntent.ROUTE: [
+        "Find scenic route to destination",
+        "Check weather for my route",
+        "Show me the safest path"
+    ],
+    ChatIntent.GOAL: [
+        "View my goal progress",
+        "Set a new fitness goal",
+        "Track my wellness score"
+    ],
+    ChatIntent.WEATHER: [
+        "Check current weather",
+        "Get weather forecast",
+        "Find weather-safe routes"
+    ],
+    ChatIntent.GENERAL: [
+        "Find a route",
+        "Set a goal",
+        "Check weather"
+    ]
+}
+
+QUICK_ACTIONS = {
+    ChatIntent.ROUTE: [
+        {"label": "Find Route", "action": "find_route", "icon": "map"},
+        {"label": "Recent Routes", "action": "recent_routes", "icon": "history"},
+        {"label": "Favorites", "action": "favorites", "icon": "star"}
+    ],
+    ChatIntent.GOAL: [
+        {"label": "View Goals", "action": "view_goals", "icon": "target"},
+        {"label": "Add Goal", "action": "add_goal", "icon": "plus"},
+        {"label": "Progress", "action": "progress", "icon": "trending-up"}
+    ],
+    ChatIntent.GENERAL: [
+        {"label": "Quick Route", "action": "quick_route", "icon": "navigation"},
+        {"label": "Goals", "action": "goals", "icon": "target"},
+        {"label": "Weather", "action": "weather", "icon": "cloud"}
+    ]
+}
+
+
+def generate_ai_response(intent: ChatIntent, user: User) -> str:
+    """Generate AI response for the message's intent"""
+    return AI_RESPONSES[intent]
+
+
+def generate_suggestions(intent: ChatIntent) -> List[str]:
+    """Generate follow-up suggestions for the message's intent"""
+    return list(SUGGESTIONS.get(intent, SUGGESTIONS[ChatIntent.GENERAL]))
+
+
+def generate_quick_actions(intent: ChatIntent) -> List[dict]:
+    """Generate quick action buttons for the message's intent"""
+    return [dict(action) for action in QUICK_ACTIONS.get(intent, QUICK_ACTIONS[ChatIntent.GENERAL])]
 
 
 # Mock data endpoint for development
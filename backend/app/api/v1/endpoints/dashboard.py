@@ -1,55 +1,73 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List
+from typing import Awaitable, Callable, List, Sequence, TypeVar
 from datetime import datetime, timedelta
+import asyncio
 import os
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.user import User
-from app.models.route import Route, RouteStatus
+from app.models.route import Route
 from app.models.goal import Goal
 from app.models.achievement import UserAchievement
+from app.models.user_stats import UserDailyCount, UserDailyStats
 from app.schemas.dashboard import (
     DashboardData, Stat, Insight, RecentActivity, WeeklyProgress,
     AnalyticsRequest, AnalyticsResponse
 )
+from app.services.dashboard_cache import dashboard_cache
+from app.services.rollups import busiest_hours, most_visited_destinations, summarize
 
 router = APIRouter()
 
+T = TypeVar("T")
+
 
 @router.get("/", response_model=DashboardData)
 async def get_dashboard_data(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get comprehensive dashboard data"""
-    
-    # Get user stats
-    stats = await get_user_stats(current_user, db)
-    
-    # Get insights
-    insights = await get_user_insights(current_user, db)
-    
-    # Get recent activities
-    recent_activities = await get_recent_activities(current_user, db)
-    
-    # Get weekly progress
-    weekly_progress = await get_weekly_progress(current_user, db)
+    """Get comprehensive dashboard data (cached per user until routes or goals change)"""
+    cached = dashboard_cache.get(current_user.id)
+    if cached is not None:
+        return cached
     
-    # Get unlocked achievements
-    unlocked_achievements = await get_unlocked_achievements(current_user, db)
+    version = dashboard_cache.version(current_user.id)
+    dashboard = await build_dashboard_data(current_user, db)
+    dashboard_cache.set(current_user.id, dashboard, version)
+    return dashboard
+
+
+async def build_dashboard_data(user: User, db: AsyncSession) -> DashboardData:
+    """
+    Assemble the dashboard. The independent queries run concurrently, each
+    on its own session, and the week's routes are fetched once and shared
+    by the stats and insights sections.
+    """
+    week_distances, active_goals, recent_activities = await asyncio.gather(
+        _in_new_session(db, lambda session: get_week_route_distances(user, session)),
+        _in_new_session(db, lambda session: get_active_goals(user, session)),
+        _in_new_session(db, lambda session: get_recent_activities(user, session))
+    )
     
     return DashboardData(
-        stats=stats,
-        insights=insights,
+        stats=get_user_stats(user, week_distances),
+        insights=get_user_insights(week_distances, active_goals),
         recent_activities=recent_activities,
-        weekly_progress=weekly_progress,
-        unlocked_achievements=unlocked_achievements
+        weekly_progress=await get_weekly_progress(user, db),
+        unlocked_achievements=await get_unlocked_achievements(user, db)
     )  # type: ignore
 
 
+async def _in_new_session(db: AsyncSession, fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """Run fn on a fresh session bound like `db`; AsyncSession isn't safe to share across tasks"""
+    async with AsyncSession(bind=db.bind, expire_on_commit=False) as session:
+        return await fn(session)
+
+
 @router.post("/analytics", response_model=AnalyticsResponse)
 async def get_analytics(
     analytics_request: AnalyticsRequest,
@@ -58,63 +76,53 @@ async def get_analytics(
 ):
     """Get detailed analytics for a specific time range"""
     
-    # Calculate date range
-    end_date = datetime.utcnow()
-    if analytics_request.time_range == "day":
-        start_date = end_date - timedelta(days=1)
-    elif analytics_request.time_range == "week":
-        start_date = end_date - timedelta(weeks=1)
-    elif analytics_request.time_range == "month":
-        start_date = end_date - timedelta(days=30)
-    else:  # year
-        start_date = end_date - timedelta(days=365)
+    # Calendar days (UTC) in the range, including today
+    days = {"day": 1, "week": 7, "month": 30}.get(analytics_request.time_range, 365)
+    start_day = datetime.utcnow().date() - timedelta(days=days - 1)
     
-    # Get routes in time range
-    routes_result = await db.execute(
-        select(Route).where(
-            Route.user_id == current_user.id,
-            Route.created_at >= start_date,
-            Route.created_at <= end_date
+    # Read the daily rollup (one row per day plus its counters) instead of raw routes
+    rollup_result = await db.execute(
+        select(UserDailyStats).where(
+            UserDailyStats.user_id == current_user.id,
+            UserDailyStats.day >= start_day
         )
     )
-    routes = routes_result.scalars().all()
+    counts_result = await db.execute(
+        select(UserDailyCount).where(
+            UserDailyCount.user_id == current_user.id,
+            UserDailyCount.day >= start_day
+        )
+    )
+    summary = summarize(rollup_result.scalars().all(), counts_result.scalars().all())
     
     # Calculate analytics
-    total_distance = sum(r.distance or 0 for r in routes)
-    routes_completed = len([r for r in routes if r.status == RouteStatus.COMPLETED])
-    time_saved = sum(r.duration or 0 for r in routes) / 60  # Convert to hours
+    total_distance = summary["total_distance"]
+    routes_completed = summary["completed_count"]
+    time_saved = summary["total_duration"] / 60  # Convert to hours
     
     # Calculate wellness score (mock calculation)
     wellness_score = min(10.0, (total_distance * 0.5) + (routes_completed * 0.3) + (time_saved * 0.2))
     
     # Calculate average rating
-    rated_routes = [r for r in routes if r.rating is not None]
-    average_rating = sum(r.rating for r in rated_routes) / len(rated_routes) if rated_routes else 0.0
+    average_rating = summary["rating_sum"] / summary["rating_count"] if summary["rating_count"] else 0.0
     
     # Find favorite transport mode
-    transport_counts = {}
-    for route in routes:
-        transport = route.transport_mode.value
-        transport_counts[transport] = transport_counts.get(transport, 0) + 1
-    
+    transport_counts = summary["transport_counts"]
     favorite_transport = max(transport_counts.items(), key=lambda x: x[1])[0] if transport_counts else "walking"
     
-    # Mock peak hours (would be calculated from actual data)
-    peak_hours = [8, 9, 17, 18, 19]
-    
-    # Mock top destinations
-    top_destinations = [
-        {"name": "Central Park", "visits": 12, "avg_rating": 4.8},
-        {"name": "Coffee Shop", "visits": 8, "avg_rating": 4.5},
-        {"name": "Gym", "visits": 6, "avg_rating": 4.2}
-    ]
+    # Busiest hours of the day and most visited destinations
+    peak_hours = busiest_hours(summary["hour_counts"])
+    top_destinations = most_visited_destinations(summary["destinations"])
     
     # Calculate goal completion rate
     goals_result = await db.execute(
-        select(Goal).where(Goal.user_id == current_user.id)
+        select(
+            func.count(Goal.id),
+            func.count(Goal.id).filter(Goal.is_completed == True)
+        ).where(Goal.user_id == current_user.id)
     )
-    goals = goals_result.scalars().all()
-    goal_completion_rate = len([g for g in goals if g.is_completed]) / len(goals) if goals else 0.0
+    total_goals, completed_goals = goals_result.one()
+    goal_completion_rate = completed_goals / total_goals if total_goals else 0.0
     
     # Mock achievement progress
     achievement_progress = {
@@ -138,20 +146,30 @@ async def get_analytics(
     )  # type: ignore
 
 
-async def get_user_stats(user: User, db: AsyncSession) -> List[Stat]:
-    """Get user statistics for dashboard"""
-    # Get recent routes for comparison
+async def get_week_route_distances(user: User, db: AsyncSession) -> List[float]:
+    """Distances of the user's routes created in the last week (None counted as 0)"""
     week_ago = datetime.utcnow() - timedelta(weeks=1)
-    recent_routes_result = await db.execute(
-        select(Route).where(
+    result = await db.execute(
+        select(Route.distance).where(
             Route.user_id == user.id,
             Route.created_at >= week_ago
         )
     )
-    recent_routes = recent_routes_result.scalars().all()
-    
-    recent_distance = sum(r.distance or 0 for r in recent_routes)
-    recent_routes_count = len(recent_routes)
+    return [distance or 0 for distance in result.scalars().all()]
+
+
+async def get_active_goals(user: User, db: AsyncSession) -> List[Goal]:
+    """Active goals, used for the progress insight"""
+    result = await db.execute(
+        select(Goal).where(Goal.user_id == user.id, Goal.is_active == True)
+    )
+    return list(result.scalars().all())
+
+
+def get_user_stats(user: User, week_distances: Sequence[float]) -> List[Stat]:
+    """Get user statistics for dashboard"""
+    recent_distance = sum(week_distances)
+    recent_routes_count = len(week_distances)
     
     # Calculate changes (mock for now)
     distance_change = 12.5  # 12.5% increase
@@ -191,22 +209,13 @@ async def get_user_stats(user: User, db: AsyncSession) -> List[Stat]:
     ]
 
 
-async def get_user_insights(user: User, db: AsyncSession) -> List[Insight]:
+def get_user_insights(week_distances: Sequence[float], goals: Sequence[Goal]) -> List[Insight]:
     """Get personalized insights for the user"""
     insights = []
     
     # Analyze recent activity
-    week_ago = datetime.utcnow() - timedelta(weeks=1)
-    recent_routes_result = await db.execute(
-        select(Route).where(
-            Route.user_id == user.id,
-            Route.created_at >= week_ago
-        )
-    )
-    recent_routes = recent_routes_result.scalars().all()
-    
-    if recent_routes:
-        avg_distance = sum(r.distance or 0 for r in recent_routes) / len(recent_routes)
+    if week_distances:
+        avg_distance = sum(week_distances) / len(week_distances)
         if avg_distance > 3.0:
             insights.append(Insight(
                 title="Distance Champion",
@@ -223,11 +232,6 @@ async def get_user_insights(user: User, db: AsyncSession) -> List[Insight]:
             ))
     
     # Check goal progress
-    goals_result = await db.execute(
-        select(Goal).where(Goal.user_id == user.id, Goal.is_active == True)
-    )
-    goals = goals_result.scalars().all()
-    
     if goals:
         low_progress_goals = [g for g in goals if g.progress < 30]
         if low_progress_goals:
@@ -1,32 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List
+from sqlalchemy import delete, select, func
+from typing import List, Optional
 from datetime import datetime, timedelta
 import os
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.pagination import keyset_paginate, page_items
 from app.models.user import User
 from app.models.goal import Goal, GoalProgressLog, GoalCategory
 from app.schemas.goal import (
     GoalCreate, GoalUpdate, Goal as GoalSchema, GoalSummary,
     GoalProgressUpdate, GoalStats
 )
+from app.services.dashboard_cache import invalidate_dashboard
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[GoalSummary])
 async def get_user_goals(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page")
 ):
-    """Get all goals for the current user"""
-    result = await db.execute(
-        select(Goal).where(Goal.user_id == current_user.id).order_by(Goal.created_at.desc())
-    )
-    goals = result.scalars().all()
+    """Get goals for the current user, newest first (keyset paginated)"""
+    result = await db.execute(keyset_paginate(
+        select(Goal).where(Goal.user_id == current_user.id),
+        Goal.created_at, Goal.id, cursor, limit, db.bind.dialect.name
+    ))
+    goals, _ = page_items(result.scalars().all(), limit, lambda g: (g.created_at, g.id), response)
     
     return [
         GoalSummary(
@@ -61,6 +67,7 @@ async def create_goal(
     
     db.add(goal)
     await db.commit()
+    invalidate_dashboard(current_user.id)
     await db.refresh(goal)
     
     return goal
@@ -112,6 +119,7 @@ async def update_goal(
         setattr(goal, field, value)
     
     await db.commit()
+    invalidate_dashboard(current_user.id)
     await db.refresh(goal)
     
     return goal
@@ -133,13 +141,11 @@ async def delete_goal(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Goal not found"
         )
-    # Delete all progress logs for this goal
-    logs_result = await db.execute(select(GoalProgressLog).where(GoalProgressLog.goal_id == goal_id))
-    logs = logs_result.scalars().all()
-    for log in logs:
-        await db.delete(log)
-    await db.delete(goal)
+    # One statement for all the progress logs, however many there are
+    await db.execute(delete(GoalProgressLog).where(GoalProgressLog.goal_id == goal_id))
+    await db.execute(delete(Goal).where(Goal.id == goal_id))
     await db.commit()
+    invalidate_dashboard(current_user.id)
     return {"message": "Goal deleted successfully"}
 
 
@@ -186,6 +192,7 @@ async def update_goal_progress(
         if int(goal.current_streak) > int(goal.longest_streak):  # type: ignore
             goal.longest_streak = int(goal.current_streak)  # type: ignore
     await db.commit()
+    invalidate_dashboard(current_user.id)
     await db.refresh(goal)
     return goal
 
@@ -196,13 +203,23 @@ async def get_goal_stats(
     db: AsyncSession = Depends(get_db)
 ):
     """Get goal statistics for the current user"""
-    # Get all goals for the user
+    # All figures in a single aggregate query
     result = await db.execute(
-        select(Goal).where(Goal.user_id == current_user.id)
+        select(
+            func.count(Goal.id),
+            func.count(Goal.id).filter(
+                Goal.is_active == True,
+                func.coalesce(Goal.is_completed, False) == False
+            ),
+            func.count(Goal.id).filter(Goal.is_completed == True),
+            func.avg(func.coalesce(Goal.progress, 0.0)),
+            func.coalesce(func.sum(Goal.current_streak), 0),
+            func.max(func.coalesce(Goal.longest_streak, 0))
+        ).where(Goal.user_id == current_user.id)
     )
-    goals = result.scalars().all()
+    total_goals, active_goals, completed_goals, average_progress, total_streaks, longest_streak = result.one()
     
-    if not goals:
+    if not total_goals:
         return GoalStats(
             total_goals=0,
             active_goals=0,
@@ -212,37 +229,34 @@ async def get_goal_stats(
             longest_streak=0
         )
     
-    total_goals = len(goals)
-    active_goals = len([g for g in goals if bool(g.is_active) and not bool(g.is_completed)])  # type: ignore
-    completed_goals = len([g for g in goals if bool(g.is_completed)])  # type: ignore
-    average_progress = sum(float(g.progress) if g.progress is not None else 0.0 for g in goals) / total_goals  # type: ignore
-    total_streaks = sum(int(g.current_streak) if g.current_streak is not None else 0 for g in goals)  # type: ignore
-    longest_streak = max(int(g.longest_streak) if g.longest_streak is not None else 0 for g in goals) if goals else 0  # type: ignore
-    
     return GoalStats(
         total_goals=total_goals,
         active_goals=active_goals,
         completed_goals=completed_goals,
-        average_progress=average_progress,  # type: ignore
-        total_streaks=total_streaks,  # type: ignore
-        longest_streak=longest_streak  # type: ignore
+        average_progress=average_progress,
+        total_streaks=total_streaks,
+        longest_streak=longest_streak
     )
 
 
 @router.get("/categories/{category}", response_model=List[GoalSummary])
 async def get_goals_by_category(
     category: GoalCategory,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page")
 ):
-    """Get goals by category"""
-    result = await db.execute(
+    """Get goals by category, newest first (keyset paginated)"""
+    result = await db.execute(keyset_paginate(
         select(Goal).where(
             Goal.user_id == current_user.id,
             Goal.category == category
-        ).order_by(Goal.created_at.desc())
-    )
-    goals = result.scalars().all()
+        ),
+        Goal.created_at, Goal.id, cursor, limit, db.bind.dialect.name
+    ))
+    goals, _ = page_items(result.scalars().all(), limit, lambda g: (g.created_at, g.id), response)
     
     return [
         GoalSummary(
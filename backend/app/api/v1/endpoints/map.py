@@ -4,8 +4,10 @@ from typing import List, Optional
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.responses import ModelResponse
 from app.models.user import User
 from app.services.map_service import map_service
+from app.services.resilience import Priority
 from app.schemas.map import (
     PlaceSearchRequest, PlaceSearchResponse, Place,
     RouteCalculationRequest, RouteCalculationResponse,
@@ -94,7 +96,15 @@ async def calculate_route(
             transport_mode=request.transport_mode
         )
         
-        return RouteCalculationResponse(
+        # Simplify geometry for display unless the client asks for all points
+        if not request.full_geometry:
+            route_data = map_service.simplify_route(
+                route_data,
+                tolerance=request.simplify_tolerance,
+                zoom=request.zoom
+            )
+        
+        return ModelResponse(RouteCalculationResponse(
             distance=route_data["distance"],
             duration=route_data["duration"],
             distance_value=route_data["distance_value"],
@@ -102,8 +112,11 @@ async def calculate_route(
             points=route_data["points"],
             steps=route_data["steps"],
             polyline=route_data["polyline"],
-            summary=route_data["summary"]
-        )
+            summary=route_data["summary"],
+            simplified=route_data.get("simplified", False),
+            full_point_count=route_data.get("full_point_count"),
+            degraded=route_data.get("degraded", False)
+        ))
         
     except HTTPException:
         raise
@@ -129,14 +142,25 @@ async def suggest_routes(
         
         suggestions = []
         
-        # Calculate routes for each transport mode
-        for transport_mode in request.transport_modes:
+        # Calculate routes for all transport modes concurrently; modes that
+        # fail or time out come back as None and are skipped
+        route_results = await map_service.calculate_routes(
+            origin=origin,
+            destination=destination,
+            transport_modes=request.transport_modes
+        )
+        
+        for transport_mode, route_data in zip(request.transport_modes, route_results):
+            if route_data is None:
+                continue
+            
             try:
-                route_data = await map_service.calculate_route(
-                    origin=origin,
-                    destination=destination,
-                    transport_mode=transport_mode
-                )
+                if not request.full_geometry:
+                    route_data = map_service.simplify_route(
+                        route_data,
+                        tolerance=request.simplify_tolerance,
+                        zoom=request.zoom
+                    )
                 
                 # Calculate safety and environmental scores based on transport mode
                 safety_score = 9.0 if transport_mode == "walking" else 7.0 if transport_mode == "cycling" else 6.0
@@ -156,6 +180,8 @@ async def suggest_routes(
                 duration_min = route_data["duration_value"] / 60
                 
                 description = f"{transport_mode.title()} route: {distance_km:.1f}km, {duration_min:.0f}min"
+                if route_data.get("degraded"):
+                    description += " (estimated, live routing unavailable)"
                 
                 suggestion = RouteSuggestion(
                     transport_mode=transport_mode,
@@ -166,21 +192,24 @@ async def suggest_routes(
                     route_features=route_features,
                     description=description,
                     polyline=route_data["polyline"],
-                    points=route_data["points"]
+                    points=route_data["points"],
+                    simplified=route_data.get("simplified", False),
+                    full_point_count=route_data.get("full_point_count"),
+                    degraded=route_data.get("degraded", False)
                 )
                 
                 suggestions.append(suggestion)
                 
             except Exception as e:
-                # Skip this transport mode if route calculation fails
+                # Skip this transport mode if building the suggestion fails
                 continue
         
-        return RouteSuggestionResponse(
+        return ModelResponse(RouteSuggestionResponse(
             suggestions=suggestions,
             origin=request.origin,
             destination=request.destination,
             total_suggestions=len(suggestions)
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(
@@ -249,10 +278,13 @@ async def get_location_info(
             weather_icon="cloud"
         )
         # Get nearby places
+        # Fetch a wider candidate set and keep the 5 closest
         nearby_places_data = await map_service.search_places(
             query="restaurant",
             user_location=location,
-            limit=5
+            limit=15,
+            priority=Priority.BACKGROUND,
+            nearest_k=5
         )
         nearby_places = [
             Place(
@@ -288,14 +320,11 @@ async def map_service_health():
     """
     try:
         # Test search functionality
-        test_results = await map_service.search_places("test", limit=1)
+        test_results = await map_service.search_places("test", limit=1, priority=Priority.BACKGROUND)
         
         return {
             "status": "healthy",
-            "services": {
-                "nominatim": "operational",
-                "osrm": "operational"
-            },
+            "services": map_service.upstream_status(),
             "timestamp": "2024-01-15T12:00:00Z"
         }
         
@@ -303,4 +332,11 @@ async def map_service_health():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Map service unavailable: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/metrics")
+async def map_service_metrics():
+    """
+    Cache, request-coalescing and rate-limiter counters for the map service
+    """
+    return map_service.metrics()
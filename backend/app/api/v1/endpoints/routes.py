@@ -1,38 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List
+from sqlalchemy import delete, select, func, update
+from typing import List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import os
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.pagination import keyset_paginate, page_items
 from app.models.user import User
 from app.models.route import Route, RouteEvent, TransportMode, RouteStatus
 from app.schemas.route import (
     RouteCreate, RouteUpdate, Route as RouteSchema, RouteSummary,
     RouteSearch, RouteRecommendation
 )
+from app.schemas.common import BulkDeleteRequest, BulkDeleteResponse
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.rollups import record_route_change, record_route_changes, route_snapshot
+from app.services.user_cache import invalidate_user
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[RouteSummary])
 async def get_user_routes(
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-    limit: int = 20,
-    offset: int = 0
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page")
 ):
-    """Get all routes for the current user"""
-    result = await db.execute(
-        select(Route)
-        .where(Route.user_id == current_user.id)
-        .order_by(Route.created_at.desc())
-        .limit(limit)
-        .offset(offset)
+    """Get all routes for the current user, newest first (keyset paginated)"""
+    query = keyset_paginate(
+        select(Route).where(Route.user_id == current_user.id),
+        Route.created_at, Route.id, cursor, limit, db.bind.dialect.name
     )
-    routes = result.scalars().all()
+    if cursor is None and offset:
+        query = query.offset(offset)
+    
+    result = await db.execute(query)
+    routes, _ = page_items(result.scalars().all(), limit, lambda r: (r.created_at, r.id), response)
     return [
         RouteSummary(
             id=route.id,  # type: ignore
@@ -70,7 +79,11 @@ async def create_route(
     )
     
     db.add(route)
+    # Flushed first so the rollup buckets it by the created_at the database assigns
+    await db.flush()
+    await record_route_change(db, current_user.id, None, route_snapshot(route))
     await db.commit()
+    invalidate_dashboard(current_user.id)
     await db.refresh(route)
     
     return route
@@ -117,11 +130,14 @@ async def update_route(
         )
     
     update_data = route_update.dict(exclude_unset=True)
+    before = route_snapshot(route)
     
     for field, value in update_data.items():
         setattr(route, field, value)
     
+    await record_route_change(db, current_user.id, before, route_snapshot(route))
     await db.commit()
+    invalidate_dashboard(current_user.id)
     await db.refresh(route)
     
     return route
@@ -133,24 +149,57 @@ async def delete_route(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Delete a route"""
-    result = await db.execute(
-        select(Route).where(Route.id == route_id, Route.user_id == current_user.id)
-    )
-    route = result.scalar_one_or_none()
-    
-    if not route:
+    """Delete a route and its events"""
+    if not await delete_user_routes(db, current_user.id, [route_id]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Route not found"
         )
-    
-    await db.delete(route)
     await db.commit()
+    invalidate_dashboard(current_user.id)
     
     return {"message": "Route deleted successfully"}
 
 
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete_routes(
+    request: BulkDeleteRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete several routes and their events in one transaction"""
+    deleted = await delete_user_routes(db, current_user.id, request.ids)
+    await db.commit()
+    if deleted:
+        invalidate_dashboard(current_user.id)
+    
+    return BulkDeleteResponse(
+        deleted=deleted,
+        not_found=[route_id for route_id in dict.fromkeys(request.ids) if route_id not in deleted]
+    )
+
+
+async def delete_user_routes(db: AsyncSession, user_id: int, route_ids: List[int]) -> List[int]:
+    """
+    Delete the user's routes among route_ids, with their events, in the
+    caller's transaction: one SELECT for the rollup snapshots, then one
+    DELETE per table however many routes or events there are. Returns the
+    ids actually deleted.
+    """
+    result = await db.execute(
+        select(Route).where(Route.id.in_(route_ids), Route.user_id == user_id)
+    )
+    routes = result.scalars().all()
+    if not routes:
+        return []
+    deleted = [route.id for route in routes]
+    
+    await record_route_changes(db, user_id, [(route_snapshot(route), None) for route in routes])
+    await db.execute(delete(RouteEvent).where(RouteEvent.route_id.in_(deleted)))
+    await db.execute(delete(Route).where(Route.id.in_(deleted)))
+    return deleted
+
+
 @router.post("/{route_id}/start")
 async def start_route(
     route_id: int,
@@ -169,8 +218,10 @@ async def start_route(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Route not found"
         )
+    before = route_snapshot(route)
     setattr(route, 'status', RouteStatus.IN_PROGRESS)
     setattr(route, 'started_at', datetime.utcnow())
+    await record_route_change(db, current_user.id, before, route_snapshot(route))
     event = RouteEvent(
         route_id=route.id,
         event_type="start",
@@ -180,6 +231,7 @@ async def start_route(
     )
     db.add(event)
     await db.commit()
+    invalidate_dashboard(current_user.id)
     await db.refresh(route)
     return {"message": "Route started successfully", "route_id": route.id}
 
@@ -202,12 +254,20 @@ async def complete_route(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Route not found"
         )
+    before = route_snapshot(route)
     setattr(route, 'status', RouteStatus.COMPLETED)
     setattr(route, 'completed_at', datetime.utcnow())
-    # Update user stats
-    if route.distance is not None:
-        setattr(current_user, 'total_distance', (float(current_user.total_distance) if not hasattr(current_user.total_distance, 'expression') else 0) + route.distance)
-    setattr(current_user, 'routes_completed', (int(current_user.routes_completed) if not hasattr(current_user.routes_completed, 'expression') else 0) + 1)
+    await record_route_change(db, current_user.id, before, route_snapshot(route))
+    # Update user stats in SQL: current_user may be a cached copy, so its totals can be stale
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(
+            total_distance=func.coalesce(User.total_distance, 0.0) + (route.distance or 0.0),
+            routes_completed=func.coalesce(User.routes_completed, 0) + 1
+        )
+        .execution_options(synchronize_session=False)
+    )
     event = RouteEvent(
         route_id=route.id,
         event_type="complete",
@@ -217,6 +277,8 @@ async def complete_route(
     )
     db.add(event)
     await db.commit()
+    invalidate_dashboard(current_user.id)
+    invalidate_user(current_user.id)
     await db.refresh(route)
     return {"message": "Route completed successfully", "route_id": route.id}
 
@@ -231,9 +293,11 @@ async def search_routes(
     try:
         from app.services.map_service import map_service
 
-        # Geocode origin and destination using map_service
-        origin_places = await map_service.search_places(search_data.origin)
-        destination_places = await map_service.search_places(search_data.destination)
+        # Geocode origin and destination concurrently using map_service
+        origin_places, destination_places = await asyncio.gather(
+            map_service.search_places(search_data.origin),
+            map_service.search_places(search_data.destination)
+        )
         if not origin_places or not destination_places:
             raise HTTPException(status_code=404, detail="Could not geocode origin or destination.")
         origin = {"lat": origin_places[0]["lat"], "lng": origin_places[0]["lng"]}
@@ -241,13 +305,15 @@ async def search_routes(
 
         recommendations = []
         transport_modes = [search_data.transport_mode.value] if search_data.transport_mode else ["walking", "cycling", "driving"]
-        for i, mode in enumerate(transport_modes):
+        route_results = await map_service.calculate_routes(
+            origin=origin,
+            destination=destination,
+            transport_modes=transport_modes
+        )
+        for i, (mode, route_data) in enumerate(zip(transport_modes, route_results)):
+            if route_data is None:
+                continue
             try:
-                route_data = await map_service.calculate_route(
-                    origin=origin,
-                    destination=destination,
-                    transport_mode=mode
-                )
                 safety_score = 9.0 if mode == "walking" else 7.0 if mode == "cycling" else 6.0
                 route_features = []
                 if mode == "walking":
@@ -258,6 +324,13 @@ async def search_routes(
                     route_features = ["fast", "convenient", "all-weather"]
                 distance_km = route_data["distance_value"] / 1000
                 duration_min = route_data["duration_value"] / 60
+                if route_data.get("degraded"):
+                    # Straight-line estimate while live routing is unavailable
+                    recommendation_reason = f"Estimated {mode} route (live routing temporarily unavailable)"
+                    confidence_score = 0.3
+                else:
+                    recommendation_reason = f"Best {mode} route with good safety and environmental scores"
+                    confidence_score = 0.85
                 recommendation = RouteRecommendation(
                     route_id=i + 1,
                     title=f"{mode.title()} Route",
@@ -265,8 +338,8 @@ async def search_routes(
                     duration=duration_min,
                     safety_score=safety_score,
                     route_features=route_features,
-                    recommendation_reason=f"Best {mode} route with good safety and environmental scores",
-                    confidence_score=0.85
+                    recommendation_reason=recommendation_reason,
+                    confidence_score=confidence_score
                 )
                 recommendations.append(recommendation)
             except Exception as e:
@@ -328,13 +401,19 @@ async def get_route_stats(
     db: AsyncSession = Depends(get_db)
 ):
     """Get route statistics for the current user"""
-    # Get all routes for the user
-    result = await db.execute(
-        select(Route).where(Route.user_id == current_user.id)
-    )
-    routes = result.scalars().all()
+    # Counts and totals in a single aggregate query
+    totals = (await db.execute(
+        select(
+            func.count(Route.id),
+            func.count(Route.id).filter(Route.status == RouteStatus.COMPLETED),
+            func.coalesce(func.sum(Route.distance), 0),
+            func.coalesce(func.sum(Route.duration), 0),
+            func.avg(Route.rating)
+        ).where(Route.user_id == current_user.id)
+    )).one()
+    total_routes, completed_routes, total_distance, total_time, average_rating = totals
     
-    if not routes:
+    if not total_routes:
         return {
             "total_routes": 0,
             "completed_routes": 0,
@@ -344,29 +423,23 @@ async def get_route_stats(
             "favorite_transport": None
         }
     
-    total_routes = len(routes)
-    completed_routes = len([r for r in routes if r.status == RouteStatus.COMPLETED])
-    total_distance = sum(r.distance or 0 for r in routes)
-    total_time = sum(r.duration or 0 for r in routes)
-    
-    # Calculate average rating
-    rated_routes = [r for r in routes if r.rating is not None]
-    average_rating = sum(r.rating for r in rated_routes) / len(rated_routes) if rated_routes else 0.0
-    
-    # Find favorite transport mode
-    transport_counts = {}
-    for route in routes:
-        transport = route.transport_mode.value
-        transport_counts[transport] = transport_counts.get(transport, 0) + 1
-    
-    favorite_transport = max(transport_counts.items(), key=lambda x: x[1])[0] if transport_counts else None
+    # Find favorite transport mode (ties go to the mode used first)
+    favorite_result = await db.execute(
+        select(Route.transport_mode)
+        .where(Route.user_id == current_user.id)
+        .group_by(Route.transport_mode)
+        .order_by(func.count(Route.id).desc(), func.min(Route.id))
+        .limit(1)
+    )
+    favorite_mode = favorite_result.scalar_one_or_none()
+    favorite_transport = favorite_mode.value if favorite_mode is not None else None
     
     return {
         "total_routes": total_routes,
         "completed_routes": completed_routes,
         "total_distance": total_distance,
         "total_time": total_time,
-        "average_rating": average_rating,
+        "average_rating": average_rating if average_rating is not None else 0.0,
         "favorite_transport": favorite_transport
     }
 
@@ -6,8 +6,9 @@ import json
 import os
 
 from app.core.database import get_db
-from app.core.auth import get_current_user, create_access_token, get_password_hash, verify_password
+from app.core.auth import get_current_user, create_user_access_token, get_password_hash_async, verify_password_async
 from app.models.user import User
+from app.services.user_cache import invalidate_user
 from app.schemas.user import (
     UserCreate, UserUpdate, User as UserSchema, UserProfile, 
     UserLogin, Token, UserPreferences, UserStats
@@ -35,7 +36,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     user = User(
         email=user_data.email,
         username=user_data.username,
@@ -50,7 +51,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     await db.refresh(user)
     
     # Create access token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_user_access_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -60,7 +61,7 @@ async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db))
     result = await db.execute(select(User).where(User.email == user_credentials.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password if not hasattr(user.hashed_password, 'expression') else None):
+    if not user or not await verify_password_async(user_credentials.password, user.hashed_password if not hasattr(user.hashed_password, 'expression') else None):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -73,7 +74,7 @@ async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db))
             detail="Inactive user"
         )
     
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_user_access_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -123,6 +124,7 @@ async def update_user_profile(
         setattr(current_user, field, value)
     
     await db.commit()
+    invalidate_user(current_user.id)
     await db.refresh(current_user)
     
     # Return updated profile
@@ -197,6 +199,7 @@ async def update_user_preferences(
     current_user.privacy = preferences.privacy
     
     await db.commit()
+    invalidate_user(current_user.id)
     await db.refresh(current_user)
     
     return preferences
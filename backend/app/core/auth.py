@@ -1,5 +1,8 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -11,10 +14,20 @@ from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
 from app.schemas.user import TokenData
+from app.services.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt costs 100-300 ms of CPU per call, so request handlers run it in a
+# small dedicated pool (bcrypt releases the GIL) instead of on the event loop
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_jobs = 0  # queued + running; only touched from the event loop
+
 # JWT token security
 security = HTTPBearer()
 
@@ -29,6 +42,55 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+            thread_name_prefix="password-hash"
+        )
+    return _password_executor
+
+
+async def _run_password_job(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run a hashing call in the password pool. Past PASSWORD_HASH_MAX_PENDING
+    jobs the request is shed with a 503 instead of queueing without bound.
+    """
+    global _password_jobs
+    if _password_jobs >= settings.PASSWORD_HASH_MAX_PENDING:
+        logger.warning(f"Password hashing queue full ({_password_jobs} jobs), shedding request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    _password_jobs += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_password_executor(), fn, *args)
+    finally:
+        _password_jobs -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password without blocking the event loop"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash without blocking the event loop"""
+    return await _run_password_job(get_password_hash, password)
+
+
+def shutdown_password_executor() -> None:
+    """Stop the password pool; it is recreated on next use"""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -37,11 +99,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def create_user_access_token(user: User) -> str:
+    """Create an access token for a user, embedding their id when enabled"""
+    claims = {"sub": user.email}
+    if settings.ACCESS_TOKEN_INCLUDE_USER_ID:
+        claims["uid"] = user.id
+    return create_access_token(data=claims)
+
+
 def verify_token(token: str) -> Optional[TokenData]:
     """Verify and decode a JWT token"""
     try:
@@ -49,9 +119,9 @@ def verify_token(token: str) -> Optional[TokenData]:
         email: Optional[str] = payload.get("sub")
         if email is None:
             return None
-        token_data = TokenData(email=email)
+        token_data = TokenData(email=email, user_id=payload.get("uid"), issued_at=payload.get("iat"))
         return token_data
-    except JWTError:
+    except (JWTError, ValueError):
         return None
 
 
@@ -70,12 +140,26 @@ async def get_current_user(
     if token_data is None:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.email == token_data.email))
-    user = result.scalar_one_or_none()
+    # Tokens issued before iat was added share a key per subject until they expire
+    cache_key = (token_data.email, token_data.issued_at)
+    user = await user_cache.get(db, cache_key)
+    if user is not None:
+        return user
+    
+    generation = user_cache.generation()
+    if token_data.user_id is not None:
+        user = await db.get(User, token_data.user_id)
+        # The subject still has to match, as it does for the email lookup
+        if user is not None and user.email != token_data.email:
+            user = None
+    else:
+        result = await db.execute(select(User).where(User.email == token_data.email))
+        user = result.scalar_one_or_none()
     
     if user is None:
         raise credentials_exception
     
+    user_cache.set(cache_key, user, generation)
     return user
 
 
@@ -17,19 +17,86 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./pathfinder_ai.db"
+    DATABASE_ECHO: bool = False  # Log every SQL statement (independent of DEBUG)
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DATABASE_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DATABASE_POOL_PRE_PING: bool = False
+    
+    # SQLite connection PRAGMAs (ignored for other databases)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268_435_456  # 256 MB
+    SQLITE_CACHE_SIZE: int = -65_536  # negative = KiB, i.e. 64 MB per connection
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_INCLUDE_USER_ID: bool = True  # Add a "uid" claim so the user is looked up by primary key
+    AUTH_USER_CACHE_TTL: float = 30.0  # seconds; bounds staleness across worker processes, 0 disables
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 4096
+    PASSWORD_HASH_WORKERS: int = 4  # threads for bcrypt in login/register
+    PASSWORD_HASH_MAX_PENDING: int = 64  # queued + running bcrypt jobs before login/register return 503
     
     # OpenAI
-    OPENAI_API_KEY: str = ""
+    OPENAI_API_KEY: str = ""  # enables model replies (needs the `openai` package); empty uses canned replies
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
     
     # External APIs
     MAPBOX_ACCESS_TOKEN: str = ""
     OPENWEATHER_API_KEY: str = ""
     
+    # Dashboard
+    DASHBOARD_CACHE_TTL: float = 60.0  # seconds; bounds staleness across worker processes
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 4096
+    
+    # AI chat
+    AI_CONVERSATION_DENORMALIZED_COUNTS: bool = True  # List conversations from stored message_count/last_message_at
+    AI_INTENT_MODEL_PATH: str = ""  # joblib file of a fitted scikit-learn pipeline for messages without keywords; empty disables
+    AI_INTENT_MODEL_THRESHOLD: float = 0.5  # minimum predicted probability to accept the model's intent
+    AI_CONTEXT_MAX_MESSAGES: int = 20  # prior messages sent to the LLM with each turn
+    AI_CONTEXT_MAX_TOKENS: int = 2000  # estimated token budget for those messages
+    AI_CONTEXT_SUMMARY_MAX_CHARS: int = 2000  # rolling summary of older messages, kept in context_data
+    AI_CONTEXT_SUMMARY_BATCH: int = 200  # most messages folded into the summary per turn
+    
+    # Map services (Nominatim / OSRM)
+    NOMINATIM_BASE_URL: str = "https://nominatim.openstreetmap.org"
+    OSRM_BASE_URL: str = "https://router.project-osrm.org"
+    NOMINATIM_TIMEOUT: float = 10.0  # seconds
+    OSRM_TIMEOUT: float = 15.0  # seconds
+    MAP_HTTP2: bool = True  # Requires the `h2` package, falls back to HTTP/1.1
+    MAP_HTTP_MAX_CONNECTIONS: int = 100
+    MAP_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    MAP_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    NOMINATIM_COUNTRY_CODES: str = "in"  # Focus on India
+    NOMINATIM_RATE_LIMIT: float = 1.0  # requests/second (public Nominatim usage policy); 0 disables
+    NOMINATIM_RATE_BURST: int = 1
+    OSRM_RATE_LIMIT: float = 5.0  # requests/second; 0 disables
+    OSRM_RATE_BURST: int = 5
+    MAP_CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures before an upstream circuit opens
+    MAP_CIRCUIT_RECOVERY_TIMEOUT: float = 30.0  # seconds before a half-open probe is allowed
+    MAP_CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+    MAP_ROUTE_ESTIMATE_FALLBACK: bool = True  # straight-line estimate when OSRM is down and nothing is cached
+    MAP_ROUTE_CONCURRENCY: int = 4  # max concurrent OSRM calls per multi-mode request
+    MAP_ROUTE_MODE_TIMEOUT: float = 8.0  # seconds per mode before it is dropped from the results
+    
+    # Map result caching
+    MAP_CACHE_SQLITE_PATH: str = ""  # e.g. "./map_cache.db"; empty keeps caches in memory only
+    GEOCODE_CACHE_TTL: float = 86400.0  # seconds
+    GEOCODE_CACHE_MAX_ENTRIES: int = 2048
+    GEOCODE_CACHE_COORD_PRECISION: int = 3  # decimal places of user_location in the key (~110 m)
+    ROUTE_CACHE_TTL: float = 3600.0  # seconds a cached route is fresh
+    ROUTE_CACHE_STALE_TTL: float = 21600.0  # seconds a stale route may be served while refreshing
+    ROUTE_CACHE_MAX_ENTRIES: int = 1024
+    ROUTE_CACHE_GRID_METERS: float = 10.0  # origin/destination snapping grid
+    
+    # Route geometry simplification (applied to responses, not the cache)
+    ROUTE_SIMPLIFY_TOLERANCE: float = 5.0  # meters when the client sends no zoom/tolerance; 0 disables
+    ROUTE_SIMPLIFY_PIXEL_TOLERANCE: float = 1.0  # screen pixels of error allowed for a given zoom
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -1,15 +1,60 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
+
+def _is_sqlite(database_url: str) -> bool:
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune every new SQLite connection once, when the pool opens it"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT)}")
+    cursor.close()
+
+
+def create_database_engine(database_url: str) -> AsyncEngine:
+    """
+    Create a pooled async engine. Pool sizing comes from settings; SQLite
+    connections additionally get WAL/synchronous/mmap/cache PRAGMAs.
+    """
+    options = {
+        "echo": settings.DATABASE_ECHO,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+    # In-memory SQLite uses a single static connection, which takes no pool sizing.
+    # The pool class is explicit because aiosqlite otherwise defaults to NullPool.
+    if not _is_sqlite_memory(database_url):
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+    
+    database_engine = create_async_engine(database_url, **options)
+    if _is_sqlite(database_url):
+        event.listen(database_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return database_engine
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    poolclass=NullPool,
-)
+engine = create_database_engine(settings.DATABASE_URL)
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -28,4 +73,4 @@ async def get_db() -> AsyncSession:
         try:
             yield session
         finally:
-            await session.close() 
\ No newline at end of file
+            await session.close()
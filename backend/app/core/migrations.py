@@ -0,0 +1,45 @@
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+
+# Schema that Base.metadata.create_all produced before migrations existed
+BASELINE_REVISION = "0001"
+
+
+def get_alembic_config(connection: Connection = None) -> Config:
+    """Alembic config for the backend, optionally bound to an open connection"""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _upgrade(connection: Connection) -> None:
+    config = get_alembic_config(connection)
+    tables = set(inspect(connection).get_table_names())
+
+    # Databases created by create_all have the baseline tables but no version row
+    if "alembic_version" not in tables and "users" in tables:
+        logger.info(f"Stamping existing database at revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+
+
+async def run_migrations(engine: AsyncEngine) -> None:
+    """
+    Bring the database schema up to the latest Alembic revision
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade)
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, func, or_
+from sqlalchemy.sql import ColumnElement, Select
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    """Opaque cursor for the position just after (sort_value, row_id)"""
+    payload = [sort_value.isoformat() if sort_value is not None else None, row_id]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Inverse of encode_cursor; raises a 400 for anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_paginate(
+    query: Select,
+    sort_column: ColumnElement,
+    id_column: ColumnElement,
+    cursor: Optional[str],
+    limit: int,
+    dialect_name: str
+) -> Select:
+    """
+    Order `query` newest first by (sort_column, id_column) and seek past
+    `cursor`. Fetches limit + 1 rows so page_items can tell whether another
+    page exists. NULL sort values come last, ordered by id.
+    """
+    query = query.order_by(sort_column.desc().nulls_last(), id_column.desc()).limit(limit + 1)
+    if cursor is None:
+        return query
+
+    sort_value, row_id = decode_cursor(cursor)
+    if sort_value is None:
+        return query.where(sort_column.is_(None), id_column < row_id)
+
+    bound: Any = sort_value
+    if dialect_name == "sqlite":
+        # server_default=func.now() stores "YYYY-MM-DD HH:MM:SS" text while bound
+        # datetimes carry microseconds; normalize so equal instants compare equal
+        bound = func.datetime(sort_value.strftime("%Y-%m-%d %H:%M:%S"))
+
+    return query.where(or_(
+        sort_column < bound,
+        and_(sort_column == bound, id_column < row_id),
+        sort_column.is_(None)
+    ))
+
+
+def page_items(
+    rows: Sequence[T],
+    limit: int,
+    key: Callable[[T], Tuple[Optional[datetime], int]],
+    response: Optional[Response] = None
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Trim the extra look-ahead row and build the next cursor, also setting it
+    as the X-Next-Cursor header when a response is given
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit and items else None
+    if response is not None and next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items, next_cursor
@@ -0,0 +1,36 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional; responses fall back to stdlib json
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    App-wide default response class: orjson when it is installed, otherwise
+    FastAPI's stdlib JSONResponse. Non-string keys are allowed, as json.dumps
+    allows them, so handlers returning e.g. {8: count} keep working.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ModelResponse(Response):
+    """
+    JSON response for a model the endpoint has already validated. pydantic-core
+    writes the bytes directly, skipping FastAPI's second validation and
+    encoding pass over the response_model (costly for thousands of route
+    points). Keep response_model on the route so the OpenAPI schema is unchanged.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json(by_alias=True).encode("utf-8")
@@ -4,11 +4,13 @@ from .goal import Goal, GoalProgressLog, GoalCategory
 from .route import Route, RouteEvent, TransportMode, RouteStatus
 from .achievement import Achievement, UserAchievement, AchievementType
 from .ai_chat import AIConversation, AIMessage, MessageType, MessageSender
+from .user_stats import UserDailyStats, UserDailyCount
 
 __all__ = [
     "User",
     "Goal", "GoalProgressLog", "GoalCategory",
     "Route", "RouteEvent", "TransportMode", "RouteStatus",
     "Achievement", "UserAchievement", "AchievementType",
-    "AIConversation", "AIMessage", "MessageType", "MessageSender"
+    "AIConversation", "AIMessage", "MessageType", "MessageSender",
+    "UserDailyStats", "UserDailyCount"
 ] 
\ No newline at end of file
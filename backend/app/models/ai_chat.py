@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Enum, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Enum, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -19,6 +19,9 @@ class MessageSender(str, enum.Enum):
 
 class AIConversation(Base):
     __tablename__ = "ai_conversations"
+    __table_args__ = (
+        Index("ix_ai_conversations_user_id_updated_at", "user_id", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -28,15 +31,22 @@ class AIConversation(Base):
     # Context
     context_data = Column(JSON, nullable=True)  # User context, preferences, etc.
     
+    # Denormalized message stats, maintained by chat_with_ai
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_message_at = Column(DateTime(timezone=True), nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    messages = relationship("AIMessage", back_populates="conversation")
+    messages = relationship("AIMessage", back_populates="conversation", cascade="all, delete-orphan")
 
 
 class AIMessage(Base):
     __tablename__ = "ai_messages"
+    __table_args__ = (
+        Index("ix_ai_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("ai_conversations.id"), nullable=False)
@@ -55,4 +65,8 @@ class AIMessage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    conversation = relationship("AIConversation", back_populates="messages") 
\ No newline at end of file
+    conversation = relationship("AIConversation", back_populates="messages")
+    
+    # Fetch id/created_at during the flush (RETURNING, or a SELECT where it is
+    # unsupported) so chat handlers never need a refresh round-trip
+    __mapper_args__ = {"eager_defaults": True} 
\ No newline at end of file
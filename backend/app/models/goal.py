@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -14,6 +14,9 @@ class GoalCategory(str, enum.Enum):
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -42,11 +45,14 @@ class Goal(Base):
     
     # Relationships
     user = relationship("User", back_populates="goals")
-    progress_logs = relationship("GoalProgressLog", back_populates="goal")
+    progress_logs = relationship("GoalProgressLog", back_populates="goal", cascade="all, delete-orphan")
 
 
 class GoalProgressLog(Base):
     __tablename__ = "goal_progress_logs"
+    __table_args__ = (
+        Index("ix_goal_progress_logs_goal_id_logged_at", "goal_id", "logged_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     goal_id = Column(Integer, ForeignKey("goals.id"), nullable=False)
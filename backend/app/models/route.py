@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -21,6 +21,9 @@ class RouteStatus(str, enum.Enum):
 
 class Route(Base):
     __tablename__ = "routes"
+    __table_args__ = (
+        Index("ix_routes_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -65,11 +68,14 @@ class Route(Base):
     
     # Relationships
     user = relationship("User", back_populates="routes")
-    route_events = relationship("RouteEvent", back_populates="route")
+    route_events = relationship("RouteEvent", back_populates="route", cascade="all, delete-orphan")
 
 
 class RouteEvent(Base):
     __tablename__ = "route_events"
+    __table_args__ = (
+        Index("ix_route_events_route_id_timestamp", "route_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     route_id = Column(Integer, ForeignKey("routes.id"), nullable=False)
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, String, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+# Per-user, per-day rollup of routes by creation day, maintained by app.services.rollups
+class UserDailyStats(Base):
+    __tablename__ = "user_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_user_daily_stats_user_id_day"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)  # UTC
+    
+    # Totals
+    route_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    total_distance = Column(Float, nullable=False, default=0.0)  # in km
+    total_duration = Column(Float, nullable=False, default=0.0)  # in minutes
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Per-user, per-day histograms for the rollup above: one counter row per
+# transport mode, hour of creation and destination, so every change is a
+# single atomic upsert
+class UserDailyCount(Base):
+    __tablename__ = "user_daily_counts"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "dimension", "key", name="uq_user_daily_counts_user_id_day_dimension_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)  # UTC
+    dimension = Column(String(20), nullable=False)  # transport, hour or destination
+    key = Column(String, nullable=False)  # e.g. "walking", "8" (UTC hour) or "Central Park"
+    
+    count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)  # destinations only
+    rating_count = Column(Integer, nullable=False, default=0)  # destinations only
@@ -24,6 +24,7 @@ from .dashboard import (
     Stat, Insight, RecentActivity, WeeklyProgress, DashboardData,
     AnalyticsRequest, AnalyticsResponse
 )
+from .common import BulkDeleteRequest, BulkDeleteResponse
 
 __all__ = [
     # User schemas
@@ -50,5 +51,8 @@ __all__ = [
     
     # Dashboard schemas
     "Stat", "Insight", "RecentActivity", "WeeklyProgress", "DashboardData",
-    "AnalyticsRequest", "AnalyticsResponse"
+    "AnalyticsRequest", "AnalyticsResponse",
+    
+    # Common schemas
+    "BulkDeleteRequest", "BulkDeleteResponse"
 ] 
\ No newline at end of file
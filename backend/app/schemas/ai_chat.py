@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -47,7 +47,10 @@ class AIMessageBase(BaseModel):
     sender: MessageSender
     message_type: MessageType = MessageType.TEXT
     content: str = Field(..., min_length=1)
-    metadata: Optional[Dict[str, Any]] = None
+    # The ORM column is message_metadata (`metadata` is reserved by SQLAlchemy)
+    metadata: Optional[Dict[str, Any]] = Field(
+        None, validation_alias=AliasChoices("message_metadata", "metadata")
+    )
 
 
 class AIMessageCreate(AIMessageBase):
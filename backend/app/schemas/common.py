@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=100)
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted: List[int]  # ids that were removed
+    not_found: List[int]  # ids that don't exist or belong to another user
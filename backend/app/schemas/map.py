@@ -33,7 +33,13 @@ class PlaceSearchResponse(BaseModel):
     query: str
 
 
-class RouteCalculationRequest(BaseModel):
+class GeometryOptions(BaseModel):
+    zoom: Optional[float] = Field(None, ge=0, le=22, description="Client map zoom level used to pick the simplification tolerance")
+    simplify_tolerance: Optional[float] = Field(None, ge=0, description="Simplification tolerance in meters (overrides zoom, 0 disables)")
+    full_geometry: bool = Field(False, description="Return every route point without simplification")
+
+
+class RouteCalculationRequest(GeometryOptions):
     origin: Location = Field(..., description="Starting point")
     destination: Location = Field(..., description="Destination point")
     transport_mode: str = Field("walking", description="Transport mode: walking, cycling, driving")
@@ -55,9 +61,12 @@ class RouteCalculationResponse(BaseModel):
     steps: List[RouteStep]
     polyline: str  # Encoded polyline
     summary: Dict[str, Any]
+    simplified: bool = False  # True if points/polyline were simplified for display
+    full_point_count: Optional[int] = None  # Point count before simplification
+    degraded: bool = Field(False, description="True if this is a straight-line estimate because routing is unavailable")
 
 
-class RouteSuggestionRequest(BaseModel):
+class RouteSuggestionRequest(GeometryOptions):
     origin: Location
     destination: Location
     preferences: Optional[Dict[str, Any]] = Field(None, description="User preferences")
@@ -74,6 +83,9 @@ class RouteSuggestion(BaseModel):
     description: str
     polyline: str
     points: List[List[float]]
+    simplified: bool = False
+    full_point_count: Optional[int] = None
+    degraded: bool = Field(False, description="True if this is a straight-line estimate because routing is unavailable")
 
 
 class RouteSuggestionResponse(BaseModel):
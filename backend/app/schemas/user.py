@@ -110,4 +110,6 @@ class Token(BaseModel):
 
 
 class TokenData(BaseModel):
-    email: Optional[str] = None 
\ No newline at end of file
+    email: Optional[str] = None
+    user_id: Optional[int] = None
+    issued_at: Optional[int] = None
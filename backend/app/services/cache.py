@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries are fresh for `ttl` seconds and may
+    then be served as stale for another `stale_ttl` seconds
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, stale_ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value, or None if it is missing or expired
+        """
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """
+        Return (value, is_stale); value is None if missing or past the stale window
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+
+        value, fresh_until, expires_at = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            del self._entries[key]
+            self.misses += 1
+            return None, False
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if fresh_until <= now:
+            self.stale_hits += 1
+            return value, True
+        return value, False
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+        """
+        fresh_until = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, fresh_until, fresh_until + self.stale_ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class SQLiteCache:
+    """On-disk key/value cache with expiry, shared by namespace"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "namespace TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "value TEXT NOT NULL, "
+            "fresh_until REAL NOT NULL, "
+            "expires_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._migrate()
+        self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """
+        Bring a cache file from before stale-while-revalidate up to date: its
+        expires_at was the end of freshness and there was no stale window
+        """
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache_entries)")}
+        if "fresh_until" not in columns:
+            self._conn.execute("ALTER TABLE cache_entries ADD COLUMN fresh_until REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE cache_entries SET fresh_until = expires_at")
+            logger.info(f"Added fresh_until to the map cache at {self.path}")
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Return (value, fresh_until) as a wall-clock timestamp, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, fresh_until, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= time.time():
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                )
+                self._conn.commit()
+                return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        payload = json.dumps(value, separators=(",", ":"))
+        fresh_until = time.time() + ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, fresh_until, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, payload, fresh_until, fresh_until + stale_ttl)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    Two-tier cache: a bounded in-process LRU in front of an optional
+    SQLite tier that survives restarts. Keys must be strings so they can
+    be stored on disk; values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        stale_ttl: float = 0.0,
+        disk: Optional[SQLiteCache] = None
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl, stale_ttl=stale_ttl)
+        self.disk = disk
+        self.disk_hits = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.get_entry(key))[0]
+
+    async def get_entry(self, key: str) -> Tuple[Optional[Any], bool]:
+        """
+        Return (value, is_stale), falling back to the disk tier on a memory miss
+        """
+        value, is_stale = self.memory.get_entry(key)
+        if value is not None or self.disk is None:
+            return value, is_stale
+
+        try:
+            row = await asyncio.to_thread(self.disk.get, self.namespace, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache read failed for {self.namespace}: {e}")
+            return None, False
+
+        if row is None:
+            return None, False
+
+        # Promote to the memory tier with whatever freshness is left on disk
+        value, fresh_until = row
+        remaining = fresh_until - time.time()
+        self.disk_hits += 1
+        self.memory.set(key, value, ttl=remaining)
+        return value, remaining <= 0
+
+    async def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is None:
+            return
+
+        try:
+            await asyncio.to_thread(self.disk.set, self.namespace, key, value, self.ttl, self.stale_ttl)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache write failed for {self.namespace}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        stats["ttl"] = self.ttl
+        stats["stale_ttl"] = self.stale_ttl
+        stats["disk_enabled"] = self.disk is not None
+        stats["disk_hits"] = self.disk_hits
+        return stats
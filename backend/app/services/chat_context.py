@@ -0,0 +1,138 @@
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.ai_chat import AIConversation, AIMessage, MessageSender
+
+logger = logging.getLogger(__name__)
+
+# context_data key holding the rolling summary of messages older than the window
+SUMMARY_KEY = "summary"
+
+SNIPPET_CHARS = 200  # per message in the extractive summary
+
+
+class ChatContext(NamedTuple):
+    summary: str  # earlier conversation, condensed; "" when nothing has left the window
+    messages: List[AIMessage]  # most recent messages, oldest first
+    context_data: Optional[Dict[str, Any]] = None  # conversation.context_data with the new summary; None if unchanged
+
+
+def estimate_tokens(message: AIMessage) -> int:
+    """Measured tokens for AI replies, roughly 4 characters per token otherwise"""
+    if message.tokens_used:
+        return message.tokens_used
+    return max(1, len(message.content or "") // 4)
+
+
+def summarize_messages(previous: str, messages: Sequence[AIMessage], max_chars: int) -> str:
+    """
+    Fold messages into the running summary: one clipped line per message,
+    keeping the most recent lines within max_chars
+    """
+    lines = previous.splitlines() if previous else []
+    for message in messages:
+        speaker = "User" if message.sender == MessageSender.USER else "Assistant"
+        content = " ".join((message.content or "").split())
+        if len(content) > SNIPPET_CHARS:
+            content = content[:SNIPPET_CHARS - 3] + "..."
+        lines.append(f"{speaker}: {content}")
+
+    summary, size = [], 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > max_chars:
+            break
+        summary.append(line)
+    return "\n".join(reversed(summary))
+
+
+def recent_messages_query(conversation_id: int, limit: int) -> Select:
+    """Newest messages first, read backwards along ix_ai_messages_conversation_id_created_at"""
+    return (
+        select(AIMessage)
+        .where(AIMessage.conversation_id == conversation_id)
+        .order_by(AIMessage.created_at.desc(), AIMessage.id.desc())
+        .limit(limit)
+    )
+
+
+async def load_chat_context(
+    db: AsyncSession,
+    conversation: AIConversation,
+    max_messages: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    summary_max_chars: Optional[int] = None
+) -> ChatContext:
+    """
+    The last `max_messages` messages that fit in `max_tokens`, plus the
+    cached summary of everything before them. Only messages that left the
+    window since the last call are read and folded into the summary, so the
+    cost per turn stays flat however long the conversation gets. Read-only:
+    an advanced summary comes back as ChatContext.context_data for the
+    caller to write with the rest of the turn.
+    """
+    if max_messages is None:
+        max_messages = settings.AI_CONTEXT_MAX_MESSAGES
+    if max_tokens is None:
+        max_tokens = settings.AI_CONTEXT_MAX_TOKENS
+    if summary_max_chars is None:
+        summary_max_chars = settings.AI_CONTEXT_SUMMARY_MAX_CHARS
+
+    result = await db.execute(recent_messages_query(conversation.id, max_messages))
+    recent = result.scalars().all()
+    window: List[AIMessage] = []
+    budget = max_tokens
+    for message in recent:
+        budget -= estimate_tokens(message)
+        if budget < 0 and window:
+            break
+        window.append(message)
+    window.reverse()
+
+    context_data: Dict[str, Any] = dict(conversation.context_data or {})
+    cached = context_data.get(SUMMARY_KEY) or {}
+    summary = cached.get("text", "")
+    # Ids are global, not per conversation, so the summary records where the
+    # window started rather than relying on the next message being id + 1, as
+    # window_start_id. Summaries written before that kept the id before it
+    window_started_at = cached.get("window_start_id", cached.get("through_message_id", -1) + 1)
+    # A short window holding every row means nothing has left it yet
+    whole_conversation = len(recent) < max_messages and len(window) == len(recent)
+    if whole_conversation or not window or window[0].id <= window_started_at:
+        return ChatContext(summary, window)
+
+    # Messages that left the window since the summary was written. Only the
+    # most recent batch is read: the summary keeps just its tail anyway
+    result = await db.execute(
+        select(AIMessage)
+        .where(
+            AIMessage.conversation_id == conversation.id,
+            AIMessage.id >= window_started_at,
+            AIMessage.id < window[0].id
+        )
+        .order_by(AIMessage.id.desc())
+        .limit(settings.AI_CONTEXT_SUMMARY_BATCH)
+    )
+    dropped = list(reversed(result.scalars().all()))
+    if dropped:
+        summary = summarize_messages(summary, dropped, summary_max_chars)
+        logger.debug(f"Folded {len(dropped)} messages into the summary of conversation {conversation.id}")
+    # Advanced even when nothing was folded in, so the same range isn't read again
+    context_data[SUMMARY_KEY] = {"text": summary, "window_start_id": window[0].id}
+    return ChatContext(summary, window, context_data)
+
+
+def prompt_messages(context: ChatContext, system_prompt: str, user_message: str) -> List[Dict[str, str]]:
+    """Chat-completion messages: system prompt, summary, recent history, then the new message"""
+    messages = [{"role": "system", "content": system_prompt}]
+    if context.summary:
+        messages.append({"role": "system", "content": f"Earlier in this conversation:\n{context.summary}"})
+    for message in context.messages:
+        role = "user" if message.sender == MessageSender.USER else "assistant"
+        messages.append({"role": role, "content": message.content})
+    messages.append({"role": "user", "content": user_message})
+    return messages
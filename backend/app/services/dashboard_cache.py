@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.schemas.dashboard import DashboardData
+from app.services.cache import TTLCache
+
+
+class DashboardCache:
+    """
+    Per-user cache of assembled DashboardData. Every invalidation bumps the
+    user's version, and a dashboard built from data read before the bump is
+    not stored, so a slow rebuild cannot re-cache stale numbers.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._entries = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._versions: Dict[int, int] = {}
+
+    def version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[DashboardData]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        version, data = entry
+        return data if version == self.version(user_id) else None
+
+    def set(self, user_id: int, data: DashboardData, version: int) -> None:
+        """
+        Store a dashboard built after reading `version`, unless it was invalidated since
+        """
+        if version == self.version(user_id):
+            self._entries.set(user_id, (version, data))
+
+    def invalidate(self, user_id: int) -> None:
+        self._versions[user_id] = self.version(user_id) + 1
+        self._entries.delete(user_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+
+dashboard_cache = DashboardCache(
+    max_entries=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl=settings.DASHBOARD_CACHE_TTL
+)
+
+
+def invalidate_dashboard(user_id: int) -> None:
+    """Drop a user's cached dashboard after their routes or goals change"""
+    dashboard_cache.invalidate(user_id)
@@ -0,0 +1,169 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+METERS_PER_DEGREE = 111_320.0
+# Web Mercator ground resolution at zoom 0 on the equator (meters per 256px-tile pixel)
+METERS_PER_PIXEL_Z0 = 156_543.03392
+
+# Polyline values are emitted in 5-bit chunks
+_CHUNK_SHIFTS = np.arange(0, 64, 5, dtype=np.uint64)
+_CHUNK_THRESHOLDS = np.uint64(1) << _CHUNK_SHIFTS[1:]
+
+
+def haversine_km(
+    lat: float,
+    lng: float,
+    lats: Sequence[float],
+    lngs: Sequence[float]
+) -> np.ndarray:
+    """
+    Great-circle distances in km from one origin to N points in a single
+    vectorized pass
+    """
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=np.float64)) - np.radians(lng)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def nearest(
+    lat: float,
+    lng: float,
+    lats: Sequence[float],
+    lngs: Sequence[float],
+    k: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and distances (km) of the k nearest points, closest first.
+    With k=None every point is returned sorted by distance. Selection uses
+    argpartition, so only the k winners are fully sorted.
+    """
+    distances = haversine_km(lat, lng, lats, lngs)
+    count = distances.shape[0]
+
+    if k is None or k >= count:
+        order = np.argsort(distances, kind="stable")
+    elif k <= 0:
+        order = np.empty(0, dtype=np.intp)
+    else:
+        candidates = np.argpartition(distances, k - 1)[:k]
+        order = candidates[np.argsort(distances[candidates], kind="stable")]
+
+    return order, distances[order]
+
+
+def encode_polyline(points: Sequence[Sequence[float]], precision: int = 5) -> str:
+    """
+    Encode [[lat, lng], ...] to a Google encoded polyline string.
+    Rounding, deltas, zig-zag and 5-bit chunking are done as NumPy array
+    operations, so the cost is linear in the number of points.
+    Use precision=5 for the standard format, 6 for OSRM/Valhalla polyline6.
+    """
+    if precision not in (5, 6):
+        raise ValueError("Polyline precision must be 5 or 6")
+
+    coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if coords.shape[0] == 0:
+        return ""
+
+    # Delta against the previously *rounded* values so decoding doesn't drift
+    scaled = np.round(coords * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+    # Number of 5-bit chunks per value (at least one)
+    counts = 1 + np.searchsorted(_CHUNK_THRESHOLDS, values, side="right")
+    max_chunks = int(counts.max())
+
+    chunks = ((values[:, None] >> _CHUNK_SHIFTS[:max_chunks]) & np.uint64(0x1f)).astype(np.uint8)
+    column = np.arange(max_chunks)
+    last = counts[:, None] - 1
+    chunks[column < last] |= 0x20
+    chunks += 63
+
+    return chunks[column <= last].tobytes().decode("ascii")
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> List[List[float]]:
+    """
+    Decode a Google encoded polyline string back to [[lat, lng], ...]
+    """
+    if precision not in (5, 6):
+        raise ValueError("Polyline precision must be 5 or 6")
+    if not encoded:
+        return []
+
+    data = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    ends = data < 0x20
+    if data.min() < 0 or not ends[-1]:
+        raise ValueError("Malformed polyline")
+
+    # Each value is a run of chunks terminated by one without the 0x20 flag
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    if starts.shape[0] % 2:
+        raise ValueError("Malformed polyline")
+    group = np.cumsum(np.concatenate(([0], ends[:-1])))
+    position = np.arange(data.shape[0]) - starts[group]
+
+    values = np.add.reduceat((data & 0x1f) << (5 * position), starts)
+    deltas = (values >> 1) ^ -(values & 1)
+    coords = np.cumsum(deltas.reshape(-1, 2), axis=0) / 10 ** precision
+    return coords.tolist()
+
+
+def zoom_tolerance_m(zoom: float, lat: float, pixels: float = 1.0) -> float:
+    """
+    Ground distance in meters covered by `pixels` screen pixels at a web-map
+    zoom level and latitude; detail smaller than this is invisible
+    """
+    return METERS_PER_PIXEL_Z0 * np.cos(np.radians(lat)) / (2 ** zoom) * pixels
+
+
+def simplify_polyline(points: Sequence[Sequence[float]], tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification of [[lat, lng], ...] with a tolerance in
+    meters. Coordinates are projected to a local equirectangular plane and
+    the farthest-point search of each segment is vectorized. Endpoints are
+    always kept.
+    """
+    coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    count = coords.shape[0]
+    if count < 3 or tolerance_m <= 0:
+        return coords
+
+    lat0 = np.radians(coords[:, 0].mean())
+    xy = np.column_stack((
+        coords[:, 1] * METERS_PER_DEGREE * np.cos(lat0),
+        coords[:, 0] * METERS_PER_DEGREE
+    ))
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        segment = xy[start + 1:end] - xy[start]
+        direction = xy[end] - xy[start]
+        length = np.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = np.hypot(segment[:, 0], segment[:, 1])
+        else:
+            distances = np.abs(direction[0] * segment[:, 1] - direction[1] * segment[:, 0]) / length
+
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance_m:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return coords[keep]
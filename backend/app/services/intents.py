@@ -0,0 +1,118 @@
+import enum
+import logging
+import pickle
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ChatIntent(str, enum.Enum):
+    """What a chat message is about"""
+    ROUTE = "route"
+    GOAL = "goal"
+    WEATHER = "weather"
+    SAFETY = "safety"
+    WELLNESS = "wellness"
+    GENERAL = "general"
+
+
+class IntentResult(NamedTuple):
+    intent: ChatIntent
+    confidence: float  # 0-1
+    source: str  # "keywords", "model" or "default"
+
+
+NO_INTENT = IntentResult(ChatIntent.GENERAL, 0.0, "default")
+
+# Substring keywords per intent, in priority order: when a message matches
+# several intents, the first one listed wins
+INTENT_KEYWORDS: Dict[ChatIntent, Tuple[str, ...]] = {
+    ChatIntent.ROUTE: ("route", "directions"),
+    ChatIntent.GOAL: ("goal", "progress"),
+    ChatIntent.WEATHER: ("weather",),
+    ChatIntent.SAFETY: ("safety", "secure"),
+    ChatIntent.WELLNESS: ("wellness", "health"),
+}
+
+
+class IntentClassifier:
+    """
+    Single-pass intent detection. The message is lowercased once and checked
+    against a flat, priority-ordered keyword table; confidence is the winning
+    intent's share of the matched keywords. (For a table this small, C-level
+    substring checks beat a regex alternation; see bench_intents.py.)
+    Messages without a keyword go to the optional model: any fitted
+    scikit-learn style estimator with predict_proba() and classes_ (e.g. a
+    TfidfVectorizer + LogisticRegression pipeline) whose classes are
+    ChatIntent values.
+    """
+
+    def __init__(
+        self,
+        keywords: Dict[ChatIntent, Tuple[str, ...]] = INTENT_KEYWORDS,
+        model: Optional[Any] = None,
+        model_threshold: float = 0.5
+    ):
+        self._keywords: Tuple[Tuple[str, ChatIntent], ...] = tuple(
+            (word.lower(), intent) for intent, words in keywords.items() for word in words
+        )
+        # Results are immutable, so the common ones are built once
+        self._unambiguous = {intent: IntentResult(intent, 1.0, "keywords") for intent in keywords}
+        self.model = model
+        self.model_threshold = model_threshold
+
+    def classify(self, message: str) -> IntentResult:
+        lower = message.lower()
+        matched = [intent for word, intent in self._keywords if word in lower]
+        if matched:
+            intent = matched[0]
+            hits = matched.count(intent)
+            if hits == len(matched):
+                return self._unambiguous[intent]
+            return IntentResult(intent, hits / len(matched), "keywords")
+
+        if self.model is not None:
+            try:
+                probabilities = self.model.predict_proba([message])[0]
+                best = max(range(len(probabilities)), key=probabilities.__getitem__)
+                if probabilities[best] >= self.model_threshold:
+                    return IntentResult(ChatIntent(self.model.classes_[best]), float(probabilities[best]), "model")
+            except Exception as e:
+                logger.warning(f"Intent model failed, falling back to keywords: {e}")
+
+        return NO_INTENT
+
+
+def load_intent_model(path: str) -> Optional[Any]:
+    """
+    Load a fitted estimator saved with joblib (or pickle). Returns None, with a
+    warning, when the file or scikit-learn is unavailable.
+    """
+    try:
+        try:
+            import joblib
+        except ImportError:
+            with open(path, "rb") as model_file:
+                return pickle.load(model_file)
+        return joblib.load(path)
+    except Exception as e:
+        logger.warning(f"Could not load intent model from {path}, using keywords only: {e}")
+        return None
+
+
+_classifier: Optional[IntentClassifier] = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    global _classifier
+    if _classifier is None:
+        model = load_intent_model(settings.AI_INTENT_MODEL_PATH) if settings.AI_INTENT_MODEL_PATH else None
+        _classifier = IntentClassifier(model=model, model_threshold=settings.AI_INTENT_MODEL_THRESHOLD)
+    return _classifier
+
+
+def classify_intent(message: str) -> IntentResult:
+    """Classify a chat message with the app-wide classifier"""
+    return get_intent_classifier().classify(message)
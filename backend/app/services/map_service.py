@@ -1,10 +1,23 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+import importlib.util
+import math
+from typing import List, Dict, Any, Optional, Set, Union
+from urllib.parse import urlparse
 from fastapi import HTTPException
 import logging
 
 # Import httpx for HTTP requests
 import httpx
+import numpy as np
+
+from app.core.config import settings
+from app.services.cache import SQLiteCache, TieredCache
+from app.services.geo import (
+    EARTH_RADIUS_KM, decode_polyline, encode_polyline, nearest, simplify_polyline, zoom_tolerance_m
+)
+from app.services.resilience import (
+    CallPriority, CircuitBreaker, CircuitOpenError, Priority, RateLimiter, SingleFlight
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,17 +26,185 @@ class MapService:
     """Service for handling map-related operations using free APIs"""
     
     def __init__(self):
-        self.nominatim_base_url = "https://nominatim.openstreetmap.org"
-        self.osrm_base_url = "https://router.project-osrm.org"
+        self.nominatim_base_url = settings.NOMINATIM_BASE_URL
+        self.osrm_base_url = settings.OSRM_BASE_URL
+        self._client: Optional[httpx.AsyncClient] = None
+        self._disk_cache: Optional[SQLiteCache] = None
+        self.geocode_cache = TieredCache(
+            "geocode",
+            max_entries=settings.GEOCODE_CACHE_MAX_ENTRIES,
+            ttl=settings.GEOCODE_CACHE_TTL
+        )
+        self.route_cache = TieredCache(
+            "route",
+            max_entries=settings.ROUTE_CACHE_MAX_ENTRIES,
+            ttl=settings.ROUTE_CACHE_TTL,
+            stale_ttl=settings.ROUTE_CACHE_STALE_TTL
+        )
+        # Identical concurrent upstream calls (misses and refreshes) share one request
+        self._flights = SingleFlight()
+        self._background_tasks: Set[asyncio.Task] = set()
+        # Client-side throttling per upstream host; interactive calls jump the queue
+        self._rate_limiters: Dict[str, RateLimiter] = {
+            urlparse(self.nominatim_base_url).netloc: RateLimiter(
+                settings.NOMINATIM_RATE_LIMIT, settings.NOMINATIM_RATE_BURST
+            ),
+            urlparse(self.osrm_base_url).netloc: RateLimiter(
+                settings.OSRM_RATE_LIMIT, settings.OSRM_RATE_BURST
+            )
+        }
+        # Fail fast while an upstream is down instead of waiting out its timeout
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {
+            host: CircuitBreaker(
+                host,
+                failure_threshold=settings.MAP_CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=settings.MAP_CIRCUIT_RECOVERY_TIMEOUT,
+                half_open_max_calls=settings.MAP_CIRCUIT_HALF_OPEN_MAX_CALLS
+            )
+            for host in self._rate_limiters
+        }
+    
+    async def startup(self) -> None:
+        """
+        Open the shared HTTP client and the on-disk cache tier
+        (called from the app lifespan)
+        """
+        if self._client is None:
+            self._client = self._create_client()
+        
+        if settings.MAP_CACHE_SQLITE_PATH and self._disk_cache is None:
+            self._disk_cache = SQLiteCache(settings.MAP_CACHE_SQLITE_PATH)
+            self.geocode_cache.disk = self._disk_cache
+            self.route_cache.disk = self._disk_cache
+    
+    async def shutdown(self) -> None:
+        """
+        Close the shared HTTP client and release pooled connections
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        
+        for task in list(self._background_tasks):
+            task.cancel()
+        
+        if self._disk_cache is not None:
+            self.geocode_cache.disk = None
+            self.route_cache.disk = None
+            self._disk_cache.close()
+            self._disk_cache = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared, keep-alive HTTP client for Nominatim and OSRM.
+        Created lazily so the service also works outside the app lifespan.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """
+        Build a pooled HTTP client from settings
+        """
+        http2 = settings.MAP_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("MAP_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=settings.MAP_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MAP_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.MAP_HTTP_KEEPALIVE_EXPIRY
+        )
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=limits,
+            timeout=httpx.Timeout(max(settings.NOMINATIM_TIMEOUT, settings.OSRM_TIMEOUT))
+        )
     
     async def search_places(
         self, 
         query: str, 
         user_location: Optional[Dict[str, float]] = None,
-        limit: int = 15
+        limit: int = 15,
+        priority: Priority = Priority.INTERACTIVE,
+        nearest_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for places using OpenStreetMap Nominatim API.
+        Results are cached per normalized query, rounded location, limit and
+        country; distances are always computed from the exact user location.
+        With a user location, results are sorted by distance and `nearest_k`
+        keeps only the k closest.
+        Background callers should pass Priority.BACKGROUND so interactive
+        searches are sent to Nominatim first.
+        """
+        search_location = self._round_location(user_location)
+        cache_key = self._geocode_cache_key(query, search_location, limit)
+        
+        places = await self.geocode_cache.get(cache_key)
+        if places is None:
+            places = await self._load_places(cache_key, query, search_location, limit, priority)
+        
+        if not user_location or not places:
+            return [dict(place) for place in places]
+        
+        return self.sort_by_distance(places, user_location, k=nearest_k)
+    
+    def sort_by_distance(
+        self,
+        places: List[Dict[str, Any]],
+        location: Dict[str, float],
+        k: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search for places using OpenStreetMap Nominatim API
+        Return copies of `places` with a "distance" (km) from `location`,
+        nearest first, computed in one vectorized pass; `k` keeps only the k nearest
+        """
+        order, distances = nearest(
+            location["lat"], location["lng"],
+            [place["lat"] for place in places],
+            [place["lng"] for place in places],
+            k=k
+        )
+        
+        results = []
+        for index, distance in zip(order.tolist(), distances.round(2).tolist()):
+            result = dict(places[index])
+            result["distance"] = distance
+            results.append(result)
+        return results
+    
+    async def _load_places(
+        self,
+        cache_key: str,
+        query: str,
+        search_location: Optional[Dict[str, float]],
+        limit: int,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch places and store them in the cache, coalescing concurrent identical
+        lookups; the shared lookup runs at the most urgent of its callers' priorities
+        """
+        async def load(call_priority: CallPriority) -> List[Dict[str, Any]]:
+            places = await self._fetch_places(query, search_location, limit, call_priority)
+            await self.geocode_cache.set(cache_key, places)
+            return places
+        
+        return await self._flights.do(f"geocode:{cache_key}", load, priority)
+    
+    async def _fetch_places(
+        self,
+        query: str,
+        search_location: Optional[Dict[str, float]],
+        limit: int,
+        priority: Union[Priority, CallPriority] = Priority.INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        """
+        Query Nominatim and convert the raw results to our place format
         """
         try:
             # Build search parameters
@@ -33,55 +214,48 @@ class MapService:
                 "limit": str(limit),
                 "addressdetails": "1",
                 "extratags": "1",
-                "countrycodes": "in"  # Focus on India
+                "countrycodes": settings.NOMINATIM_COUNTRY_CODES
             }
             
             # Add location-based search if user location is provided
-            if user_location:
-                lat, lng = user_location["lat"], user_location["lng"]
+            if search_location:
+                lat, lng = search_location["lat"], search_location["lng"]
                 params["viewbox"] = f"{lng-0.1},{lat+0.1},{lng+0.1},{lat-0.1}"
                 params["bounded"] = "1"
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.nominatim_base_url}/search",
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data:
-                    return []
-                
-                results = []
-                for place in data:
-                    result = {
-                        "name": place.get("display_name", "").split(",")[0] or place.get("name", "Unknown Location"),
-                        "type": place.get("type", "place"),
-                        "lat": float(place.get("lat", 0)),
-                        "lng": float(place.get("lon", 0)),
-                        "address": place.get("display_name", ""),
-                        "rating": 4.0,  # Default rating
-                        "place_id": place.get("place_id"),
-                        "osm_type": place.get("osm_type"),
-                        "osm_id": place.get("osm_id")
-                    }
-                    
-                    # Calculate distance if user location is available
-                    if user_location:
-                        result["distance"] = self._calculate_distance(
-                            user_location["lat"], user_location["lng"],
-                            result["lat"], result["lng"]
-                        )
-                    
-                    results.append(result)
-                
-                # Sort by distance if available
-                if user_location:
-                    results.sort(key=lambda x: x.get("distance", float('inf')))
-                
-                return results
+            response = await self._get(
+                self.nominatim_base_url,
+                f"{self.nominatim_base_url}/search",
+                params=params,
+                timeout=settings.NOMINATIM_TIMEOUT,
+                priority=priority
+            )
+            data = response.json()
+            
+            if not data:
+                return []
+            
+            return [
+                {
+                    "name": place.get("display_name", "").split(",")[0] or place.get("name", "Unknown Location"),
+                    "type": place.get("type", "place"),
+                    "lat": float(place.get("lat", 0)),
+                    "lng": float(place.get("lon", 0)),
+                    "address": place.get("display_name", ""),
+                    "rating": 4.0,  # Default rating
+                    "place_id": place.get("place_id"),
+                    "osm_type": place.get("osm_type"),
+                    "osm_id": place.get("osm_id")
+                }
+                for place in data
+            ]
                 
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping place search: {e}")
+            raise HTTPException(status_code=503, detail="Map service temporarily unavailable")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Nominatim returned {e.response.status_code} for a place search")
+            raise self._upstream_status_error(e, "Map service temporarily unavailable")
         except httpx.RequestError as e:
             logger.error(f"Error searching places: {e}")
             raise HTTPException(status_code=503, detail="Map service temporarily unavailable")
@@ -91,26 +265,227 @@ class MapService:
         
         return []  # This should never be reached, but satisfies the type checker
     
+    def _round_location(self, location: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+        """
+        Round a location to the geocode cache grid
+        """
+        if not location:
+            return None
+        precision = settings.GEOCODE_CACHE_COORD_PRECISION
+        return {
+            "lat": round(location["lat"], precision),
+            "lng": round(location["lng"], precision)
+        }
+    
+    def _geocode_cache_key(
+        self,
+        query: str,
+        search_location: Optional[Dict[str, float]],
+        limit: int
+    ) -> str:
+        """
+        Build the geocode cache key from the normalized search inputs
+        """
+        normalized_query = " ".join(query.lower().split())
+        location_key = f"{search_location['lat']},{search_location['lng']}" if search_location else "-"
+        return f"{normalized_query}|{location_key}|{limit}|{settings.NOMINATIM_COUNTRY_CODES}"
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Cache, request-coalescing, rate-limiter and circuit-breaker counters for the map service
+        """
+        return {
+            "caches": self.cache_stats(),
+            "single_flight": self._flights.stats(),
+            "rate_limiters": {
+                host: limiter.stats() for host, limiter in self._rate_limiters.items()
+            },
+            "circuit_breakers": {
+                host: breaker.stats() for host, breaker in self._circuit_breakers.items()
+            }
+        }
+    
+    def upstream_status(self) -> Dict[str, str]:
+        """
+        Circuit state of each upstream: operational, degraded (probing) or unavailable
+        """
+        labels = {
+            CircuitBreaker.CLOSED: "operational",
+            CircuitBreaker.HALF_OPEN: "degraded",
+            CircuitBreaker.OPEN: "unavailable"
+        }
+        return {
+            "nominatim": labels[self._circuit_breakers[urlparse(self.nominatim_base_url).netloc].state],
+            "osrm": labels[self._circuit_breakers[urlparse(self.osrm_base_url).netloc].state]
+        }
+    
+    async def _get(
+        self,
+        base_url: str,
+        url: str,
+        params: Dict[str, str],
+        timeout: float,
+        priority: Union[Priority, CallPriority] = Priority.INTERACTIVE
+    ) -> httpx.Response:
+        """
+        GET an upstream URL through its circuit breaker and rate limiter.
+        Raises CircuitOpenError without touching the network while the circuit is open.
+        """
+        host = urlparse(base_url).netloc
+        breaker = self._circuit_breakers[host]
+        breaker.before_call()
+        
+        try:
+            await self._rate_limiters[host].acquire(priority)
+            response = await self.client.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            # Only upstream-side problems count against the circuit
+            if e.response.status_code >= 500 or e.response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except httpx.RequestError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        
+        breaker.record_success()
+        return response
+    
+    def _upstream_status_error(self, error: httpx.HTTPStatusError, unavailable_detail: str) -> HTTPException:
+        """
+        Map an upstream error status to ours: an overloaded or failing
+        upstream (429, 5xx) is a 503, which calculate_route answers with an
+        estimate; any other status means we sent a bad request, a 502
+        """
+        status_code = error.response.status_code
+        if status_code == 429 or status_code >= 500:
+            retry_after = error.response.headers.get("Retry-After")
+            return HTTPException(
+                status_code=503,
+                detail=unavailable_detail,
+                headers={"Retry-After": retry_after} if retry_after else None
+            )
+        return HTTPException(status_code=502, detail="Unexpected response from the map service")
+    
+    def _osrm_error_code(self, response: httpx.Response) -> Optional[str]:
+        """
+        The "code" of an OSRM error body (e.g. NoRoute, NoSegment), if it has one
+        """
+        try:
+            body = response.json()
+        except ValueError:
+            return None
+        return body.get("code") if isinstance(body, dict) else None
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters for the map result caches
+        """
+        return {
+            "geocode": self.geocode_cache.stats(),
+            "route": self.route_cache.stats()
+        }
+    
     async def calculate_route(
         self,
         origin: Dict[str, float],
         destination: Dict[str, float],
-        transport_mode: str = "walking"
+        transport_mode: str = "walking",
+        priority: Priority = Priority.INTERACTIVE
     ) -> Dict[str, Any]:
         """
-        Calculate route using OSRM (Open Source Routing Machine)
+        Calculate route using OSRM (Open Source Routing Machine).
+        Endpoints are snapped to the route cache grid; cached routes are served
+        while fresh, and stale ones are served while being refreshed in the background.
+        If OSRM is unavailable and nothing is cached, a straight-line estimate
+        is returned with "degraded": True.
+        """
+        profile = self._osrm_profile(transport_mode)
+        snapped_origin = self._snap_to_grid(origin)
+        snapped_destination = self._snap_to_grid(destination)
+        cache_key = self._route_cache_key(profile, snapped_origin, snapped_destination)
+        
+        compact_route, is_stale = await self.route_cache.get_entry(cache_key)
+        if compact_route is None:
+            try:
+                compact_route = await self._load_route(
+                    cache_key, profile, snapped_origin, snapped_destination, priority
+                )
+            except HTTPException as e:
+                # OSRM is down or its circuit is open and nothing is cached:
+                # answer with a clearly-flagged straight-line estimate instead
+                if e.status_code != 503 or not settings.MAP_ROUTE_ESTIMATE_FALLBACK:
+                    raise
+                return self._estimate_route(origin, destination, transport_mode)
+        elif is_stale:
+            self._schedule_route_refresh(cache_key, profile, snapped_origin, snapped_destination)
+        
+        return self._expand_route(compact_route, transport_mode)
+    
+    async def calculate_routes(
+        self,
+        origin: Dict[str, float],
+        destination: Dict[str, float],
+        transport_modes: List[str]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Calculate routes for several transport modes concurrently.
+        Returns one entry per mode, in order; modes that fail or exceed
+        MAP_ROUTE_MODE_TIMEOUT are None so callers can return partial results.
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.MAP_ROUTE_CONCURRENCY))
+        
+        async def calculate_mode(transport_mode: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.calculate_route(origin, destination, transport_mode),
+                        timeout=settings.MAP_ROUTE_MODE_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Route calculation timed out for mode {transport_mode}")
+                except Exception as e:
+                    logger.warning(f"Route calculation failed for mode {transport_mode}: {e}")
+                return None
+        
+        return await asyncio.gather(*(calculate_mode(mode) for mode in transport_modes))
+    
+    async def _load_route(
+        self,
+        cache_key: str,
+        profile: str,
+        origin: Dict[str, float],
+        destination: Dict[str, float],
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Dict[str, Any]:
+        """
+        Fetch a route and store it in the cache, coalescing concurrent identical
+        requests. An interactive caller joining a background refresh raises the
+        refresh to interactive priority.
+        """
+        async def load(call_priority: CallPriority) -> Dict[str, Any]:
+            compact_route = await self._fetch_route(profile, origin, destination, call_priority)
+            await self.route_cache.set(cache_key, compact_route)
+            return compact_route
+        
+        return await self._flights.do(f"route:{cache_key}", load, priority)
+    
+    async def _fetch_route(
+        self,
+        profile: str,
+        origin: Dict[str, float],
+        destination: Dict[str, float],
+        priority: Union[Priority, CallPriority] = Priority.INTERACTIVE
+    ) -> Dict[str, Any]:
+        """
+        Query OSRM and return the compact route (encoded polyline plus steps)
         """
         try:
-            # Map transport modes to OSRM profiles
-            profile_map = {
-                "walking": "walking",
-                "cycling": "cycling", 
-                "driving": "driving",
-                "transit": "driving"  # OSRM doesn't support transit, fallback to driving
-            }
-            
-            profile = profile_map.get(transport_mode, "walking")
-            
             # Build OSRM request URL
             coords = f"{origin['lng']},{origin['lat']};{destination['lng']},{destination['lat']}"
             url = f"{self.osrm_base_url}/route/v1/{profile}/{coords}"
@@ -122,55 +497,57 @@ class MapService:
                 "annotations": "true"
             }
             
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if data.get("code") != "Ok" or not data.get("routes"):
-                    raise HTTPException(status_code=404, detail="No route found")
-                
-                route = data["routes"][0]
-                leg = route["legs"][0]
-                
-                # Convert GeoJSON coordinates to [lat, lng] format
-                points = [
-                    [coord[1], coord[0]] for coord in route["geometry"]["coordinates"]
-                ]
-                
-                # Convert steps to our format
-                steps = []
-                for step in leg.get("steps", []):
-                    step_data = {
-                        "distance": {
-                            "text": f"{round(step['distance'])}m",
-                            "value": step["distance"]
-                        },
-                        "duration": {
-                            "text": f"{round(step['duration'])}s", 
-                            "value": step["duration"]
-                        },
-                        "instruction": step.get("maneuver", {}).get("instruction", "Continue"),
-                        "maneuver": step.get("maneuver", {})
-                    }
-                    steps.append(step_data)
-                
-                return {
-                    "distance": f"{round(leg['distance'])}m",
-                    "duration": f"{round(leg['duration'])}s",
-                    "distance_value": leg["distance"],  # meters
-                    "duration_value": leg["duration"],  # seconds
-                    "points": points,
-                    "steps": steps,
-                    "polyline": self._encode_polyline(points),
-                    "summary": {
-                        "total_distance": leg["distance"],
-                        "total_duration": leg["duration"],
-                        "transport_mode": transport_mode
-                    }
+            response = await self._get(
+                self.osrm_base_url,
+                url,
+                params=params,
+                timeout=settings.OSRM_TIMEOUT,
+                priority=priority
+            )
+            
+            data = response.json()
+            
+            if data.get("code") != "Ok" or not data.get("routes"):
+                raise HTTPException(status_code=404, detail="No route found")
+            
+            route = data["routes"][0]
+            leg = route["legs"][0]
+            
+            # Convert GeoJSON [lng, lat] coordinates to a [lat, lng] array
+            points = np.asarray(route["geometry"]["coordinates"], dtype=np.float64).reshape(-1, 2)[:, ::-1]
+            
+            # Convert steps to our format
+            steps = []
+            for step in leg.get("steps", []):
+                step_data = {
+                    "distance": {
+                        "text": f"{round(step['distance'])}m",
+                        "value": step["distance"]
+                    },
+                    "duration": {
+                        "text": f"{round(step['duration'])}s", 
+                        "value": step["duration"]
+                    },
+                    "instruction": step.get("maneuver", {}).get("instruction", "Continue"),
+                    "maneuver": step.get("maneuver", {})
                 }
+                steps.append(step_data)
+            
+            return {
+                "distance_value": leg["distance"],  # meters
+                "duration_value": leg["duration"],  # seconds
+                "polyline": encode_polyline(points),
+                "steps": steps
+            }
                 
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping route calculation: {e}")
+            raise HTTPException(status_code=503, detail="Routing service temporarily unavailable")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"OSRM returned {e.response.status_code} for a route")
+            if self._osrm_error_code(e.response) in ("NoRoute", "NoSegment"):
+                raise HTTPException(status_code=404, detail="No route found")
+            raise self._upstream_status_error(e, "Routing service temporarily unavailable")
         except httpx.RequestError as e:
             logger.error(f"Error calculating route: {e}")
             raise HTTPException(status_code=503, detail="Routing service temporarily unavailable")
@@ -182,6 +559,151 @@ class MapService:
         
         return {}  # This should never be reached, but satisfies the type checker
     
+    def _expand_route(self, compact_route: Dict[str, Any], transport_mode: str) -> Dict[str, Any]:
+        """
+        Build the full route response from a compact (cached) route
+        """
+        distance = compact_route["distance_value"]
+        duration = compact_route["duration_value"]
+        return {
+            "distance": f"{round(distance)}m",
+            "duration": f"{round(duration)}s",
+            "distance_value": distance,  # meters
+            "duration_value": duration,  # seconds
+            "points": decode_polyline(compact_route["polyline"]),
+            "steps": compact_route["steps"],
+            "polyline": compact_route["polyline"],
+            "summary": {
+                "total_distance": distance,
+                "total_duration": duration,
+                "transport_mode": transport_mode
+            },
+            "degraded": False
+        }
+    
+    def simplify_route(
+        self,
+        route_data: Dict[str, Any],
+        tolerance: Optional[float] = None,
+        zoom: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Return a copy of a route whose points and polyline are simplified
+        for display. An explicit tolerance (meters) wins over a zoom level;
+        with neither, ROUTE_SIMPLIFY_TOLERANCE is used.
+        """
+        points = route_data["points"]
+        if tolerance is None and zoom is not None and points:
+            tolerance = zoom_tolerance_m(zoom, points[0][0], settings.ROUTE_SIMPLIFY_PIXEL_TOLERANCE)
+        if tolerance is None:
+            tolerance = settings.ROUTE_SIMPLIFY_TOLERANCE
+        
+        simplified = simplify_polyline(points, tolerance)
+        if len(simplified) == len(points):
+            return route_data
+        
+        return {
+            **route_data,
+            "points": simplified.tolist(),
+            "polyline": encode_polyline(simplified),
+            "simplified": True,
+            "full_point_count": len(points)
+        }
+    
+    def _estimate_route(
+        self,
+        origin: Dict[str, float],
+        destination: Dict[str, float],
+        transport_mode: str
+    ) -> Dict[str, Any]:
+        """
+        Straight-line (haversine) route estimate used while OSRM is unavailable
+        """
+        # Typical average speeds in km/h
+        speeds = {"walking": 5.0, "cycling": 15.0, "driving": 40.0, "transit": 25.0}
+        
+        distance = self._calculate_distance(
+            origin["lat"], origin["lng"], destination["lat"], destination["lng"]
+        ) * 1000  # meters
+        duration = distance / (speeds.get(transport_mode, speeds["walking"]) / 3.6)  # seconds
+        points = [[origin["lat"], origin["lng"]], [destination["lat"], destination["lng"]]]
+        
+        return {
+            "distance": f"{round(distance)}m",
+            "duration": f"{round(duration)}s",
+            "distance_value": distance,  # meters
+            "duration_value": duration,  # seconds
+            "points": points,
+            "steps": [],
+            "polyline": encode_polyline(points),
+            "summary": {
+                "total_distance": distance,
+                "total_duration": duration,
+                "transport_mode": transport_mode,
+                "estimated": True
+            },
+            "degraded": True
+        }
+    
+    def _schedule_route_refresh(
+        self,
+        cache_key: str,
+        profile: str,
+        origin: Dict[str, float],
+        destination: Dict[str, float]
+    ) -> None:
+        """
+        Revalidate a stale cached route in the background (at most once per key)
+        """
+        if self._flights.in_flight(f"route:{cache_key}"):
+            return
+        
+        task = asyncio.create_task(
+            self._load_route(cache_key, profile, origin, destination, Priority.BACKGROUND)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+    
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background route refresh failed: {task.exception()}")
+    
+    def _osrm_profile(self, transport_mode: str) -> str:
+        """
+        Map transport modes to OSRM profiles
+        """
+        profile_map = {
+            "walking": "walking",
+            "cycling": "cycling", 
+            "driving": "driving",
+            "transit": "driving"  # OSRM doesn't support transit, fallback to driving
+        }
+        return profile_map.get(transport_mode, "walking")
+    
+    def _snap_to_grid(self, location: Dict[str, float]) -> Dict[str, float]:
+        """
+        Snap a location to the route cache grid (ROUTE_CACHE_GRID_METERS)
+        """
+        step = settings.ROUTE_CACHE_GRID_METERS / 111_320  # meters per degree of latitude
+        if step <= 0:
+            return {"lat": location["lat"], "lng": location["lng"]}
+        return {
+            "lat": round(round(location["lat"] / step) * step, 6),
+            "lng": round(round(location["lng"] / step) * step, 6)
+        }
+    
+    def _route_cache_key(
+        self,
+        profile: str,
+        origin: Dict[str, float],
+        destination: Dict[str, float]
+    ) -> str:
+        """
+        Build the route cache key from the OSRM profile and snapped endpoints
+        """
+        return f"{profile}|{origin['lat']},{origin['lng']};{destination['lat']},{destination['lng']}"
+    
     def _calculate_distance(
         self, 
         lat1: float, 
@@ -191,10 +713,9 @@ class MapService:
     ) -> float:
         """
         Calculate distance between two points using Haversine formula
+        (use sort_by_distance / app.services.geo for many points)
         """
-        import math
-        
-        R = 6371  # Earth's radius in km
+        R = EARTH_RADIUS_KM
         
         lat1_rad = math.radians(lat1)
         lng1_rad = math.radians(lng1)
@@ -212,44 +733,6 @@ class MapService:
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
         
         return round(R * c, 2)
-    
-    def _encode_polyline(self, points: List[List[float]]) -> str:
-        """
-        Encode points to polyline format for compatibility
-        """
-        if not points:
-            return ""
-        
-        encoded = ""
-        lat = 0
-        lng = 0
-        
-        for point in points:
-            point_lat, point_lng = point[0], point[1]
-            
-            dlat = round((point_lat - lat) * 1e5)
-            dlng = round((point_lng - lng) * 1e5)
-            
-            lat = point_lat
-            lng = point_lng
-            
-            encoded += self._encode_number(dlat) + self._encode_number(dlng)
-        
-        return encoded
-    
-    def _encode_number(self, num: int) -> str:
-        """
-        Encode a number for polyline format
-        """
-        encoded = ""
-        value = ~(num << 1) if num < 0 else (num << 1)
-        
-        while value >= 0x20:
-            encoded += chr(((value & 0x1f) | 0x20) + 63)
-            value >>= 5
-        
-        encoded += chr(value + 63)
-        return encoded
 
 
 # Global instance
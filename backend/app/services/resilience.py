@@ -0,0 +1,312 @@
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight task.
+    Callers await a shielded view of the shared task, so a caller that is
+    cancelled (e.g. by a per-request timeout) does not cancel the call for
+    everyone else.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._priorities: Dict[Hashable, "CallPriority"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[..., Awaitable[T]],
+        priority: Optional["Priority"] = None
+    ) -> T:
+        """
+        Run fn() unless a call with the same key is already running, in
+        which case wait for and share its result (or exception).
+        With a priority, fn is called with the flight's CallPriority, and a
+        caller joining with a more urgent priority raises it for the flight.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            if priority is not None and key in self._priorities:
+                self._priorities[key].raise_to(priority)
+            return await asyncio.shield(task)
+
+        self.calls += 1
+        if priority is None:
+            task = asyncio.ensure_future(fn())
+        else:
+            call_priority = CallPriority(priority)
+            self._priorities[key] = call_priority
+            task = asyncio.ensure_future(fn(call_priority))
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            self._priorities.pop(key, None)
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced
+        }
+
+
+class Priority(enum.IntEnum):
+    """Queue priority for rate-limited upstream calls (lower goes first)"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class CallPriority:
+    """
+    Priority of an upstream call that several callers share. It can only be
+    raised; raising it also moves a rate-limiter wait the call is queued in
+    up the queue.
+    """
+
+    def __init__(self, priority: Priority):
+        self.priority = priority
+        self._queued: Optional[Tuple["RateLimiter", "asyncio.Future[None]"]] = None
+
+    def raise_to(self, priority: Priority) -> None:
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        if self._queued is not None:
+            limiter, waiter = self._queued
+            limiter._requeue(waiter, priority)
+
+
+class RateLimiter:
+    """
+    Async token bucket with a priority queue of waiters. Tokens refill at
+    `rate` per second up to `burst`; when the bucket is empty, waiters are
+    released in priority order (FIFO within the same priority).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at: Optional[float] = None
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+
+        # Metrics
+        self.acquired = 0
+        self.queued = 0
+        self.peak_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self, priority: Union[Priority, CallPriority] = Priority.INTERACTIVE) -> None:
+        """
+        Wait until a token is available for this caller. A CallPriority
+        raised while waiting moves the wait up the queue.
+        """
+        if self.rate <= 0:
+            return
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        self._refill(started_at)
+
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record_wait(0.0)
+            return
+
+        call_priority = priority if isinstance(priority, CallPriority) else None
+        level = call_priority.priority if call_priority is not None else priority
+        waiter: "asyncio.Future[None]" = loop.create_future()
+        heapq.heappush(self._waiters, (int(level), next(self._sequence), waiter))
+        self.queued += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        if call_priority is not None:
+            call_priority._queued = (self, waiter)
+        # A cancelled waiter stays in the heap as done() and is skipped by the dispatcher
+        try:
+            await waiter
+        finally:
+            if call_priority is not None:
+                call_priority._queued = None
+        self._record_wait(loop.time() - started_at)
+
+    def _requeue(self, waiter: "asyncio.Future[None]", priority: Priority) -> None:
+        """
+        Queue a waiter again at a more urgent priority; its old entry is
+        skipped once the waiter is released
+        """
+        if not waiter.done():
+            heapq.heappush(self._waiters, (int(priority), next(self._sequence), waiter))
+
+    @property
+    def queue_depth(self) -> int:
+        # A requeued waiter has more than one entry
+        return len({waiter for _, _, waiter in self._waiters if not waiter.done()})
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+
+            self._refill(loop.time())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                _, _, waiter = heapq.heappop(self._waiters)
+                waiter.set_result(None)
+                continue
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def _refill(self, now: float) -> None:
+        if self._updated_at is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _record_wait(self, waited: float) -> None:
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2)
+        }
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the upstream circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. After `failure_threshold` failures
+    the circuit opens and calls fail fast; once `recovery_timeout` has
+    passed it goes half-open and lets `half_open_max_calls` probes through.
+    A successful probe closes the circuit, a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+        # Metrics
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Reserve a call slot or raise CircuitOpenError
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return
+
+        self.rejected += 1
+        retry_after = max(0.0, self._opened_at + self.recovery_timeout - self._clock())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        if self._state == self.HALF_OPEN:
+            logger.info(f"Circuit for {self.name} closed after a successful probe")
+        self._state = self.CLOSED
+        self._failures = 0
+        self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit for {self.name} opened after {self._failures} failure(s)")
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+            self._half_open_calls = 0
+
+    def release(self) -> None:
+        """
+        Give back a half-open slot for a call that ended without a verdict
+        (e.g. it was cancelled)
+        """
+        if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_timeout": self.recovery_timeout,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
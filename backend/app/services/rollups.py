@@ -0,0 +1,236 @@
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.route import Route, RouteStatus
+from app.models.user_stats import UserDailyCount, UserDailyStats
+
+# The fields of a route that feed user_daily_stats
+RouteSnapshot = Dict[str, Any]
+
+
+def route_snapshot(route: Route) -> RouteSnapshot:
+    """
+    Capture what a route contributes to the rollup. Take one before and one
+    after changing a route and pass both to record_route_change. A new route
+    must be flushed first: it is bucketed by the database's created_at, the
+    same value rebuild_user_daily_stats and the backfill read.
+    """
+    created_at = route.created_at
+    if created_at is None:
+        raise ValueError("Flush the route before taking a snapshot; created_at is set by the database")
+    transport_mode = route.transport_mode
+    return {
+        "day": created_at.date(),
+        "hour": created_at.hour,
+        "completed": route.status == RouteStatus.COMPLETED,
+        "distance": route.distance or 0.0,
+        "duration": route.duration or 0.0,
+        "rating": route.rating,
+        "transport_mode": getattr(transport_mode, "value", transport_mode),
+        "destination": route.destination
+    }
+
+
+# Delta columns of the two rollup tables
+DAY_FIELDS = ("route_count", "completed_count", "total_distance", "total_duration", "rating_sum", "rating_count")
+COUNT_FIELDS = ("count", "rating_sum", "rating_count")
+
+DayKey = date
+CountKey = Tuple[date, str, str]  # (day, dimension, key)
+
+
+def snapshot_deltas(
+    changes: Iterable[Tuple[Optional[RouteSnapshot], Optional[RouteSnapshot]]]
+) -> Tuple[Dict[DayKey, Dict[str, float]], Dict[CountKey, Dict[str, float]]]:
+    """
+    Net change to each day row and histogram counter for a batch of
+    (before, after) snapshots; entries that cancel out are left out
+    """
+    days: Dict[DayKey, Dict[str, float]] = {}
+    counts: Dict[CountKey, Dict[str, float]] = {}
+    for before, after in changes:
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            rated = snapshot["rating"] is not None
+            rating = sign * snapshot["rating"] if rated else 0
+
+            totals = days.setdefault(snapshot["day"], dict.fromkeys(DAY_FIELDS, 0))
+            totals["route_count"] += sign
+            totals["completed_count"] += sign * int(snapshot["completed"])
+            totals["total_distance"] += sign * snapshot["distance"]
+            totals["total_duration"] += sign * snapshot["duration"]
+            totals["rating_sum"] += rating
+            totals["rating_count"] += sign * int(rated)
+
+            for dimension, key in (("transport", snapshot["transport_mode"]),
+                                   ("hour", str(snapshot["hour"])),
+                                   ("destination", snapshot["destination"])):
+                counter = counts.setdefault((snapshot["day"], dimension, key), dict.fromkeys(COUNT_FIELDS, 0))
+                counter["count"] += sign
+                if dimension == "destination":
+                    counter["rating_sum"] += rating
+                    counter["rating_count"] += sign * int(rated)
+
+    return (
+        {day: totals for day, totals in days.items() if any(totals.values())},
+        {key: counter for key, counter in counts.items() if any(counter.values())}
+    )
+
+
+# INSERT constructs with ON CONFLICT DO UPDATE, by dialect
+UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def _upsert(db: AsyncSession, model: Any, index_elements: List[str], fields: Sequence[str], **extra: Any) -> Any:
+    """INSERT ... ON CONFLICT DO UPDATE that adds the inserted values to the existing row's"""
+    dialect = db.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise NotImplementedError(f"Rollup upserts are not supported on {dialect}")
+    statement = UPSERT_INSERTS[dialect](model)
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={
+            **{field: getattr(model, field) + getattr(statement.excluded, field) for field in fields},
+            **extra
+        }
+    )
+
+
+async def record_route_change(
+    db: AsyncSession,
+    user_id: int,
+    before: Optional[RouteSnapshot],
+    after: Optional[RouteSnapshot]
+) -> None:
+    """
+    Move a route's contribution from `before` to `after` in the caller's
+    transaction. Pass before=None for a new route and after=None for a
+    deleted one.
+    """
+    await record_route_changes(db, user_id, [(before, after)])
+
+
+async def record_route_changes(
+    db: AsyncSession,
+    user_id: int,
+    changes: Iterable[Tuple[Optional[RouteSnapshot], Optional[RouteSnapshot]]]
+) -> None:
+    """
+    record_route_change for several of a user's routes at once (e.g. a bulk
+    delete). The rows are never read: deltas are added in the database with
+    one upsert per table, so concurrent writers for the same user and day
+    neither lose increments nor race to create the day row. Rows that drop
+    to zero are removed by a conditional DELETE.
+    """
+    days, counts = snapshot_deltas((before, after) for before, after in changes if before != after)
+
+    if days:
+        await db.execute(
+            _upsert(db, UserDailyStats, ["user_id", "day"], DAY_FIELDS, updated_at=func.now()),
+            [{"user_id": user_id, "day": day, **totals} for day, totals in days.items()]
+        )
+    if counts:
+        await db.execute(
+            _upsert(db, UserDailyCount, ["user_id", "day", "dimension", "key"], COUNT_FIELDS),
+            [
+                {"user_id": user_id, "day": day, "dimension": dimension, "key": key, **counter}
+                for (day, dimension, key), counter in counts.items()
+            ]
+        )
+
+    # Only a removal can empty a row. A route that predates the rollup leaves
+    # a negative row behind, which goes here as well
+    emptied_days = [day for day, totals in days.items() if totals["route_count"] < 0]
+    if emptied_days:
+        await db.execute(
+            delete(UserDailyStats).where(
+                UserDailyStats.user_id == user_id,
+                UserDailyStats.day.in_(emptied_days),
+                UserDailyStats.route_count <= 0
+            )
+        )
+    emptied_counts = {day for (day, _, _), counter in counts.items() if counter["count"] < 0}
+    if emptied_counts:
+        await db.execute(
+            delete(UserDailyCount).where(
+                UserDailyCount.user_id == user_id,
+                UserDailyCount.day.in_(emptied_counts),
+                UserDailyCount.count <= 0
+            )
+        )
+
+
+def summarize(rows: Iterable[UserDailyStats], counts: Iterable[UserDailyCount]) -> Dict[str, Any]:
+    """
+    Merge day rows and their histogram counters into totals and histograms
+    for analytics
+    """
+    summary: Dict[str, Any] = {
+        "route_count": 0,
+        "completed_count": 0,
+        "total_distance": 0.0,
+        "total_duration": 0.0,
+        "rating_sum": 0.0,
+        "rating_count": 0,
+        "transport_counts": {},
+        "hour_counts": {},
+        "destinations": {}
+    }
+    for row in rows:
+        summary["route_count"] += row.route_count or 0
+        summary["completed_count"] += row.completed_count or 0
+        summary["total_distance"] += row.total_distance or 0.0
+        summary["total_duration"] += row.total_duration or 0.0
+        summary["rating_sum"] += row.rating_sum or 0.0
+        summary["rating_count"] += row.rating_count or 0
+    for counter in counts:
+        if counter.dimension == "transport":
+            summary["transport_counts"][counter.key] = summary["transport_counts"].get(counter.key, 0) + counter.count
+        elif counter.dimension == "hour":
+            hour = int(counter.key)
+            summary["hour_counts"][hour] = summary["hour_counts"].get(hour, 0) + counter.count
+        else:
+            totals = summary["destinations"].setdefault(counter.key, [0, 0.0, 0])
+            totals[0] += counter.count
+            totals[1] += counter.rating_sum
+            totals[2] += counter.rating_count
+    return summary
+
+
+def busiest_hours(hour_counts: Dict[int, int], top: int = 5) -> List[int]:
+    """The `top` busiest hours, in clock order"""
+    busiest = sorted(hour_counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+    return sorted(hour for hour, _ in busiest)
+
+
+def most_visited_destinations(destinations: Dict[str, List[float]], top: int = 3) -> List[Dict[str, Any]]:
+    """Most visited destinations with their average rating"""
+    ranked = sorted(destinations.items(), key=lambda item: (-item[1][0], item[0]))[:top]
+    return [
+        {
+            "name": name,
+            "visits": int(visits),
+            "avg_rating": round(rating_sum / rating_count, 1) if rating_count else 0.0
+        }
+        for name, (visits, rating_sum, rating_count) in ranked
+    ]
+
+
+async def rebuild_user_daily_stats(db: AsyncSession, user_id: int) -> int:
+    """
+    Recompute a user's rollup from their routes (backfill or repair).
+    Returns the number of day rows written; the caller commits.
+    """
+    await db.execute(delete(UserDailyCount).where(UserDailyCount.user_id == user_id))
+    await db.execute(delete(UserDailyStats).where(UserDailyStats.user_id == user_id))
+
+    result = await db.execute(select(Route).where(Route.user_id == user_id))
+    snapshots = [route_snapshot(route) for route in result.scalars().all()]
+    await record_route_changes(db, user_id, [(None, snapshot) for snapshot in snapshots])
+    return len({snapshot["day"] for snapshot in snapshots})
@@ -0,0 +1,74 @@
+import copy
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.cache import TTLCache
+
+
+class UserCache:
+    """
+    Short-lived cache of authenticated users, keyed by the token's (subject,
+    iat). Entries hold column values rather than ORM instances, so each
+    request gets its own User attached to its own session without a query.
+    A write to a user bumps their version, which hides older entries, and a
+    user loaded before any invalidation that happened during the load is
+    not stored.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._entries = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._versions: Dict[int, int] = {}
+        self._generation = 0
+
+    def generation(self) -> int:
+        """Changes on every invalidation; read it before loading a user to pass to set()"""
+        return self._generation
+
+    async def get(self, db: AsyncSession, key: Hashable) -> Optional[User]:
+        """Return the cached user merged into `db` (no SQL), or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        user_id, version, values = entry
+        if version != self._versions.get(user_id, 0):
+            return None
+
+        user = User(**copy.deepcopy(values))
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    def set(self, key: Hashable, user: User, generation: int) -> None:
+        """
+        Store a user loaded after reading `generation`, unless any user was invalidated since
+        """
+        if generation != self._generation:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+        self._entries.set(key, (user.id, self._versions.get(user.id, 0), copy.deepcopy(values)))
+
+    def invalidate(self, user_id: int) -> None:
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._generation += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions.clear()
+        self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+
+user_cache = UserCache(
+    max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_USER_CACHE_TTL
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user's cached row after their profile, preferences or stats change"""
+    user_cache.invalidate(user_id)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chat turns/sec with concurrent writers on a SQLite file (WAL),
+comparing the previous chat_with_ai write path (commit + refresh for a new
+conversation, then flush, stats update, commit + refresh for the messages)
+with the current single-transaction path. Half the turns start a new
+conversation and half continue one, each writer using its own session.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints.ai import chat_with_ai, generate_ai_response
+from app.core.database import Base, create_database_engine
+from app.models import AIConversation, AIMessage, MessageSender, MessageType, User
+from app.schemas.ai_chat import ChatRequest
+from app.services.intents import classify_intent
+
+WRITERS = 16
+TURNS_PER_WRITER = 40
+
+
+async def legacy_chat_turn(chat_request: ChatRequest, current_user: User, db: AsyncSession) -> int:
+    """The write sequence chat_with_ai used before the single-commit change"""
+    conversation_id = chat_request.conversation_id
+    if not conversation_id:
+        conversation = AIConversation(user_id=current_user.id, title=chat_request.message[:50],
+                                      context_data=chat_request.context)
+        db.add(conversation)
+        await db.commit()
+        await db.refresh(conversation)
+        conversation_id = conversation.id
+
+    db.add(AIMessage(conversation_id=conversation_id, sender=MessageSender.USER,
+                     content=chat_request.message, message_metadata=chat_request.context or {}))
+    content = generate_ai_response(classify_intent(chat_request.message).intent, current_user)
+    ai_message = AIMessage(conversation_id=conversation_id, sender=MessageSender.AI, content=content,
+                           message_type=MessageType.TEXT, tokens_used=len(content.split()), processing_time=0.5)
+    db.add(ai_message)
+    await db.flush()
+    await db.execute(
+        update(AIConversation)
+        .where(AIConversation.id == conversation_id)
+        .values(
+            message_count=AIConversation.message_count + 2,
+            last_message_at=select(func.max(AIMessage.created_at))
+            .where(AIMessage.conversation_id == conversation_id)
+            .scalar_subquery()
+        )
+    )
+    await db.commit()
+    await db.refresh(ai_message)
+    return conversation_id
+
+
+async def current_chat_turn(chat_request: ChatRequest, current_user: User, db: AsyncSession) -> int:
+    response = await chat_with_ai(chat_request, current_user=current_user, db=db)
+    return response.conversation_id
+
+
+async def run(label: str, turn) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_database_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'chat.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with session_factory() as session:
+            users = [User(email=f"writer{i}@example.com", username=f"writer{i}", hashed_password="x")
+                     for i in range(WRITERS)]
+            session.add_all(users)
+            await session.commit()
+
+        errors = []
+
+        async def writer(user: User) -> None:
+            conversation_id = None
+            for i in range(TURNS_PER_WRITER):
+                # Every other turn starts a new conversation
+                request = ChatRequest(message="Find me a route to the park",
+                                      conversation_id=conversation_id if i % 2 else None)
+                try:
+                    async with session_factory() as session:
+                        conversation_id = await turn(request, user, session)
+                except Exception as e:
+                    errors.append(e)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(writer(user) for user in users))
+        elapsed = time.perf_counter() - started
+
+        async with session_factory() as session:
+            messages = await session.scalar(select(func.count(AIMessage.id)))
+        await engine.dispose()
+
+    turns = WRITERS * TURNS_PER_WRITER - len(errors)
+    print(f"{label:<8} {turns / elapsed:7.1f} turns/s  {elapsed:6.2f} s  "
+          f"({messages} messages, {len(errors)} failed turns)")
+
+
+async def main() -> None:
+    print(f"{WRITERS} concurrent writers x {TURNS_PER_WRITER} turns\n")
+    await run("before", legacy_chat_turn)
+    await run("after", current_chat_turn)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: requests/sec on GET /api/v1/routes/ with the previous engine
+(NullPool, default SQLite settings) vs the pooled engine with WAL PRAGMAs.
+Runs in-process through httpx's ASGI transport against a temporary
+SQLite file, so it measures the app + database, not the network.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.auth import create_access_token
+from app.core.database import Base, create_database_engine, get_db
+from app.models.route import Route, TransportMode
+from app.models.user import User
+from main import app
+
+ROUTES = 200
+REQUESTS = 1000
+CONCURRENCY = 20
+EMAIL = "bench@example.com"
+
+
+async def seed(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        user = User(email=EMAIL, username="bench", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        session.add_all([
+            Route(
+                user_id=user.id,
+                title=f"Route {i}",
+                origin="Connaught Place",
+                destination="India Gate",
+                transport_mode=TransportMode.WALKING,
+                distance=2.5,
+                duration=30.0
+            )
+            for i in range(ROUTES)
+        ])
+        await session.commit()
+
+
+async def run(label: str, engine) -> float:
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+    remaining = iter(range(REQUESTS))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        # Warm up
+        response = await client.get("/api/v1/routes/", headers=headers)
+        assert response.status_code == 200, response.text
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/api/v1/routes/", headers=headers)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+
+    app.dependency_overrides.clear()
+    rps = REQUESTS / elapsed
+    print(f"   {label:<28} {rps:8.1f} req/s  ({elapsed * 1000 / REQUESTS:.2f} ms/request)")
+    return rps
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+
+        before_engine = create_async_engine(url, poolclass=NullPool)
+        await seed(before_engine)
+
+        print(f"🗄️  GET /routes/ x{REQUESTS}, concurrency {CONCURRENCY}, {ROUTES} routes in table")
+        before = await run("NullPool (before)", before_engine)
+        await before_engine.dispose()
+
+        after_engine = create_database_engine(url)
+        after = await run("Pooled + WAL PRAGMAs (after)", after_engine)
+        await after_engine.dispose()
+
+    print(f"🚀 Speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
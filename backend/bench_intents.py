@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: messages/sec for the chat reply, suggestions and quick actions
+on a synthetic corpus. "before" replays the previous helpers, each of which
+lowercased the message and ran its own chain of substring checks; "after"
+classifies once with IntentClassifier and looks all three up by intent.
+"""
+
+import random
+import time
+from functools import partial
+
+from app.api.v1.endpoints.ai import generate_ai_response, generate_quick_actions, generate_suggestions
+from app.services.intents import ChatIntent, IntentClassifier
+
+MESSAGES = 50_000
+SEED = 7
+
+FILLER = (
+    "hey can you help me with something quick about my trip tomorrow morning near the office "
+    "and maybe also the evening plans with friends downtown if that works for you thanks a lot"
+).split()
+KEYWORDS = ["route", "directions", "goal", "progress", "weather", "safety", "secure", "wellness", "health"]
+
+
+def build_corpus() -> list:
+    rng = random.Random(SEED)
+    corpus = []
+    for _ in range(MESSAGES):
+        words = rng.sample(FILLER, rng.randint(5, 25))
+        # About a third of the messages have no keyword at all
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(KEYWORDS).title() if rng.random() < 0.3
+                         else rng.choice(KEYWORDS))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def legacy_intents(message: str) -> tuple:
+    """The three substring chains the helpers used to run, one per helper"""
+    lower = message.lower()
+    if "route" in lower or "directions" in lower:
+        reply = ChatIntent.ROUTE
+    elif "goal" in lower or "progress" in lower:
+        reply = ChatIntent.GOAL
+    elif "weather" in lower:
+        reply = ChatIntent.WEATHER
+    elif "safety" in lower or "secure" in lower:
+        reply = ChatIntent.SAFETY
+    elif "wellness" in lower or "health" in lower:
+        reply = ChatIntent.WELLNESS
+    else:
+        reply = ChatIntent.GENERAL
+
+    lower = message.lower()
+    if "route" in lower:
+        suggestions = ChatIntent.ROUTE
+    elif "goal" in lower:
+        suggestions = ChatIntent.GOAL
+    elif "weather" in lower:
+        suggestions = ChatIntent.WEATHER
+    else:
+        suggestions = ChatIntent.GENERAL
+
+    lower = message.lower()
+    if "route" in lower:
+        actions = ChatIntent.ROUTE
+    elif "goal" in lower:
+        actions = ChatIntent.GOAL
+    else:
+        actions = ChatIntent.GENERAL
+
+    return reply, suggestions, actions
+
+
+def legacy_turn(message: str) -> tuple:
+    reply, suggestions, actions = legacy_intents(message)
+    return (generate_ai_response(reply, None), generate_suggestions(suggestions), generate_quick_actions(actions))
+
+
+def classified_turn(classifier: IntentClassifier, message: str) -> tuple:
+    intent = classifier.classify(message).intent
+    return (generate_ai_response(intent, None), generate_suggestions(intent), generate_quick_actions(intent))
+
+
+def timed(label: str, fn, corpus: list) -> None:
+    started = time.perf_counter()
+    for message in corpus:
+        fn(message)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {len(corpus) / elapsed:10,.0f} messages/s  {elapsed / len(corpus) * 1e6:6.2f} us/message")
+
+
+def main() -> None:
+    corpus = build_corpus()
+    classifier = IntentClassifier()
+    print(f"{len(corpus):,} synthetic messages\n")
+    print("intent only")
+    timed("  before (3 chains)", legacy_intents, corpus)
+    timed("  after (1 pass)", classifier.classify, corpus)
+    print("reply + suggestions + quick actions")
+    timed("  before (3 chains)", legacy_turn, corpus)
+    timed("  after (1 pass)", partial(classified_turn, classifier), corpus)
+
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+    except ImportError:
+        print("\nscikit-learn not installed; skipping the model fallback run")
+        return
+
+    labelled = [(message, classifier.classify(message).intent.value) for message in corpus[:5000]]
+    labelled = [(message, label) for message, label in labelled if label != ChatIntent.GENERAL.value]
+    model = make_pipeline(TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 4)), LogisticRegression(max_iter=500))
+    model.fit([message for message, _ in labelled], [label for _, label in labelled])
+    with_model = IntentClassifier(model=model, model_threshold=0.6)
+    timed("  after + model fallback", partial(classified_turn, with_model), corpus)
+
+
+if __name__ == "__main__":
+    main()
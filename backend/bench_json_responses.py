@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serving a 5,000-point RouteCalculationResponse three ways:
+  default   - response_model + stdlib JSONResponse (the previous behaviour)
+  orjson    - response_model + FastJSONResponse (the new app-wide default)
+  prevalid  - ModelResponse of the already-built model (calculate_route now)
+Each is a route on a throwaway FastAPI app, called through httpx's ASGI
+transport, so the numbers include FastAPI's response handling but not
+map lookups or the network.
+"""
+
+import asyncio
+import math
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse, ModelResponse
+from app.schemas.map import RouteCalculationResponse
+
+POINTS = 5_000
+REQUESTS = 200
+
+
+def build_route() -> RouteCalculationResponse:
+    points = [
+        [28.6139 + 0.0001 * i, 77.2090 + 0.00005 * math.sin(i / 25)]
+        for i in range(POINTS)
+    ]
+    return RouteCalculationResponse(
+        distance="5.6 km",
+        duration="1 hour 10 mins",
+        distance_value=5600,
+        duration_value=4200,
+        points=points,
+        steps=[
+            {
+                "distance": {"text": "28 m", "value": 28},
+                "duration": {"text": "21 s", "value": 21},
+                "instruction": f"Continue on street {i}",
+                "maneuver": {"type": "turn", "modifier": "left", "location": [77.209, 28.6139]}
+            }
+            for i in range(200)
+        ],
+        polyline="",
+        summary={"transport_mode": "walking", "source": "bench"}
+    )
+
+
+def build_app(route: RouteCalculationResponse) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default", response_model=RouteCalculationResponse, response_class=JSONResponse)
+    async def default():
+        return route
+
+    @app.get("/orjson", response_model=RouteCalculationResponse, response_class=FastJSONResponse)
+    async def orjson_default():
+        return route
+
+    @app.get("/prevalid", response_model=RouteCalculationResponse)
+    async def prevalidated():
+        return ModelResponse(route)
+
+    return app
+
+
+async def main() -> None:
+    route = build_route()
+    app = build_app(route)
+    print(f"{REQUESTS} sequential requests, {POINTS} points per response\n")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        bodies = {}
+        for path in ("/default", "/orjson", "/prevalid"):
+            await client.get(path)  # warm up
+            started = time.perf_counter()
+            for _ in range(REQUESTS):
+                response = await client.get(path)
+            elapsed = time.perf_counter() - started
+            bodies[path] = response.json()
+            print(
+                f"{path[1:]:<10} {elapsed / REQUESTS * 1000:7.2f} ms/request  "
+                f"{REQUESTS / elapsed:7.1f} req/s  {len(response.content) / 1024:6.0f} KiB"
+            )
+
+    assert bodies["/default"] == bodies["/orjson"] == bodies["/prevalid"]
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
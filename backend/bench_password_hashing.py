@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent POST /api/v1/users/login throughput and event-loop
+lag with bcrypt run inline on the event loop (the previous behaviour) vs
+in the bounded password-hashing pool. A ticker task sleeping 10 ms records
+how late it wakes up; that lateness is what every other request in the
+process would wait during a login storm.
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints import users
+from app.core.auth import get_password_hash, verify_password
+from app.core.config import settings
+from app.core.database import Base, create_database_engine, get_db
+from app.models.user import User
+from main import app
+
+USERS = 8
+LOGINS = 48
+CONCURRENCY = 16
+PASSWORD = "bench-password"
+TICK = 0.01
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def seed(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    hashed = get_password_hash(PASSWORD)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([
+            User(email=f"bench{i}@example.com", username=f"bench{i}", hashed_password=hashed)
+            for i in range(USERS)
+        ])
+        await session.commit()
+
+
+async def run(label: str, engine) -> None:
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append((time.perf_counter() - started - TICK) * 1000)
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    statuses = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def login(i: int) -> None:
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/users/login",
+                    json={"email": f"bench{i % USERS}@example.com", "password": PASSWORD}
+                )
+                statuses.append(response.status_code)
+
+        ticker_task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(LOGINS)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker_task
+
+    app.dependency_overrides.clear()
+    ok = statuses.count(200)
+    p99 = statistics.quantiles(lags, n=100, method="inclusive")[98] if len(lags) >= 2 else (lags[0] if lags else 0.0)
+    print(
+        f"{label:<10} {ok / elapsed:7.1f} logins/s  ({ok}/{LOGINS} ok)  "
+        f"loop lag p50 {statistics.median(lags):7.1f} ms  p99 {p99:7.1f} ms  max {max(lags):7.1f} ms"
+    )
+
+
+async def main() -> None:
+    print(f"{LOGINS} logins, {CONCURRENCY} concurrent, {settings.PASSWORD_HASH_WORKERS} hashing threads, "
+          f"{os.cpu_count()} CPUs\n")
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_database_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        await seed(engine)
+
+        pooled = users.verify_password_async
+        users.verify_password_async = verify_inline
+        try:
+            await run("inline", engine)
+        finally:
+            users.verify_password_async = pooled
+        await run("pool", engine)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: polyline encoding/decoding on 10k-point routes.
+Compares the vectorized encoder in app.services.geo with the encoder
+MapService had before it (copied verbatim from the baseline commit).
+"""
+
+import math
+import timeit
+from typing import List
+
+import numpy as np
+
+from app.services.geo import encode_polyline, decode_polyline
+
+POINTS = 10_000
+REPEAT = 5
+NUMBER = 10
+
+
+class LegacyPolylineEncoder:
+    """
+    MapService._encode_polyline and _encode_number exactly as they were at
+    the baseline (d1ea736), before vectorization: method calls per number,
+    += concatenation, and deltas taken from the unrounded coordinates
+    """
+
+    def _encode_polyline(self, points: List[List[float]]) -> str:
+        """
+        Encode points to polyline format for compatibility
+        """
+        if not points:
+            return ""
+        
+        encoded = ""
+        lat = 0
+        lng = 0
+        
+        for point in points:
+            point_lat, point_lng = point[0], point[1]
+            
+            dlat = round((point_lat - lat) * 1e5)
+            dlng = round((point_lng - lng) * 1e5)
+            
+            lat = point_lat
+            lng = point_lng
+            
+            encoded += self._encode_number(dlat) + self._encode_number(dlng)
+        
+        return encoded
+    
+    def _encode_number(self, num: int) -> str:
+        """
+        Encode a number for polyline format
+        """
+        encoded = ""
+        value = ~(num << 1) if num < 0 else (num << 1)
+        
+        while value >= 0x20:
+            encoded += chr(((value & 0x1f) | 0x20) + 63)
+            value >>= 5
+        
+        encoded += chr(value + 63)
+        return encoded
+
+
+def make_route(count: int):
+    """A wiggly route starting in New Delhi, roughly 10 m between points"""
+    return [
+        [28.6139 + i * 0.00009 + 0.0004 * math.sin(i / 15), 77.2090 + i * 0.00007 + 0.0004 * math.cos(i / 11)]
+        for i in range(count)
+    ]
+
+
+def best_per_call(stmt) -> float:
+    return min(timeit.repeat(stmt, repeat=REPEAT, number=NUMBER)) / NUMBER
+
+
+def main():
+    route = make_route(POINTS)
+    encoded = encode_polyline(route)
+    legacy_encoder = LegacyPolylineEncoder()
+    legacy_encoded = legacy_encoder._encode_polyline(route)
+    # The baseline rounds each delta separately, so its rounding error adds up along the route
+    drift = np.abs(np.asarray(decode_polyline(legacy_encoded)) - np.asarray(route)).max()
+    assert np.abs(np.asarray(decode_polyline(encoded)) - np.asarray(route)).max() < 1e-5
+
+    legacy = best_per_call(lambda: legacy_encoder._encode_polyline(route))
+    fast = best_per_call(lambda: encode_polyline(route))
+    route_array = np.asarray(route)
+    fast_array = best_per_call(lambda: encode_polyline(route_array))
+    fast6 = best_per_call(lambda: encode_polyline(route, precision=6))
+    decode = best_per_call(lambda: decode_polyline(encoded))
+
+    print(f"📏 {POINTS} points, {len(encoded)} chars encoded")
+    print(f"   baseline encode:      {legacy * 1000:8.2f} ms  ({POINTS / legacy:12,.0f} points/s)"
+          f"  max drift {drift * 1e5:.0f}e-5 deg")
+    print(f"   vectorized encode:    {fast * 1000:8.2f} ms  ({POINTS / fast:12,.0f} points/s)")
+    print(f"   vectorized (ndarray): {fast_array * 1000:8.2f} ms  ({POINTS / fast_array:12,.0f} points/s)")
+    print(f"   vectorized encode p6: {fast6 * 1000:8.2f} ms  ({POINTS / fast6:12,.0f} points/s)")
+    print(f"   vectorized decode:    {decode * 1000:8.2f} ms  ({POINTS / decode:12,.0f} points/s)")
+    print(f"🚀 Encode speedup: {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
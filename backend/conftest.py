@@ -0,0 +1,61 @@
+"""
+Shared pytest fixtures: a throwaway database built by the Alembic
+migrations the app ships with, and an HTTP client for the app bound to it
+"""
+
+from typing import AsyncIterator, List, NamedTuple
+
+import httpx
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import create_database_engine, get_db
+from app.core.migrations import run_migrations
+from app.services.dashboard_cache import dashboard_cache
+from app.services.user_cache import user_cache
+from main import app
+
+
+class AppDatabase(NamedTuple):
+    engine: AsyncEngine
+    session_factory: sessionmaker
+    client: httpx.AsyncClient  # requests to the app use session_factory for get_db
+
+
+@pytest_asyncio.fixture
+async def app_db(tmp_path) -> AsyncIterator[AppDatabase]:
+    """
+    A migrated SQLite file per test (a file, so concurrent sessions get their
+    own connections), with get_db overridden and the user and dashboard
+    caches emptied on both sides of the test
+    """
+    engine = create_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    await run_migrations(engine)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    user_cache.clear()
+    dashboard_cache.clear()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield AppDatabase(engine, session_factory, client)
+    finally:
+        app.dependency_overrides.clear()
+        user_cache.clear()
+        dashboard_cache.clear()
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def statements(app_db: AppDatabase) -> List[str]:
+    """SQL statements app_db's engine runs from here on, in order"""
+    executed: List[str] = []
+    event.listen(app_db.engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: executed.append(statement))
+    return executed
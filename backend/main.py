@@ -5,7 +5,12 @@ import uvicorn
 
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.database import engine, Base
+from app.core.auth import shutdown_password_executor
+from app.core.database import engine
+from app.core.migrations import run_migrations
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import FastJSONResponse
+from app.services.map_service import map_service
 
 
 @asynccontextmanager
@@ -13,15 +18,21 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting PathFinder AI Backend...")
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Apply database migrations
+    await run_migrations(engine)
+    
+    print("✅ Database migrations applied")
+    
+    # Open the pooled HTTP client used for Nominatim/OSRM
+    await map_service.startup()
     
-    print("✅ Database tables created")
     yield
     
     # Shutdown
     print("🛑 Shutting down PathFinder AI Backend...")
+    await map_service.shutdown()
+    shutdown_password_executor()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -30,6 +41,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -40,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include API routes
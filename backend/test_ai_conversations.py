@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+GET /ai/conversations: one query per page, with counts that match the
+messages actually stored, whether read from the denormalized columns or
+aggregated on the fly. A chat turn is written in a single transaction.
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import event, func, select
+
+from app.api.v1.endpoints.ai import chat_with_ai, get_conversations
+from app.core.config import settings
+from app.models import AIConversation, AIMessage, User
+from app.schemas.ai_chat import ChatRequest
+
+
+@pytest.mark.asyncio
+async def test_conversation_list_is_a_single_query(app_db, statements, monkeypatch):
+    async with app_db.session_factory() as session:
+        user = User(email="chat@example.com", username="chat", hashed_password="x")
+        session.add(user)
+        await session.commit()
+
+        # Seeded through chat_with_ai
+        for turns in (1, 3, 2):
+            response = await chat_with_ai(ChatRequest(message="Find me a route"), current_user=user, db=session)
+            for _ in range(turns - 1):
+                await chat_with_ai(
+                    ChatRequest(message="How is my goal progress?", conversation_id=response.conversation_id),
+                    current_user=user,
+                    db=session
+                )
+
+        expected = {
+            conversation_id: (count, last_at)
+            for conversation_id, count, last_at in (await session.execute(
+                select(AIMessage.conversation_id, func.count(AIMessage.id), func.max(AIMessage.created_at))
+                .group_by(AIMessage.conversation_id)
+            )).all()
+        }
+
+        for denormalized in (True, False):
+            monkeypatch.setattr(settings, "AI_CONVERSATION_DENORMALIZED_COUNTS", denormalized)
+            statements.clear()
+            summaries = await get_conversations(
+                response=Response(), current_user=user, db=session, limit=20, offset=0, cursor=None
+            )
+
+            assert len(statements) == 1
+            assert len(summaries) == 3
+            for summary in summaries:
+                count, last_at = expected[summary.id]
+                assert summary.message_count == count
+                assert summary.last_message_at == last_at
+            assert sorted(summary.message_count for summary in summaries) == [2, 4, 6]
+
+
+@pytest.mark.asyncio
+async def test_chat_turn_is_one_transaction(app_db, statements):
+    async with app_db.session_factory() as session:
+        user = User(email="turn@example.com", username="turn", hashed_password="x")
+        other = User(email="other@example.com", username="other", hashed_password="x")
+        session.add_all([user, other])
+        await session.flush()
+        session.add(AIConversation(user_id=other.id, title="Not yours"))
+        await session.commit()
+
+    commits = []
+    event.listen(app_db.engine.sync_engine, "commit", lambda conn: commits.append(conn))
+
+    async with app_db.session_factory() as session:
+        statements.clear()
+        response = await chat_with_ai(ChatRequest(message="Find me a route"), current_user=user, db=session)
+        first_turn = list(statements)
+        foreign_status = {}
+        for conversation_id in (1, 999):
+            statements.clear()
+            try:
+                await chat_with_ai(ChatRequest(message="Hi", conversation_id=conversation_id),
+                                   current_user=user, db=session)
+            except HTTPException as e:
+                foreign_status[conversation_id] = e.status_code, [statement.split()[0] for statement in statements]
+        message_total = (await session.execute(select(func.count(AIMessage.id)))).scalar_one()
+
+    assert [statement.split()[0] for statement in first_turn[:4]] == ["INSERT", "INSERT", "INSERT", "UPDATE"]
+    assert all("RETURNING" in statement for statement in first_turn[:3])
+    assert len(commits) == 1
+    assert response.message.id is not None and response.message.created_at is not None
+
+    # Someone else's or a missing conversation is rejected by one SELECT,
+    # before a reply is generated or anything is inserted
+    assert foreign_status == {1: (404, ["SELECT"]), 999: (404, ["SELECT"])}
+    assert message_total == 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+POST /ai/chat/stream: the reply arrives as Server-Sent Events token by
+token, and the saved AI message matches what was streamed, with measured
+tokens_used and processing_time
+"""
+
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.core.auth import create_access_token
+from app.models import AIConversation, AIMessage, MessageSender, User
+
+EMAIL = "stream@example.com"
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def stream_chat(app_db):
+    async with app_db.session_factory() as session:
+        session.add_all([
+            User(email=EMAIL, username="stream", hashed_password="x"),
+            User(email="other@example.com", username="other", hashed_password="x")
+        ])
+        await session.flush()
+        session.add(AIConversation(user_id=2, title="Not yours"))
+        await session.commit()
+
+    client = app_db.client
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+    results = {}
+    async with client.stream("POST", "/api/v1/ai/chat/stream", json={"message": "Find me a route"},
+                             headers=headers) as response:
+        results["content_type"] = response.headers["content-type"]
+        body = "".join([chunk async for chunk in response.aiter_text()])
+    results["first"] = parse_events(body)
+
+    conversation_id = results["first"][0][1]["conversation_id"]
+    response = await client.post("/api/v1/ai/chat/stream", headers=headers,
+                                 json={"message": "How is my goal progress?",
+                                       "conversation_id": conversation_id})
+    results["second"] = parse_events(response.text)
+
+    foreign = await client.post("/api/v1/ai/chat/stream", headers=headers,
+                                json={"message": "Hi", "conversation_id": 1})
+    results["foreign_status"] = foreign.status_code
+
+    async with app_db.session_factory() as session:
+        results["conversation"] = await session.get(AIConversation, conversation_id)
+        results["messages"] = (await session.execute(
+            select(AIMessage).where(AIMessage.conversation_id == conversation_id).order_by(AIMessage.id)
+        )).scalars().all()
+    return results
+
+
+@pytest.mark.asyncio
+async def test_reply_is_streamed_and_saved(app_db):
+    results = await stream_chat(app_db)
+
+    assert results["content_type"].startswith("text/event-stream")
+    events = results["first"]
+    names = [name for name, _ in events]
+    assert names[0] == "start" and names[-1] == "done"
+    tokens = [data["content"] for name, data in events if name == "token"]
+    assert len(tokens) > 5
+
+    done = events[-1][1]
+    assert done["message"]["content"] == "".join(tokens)
+    assert done["message"]["tokens_used"] == len(tokens)
+    assert done["suggestions"] and done["quick_actions"]
+
+    messages = results["messages"]
+    assert [message.sender for message in messages] == [MessageSender.USER, MessageSender.AI] * 2
+    assert messages[0].id == events[0][1]["user_message_id"]
+    assert messages[1].content == "".join(tokens)
+    assert 0 < messages[1].processing_time < 5
+    assert messages[1].message_metadata["streamed"] is True
+    assert messages[3].content == "".join(data["content"] for name, data in results["second"] if name == "token")
+
+    assert results["conversation"].message_count == 4
+    assert results["foreign_status"] == 404
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
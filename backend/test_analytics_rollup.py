@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+user_daily_stats rollup: route writes keep it equal to a rebuild from the
+routes table, and /dashboard/analytics reports real peak hours and
+destinations from it
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from alembic import command
+from alembic.script import ScriptDirectory
+from sqlalchemy import select, update
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints.routes import create_route, update_route
+from app.core.auth import create_access_token
+from app.core.database import create_database_engine
+from app.core.migrations import get_alembic_config
+from app.models import Route, RouteStatus, TransportMode, User, UserDailyCount, UserDailyStats
+from app.schemas.route import RouteCreate, RouteUpdate
+from app.services.rollups import _upsert, rebuild_user_daily_stats, record_route_change, route_snapshot
+
+BACKFILL = ScriptDirectory.from_config(get_alembic_config()).get_revision("0004").module
+
+EMAIL = "rollup@example.com"
+
+ROLLUP_FIELDS = (
+    "route_count", "completed_count", "total_distance", "total_duration", "rating_sum", "rating_count"
+)
+COUNT_FIELDS = ("dimension", "key", "count", "rating_sum", "rating_count")
+
+
+async def rollup_rows(session):
+    days = await session.execute(select(UserDailyStats).order_by(UserDailyStats.day))
+    counts = await session.execute(
+        select(UserDailyCount).order_by(UserDailyCount.day, UserDailyCount.dimension, UserDailyCount.key)
+    )
+    return (
+        [(row.day, *(getattr(row, field) for field in ROLLUP_FIELDS)) for row in days.scalars().all()],
+        [(row.day, *(getattr(row, field) for field in COUNT_FIELDS)) for row in counts.scalars().all()]
+    )
+
+
+async def exercise_rollup(app_db):
+    session_factory = app_db.session_factory
+    async with session_factory() as session:
+        user = User(email=EMAIL, username="rollup", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        # Outside the week range; the rollup for it comes from a rebuild
+        session.add(Route(user_id=user.id, title="Old", origin="A", destination="Museum",
+                          transport_mode=TransportMode.DRIVING, distance=30.0, duration=45.0,
+                          created_at=datetime.utcnow() - timedelta(days=40)))
+        await session.flush()
+        await rebuild_user_daily_stats(session, user.id)
+        await session.commit()
+
+        route_ids = []
+        for destination, mode in (("Park", TransportMode.WALKING), ("Park", TransportMode.CYCLING),
+                                  ("Gym", TransportMode.WALKING), ("Cafe", TransportMode.WALKING)):
+            route = await create_route(
+                RouteCreate(title=f"To {destination}", origin="Home", destination=destination,
+                            transport_mode=mode),
+                current_user=user,
+                db=session
+            )
+            route_ids.append(route.id)
+        for route_id, distance, rating in zip(route_ids, (3.0, 8.0, 2.0, 1.0), (5, 3, None, 4)):
+            await update_route(route_id, RouteUpdate(distance=distance, duration=distance * 10, rating=rating),
+                               current_user=user, db=session)
+
+    client = app_db.client
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+    results = {}
+    for route_id in route_ids[:2]:
+        assert (await client.post(f"/api/v1/routes/{route_id}/start", headers=headers)).status_code == 200
+        # A write the cached user doesn't know about; completing must add to it, not overwrite it
+        async with session_factory() as session:
+            await session.execute(update(User).values(routes_completed=User.routes_completed + 10))
+            await session.commit()
+        assert (await client.post(f"/api/v1/routes/{route_id}/complete", headers=headers)).status_code == 200
+    assert (await client.delete(f"/api/v1/routes/{route_ids[3]}", headers=headers)).status_code == 200
+
+    for time_range in ("week", "year"):
+        response = await client.post("/api/v1/dashboard/analytics", json={"user_id": 1, "time_range": time_range},
+                                     headers=headers)
+        assert response.status_code == 200, response.text
+        results[time_range] = response.json()
+
+    async with session_factory() as session:
+        results["incremental"] = await rollup_rows(session)
+        user = await session.scalar(select(User).where(User.email == EMAIL))
+        results["user_totals"] = user.total_distance, user.routes_completed
+        routes = (await session.execute(select(Route))).scalars().all()
+        week_start = datetime.utcnow() - timedelta(days=6)
+        results["week_hours"] = sorted({route.created_at.hour for route in routes if route.created_at >= week_start})
+        await rebuild_user_daily_stats(session, 1)
+        await session.commit()
+        results["rebuilt"] = await rollup_rows(session)
+    return results
+
+
+@pytest.mark.asyncio
+async def test_rollup_tracks_route_writes_and_feeds_analytics(app_db):
+    results = await exercise_rollup(app_db)
+
+    assert results["incremental"] == results["rebuilt"]
+    assert results["user_totals"] == (11.0, 22)
+
+    days, counts = results["incremental"]
+    assert len(days) == 2
+    # The deleted route's destination and any emptied counters are gone
+    assert all(count > 0 for _, _, _, count, _, _ in counts)
+    assert "Cafe" not in {key for _, dimension, key, *_ in counts if dimension == "destination"}
+
+    week = results["week"]
+    assert week["total_distance"] == 13.0
+    assert week["routes_completed"] == 2
+    assert week["average_rating"] == 4.0
+    assert week["favorite_transport"] == "walking"
+    assert week["top_destinations"] == [
+        {"name": "Park", "visits": 2, "avg_rating": 4.0},
+        {"name": "Gym", "visits": 1, "avg_rating": 0.0}
+    ]
+    assert week["peak_hours"] == results["week_hours"]
+
+    year = results["year"]
+    assert year["total_distance"] == 43.0
+    assert {"name": "Museum", "visits": 1, "avg_rating": 0.0} in year["top_destinations"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers_do_not_lose_increments(app_db):
+    writers = 8
+
+    def snapshot(i):
+        return {
+            "day": date(2026, 10, 1), "hour": 8, "completed": False, "distance": 1.0, "duration": 10.0,
+            "rating": None, "transport_mode": "walking", "destination": f"Stop {i % 2}"
+        }
+
+    # Each writer has its own connection; the first of the day races the others to create the row
+    async def write(before, after):
+        async with app_db.session_factory() as session:
+            await record_route_change(session, 1, before, after)
+            await session.commit()
+
+    await asyncio.gather(*(write(None, snapshot(i)) for i in range(writers)))
+    async with app_db.session_factory() as session:
+        days, counts = await rollup_rows(session)
+    await asyncio.gather(*(write(snapshot(i), None) for i in range(writers)))
+    async with app_db.session_factory() as session:
+        removed = await rollup_rows(session)
+
+    assert [day[1:3] for day in days] == [(writers, 0)]
+    assert days[0][3] == writers * 1.0
+    assert {(dimension, key): count for _, dimension, key, count, _, _ in counts} == {
+        ("transport", "walking"): writers, ("hour", "8"): writers,
+        ("destination", "Stop 0"): writers // 2, ("destination", "Stop 1"): writers // 2
+    }
+    assert removed == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_new_routes_are_bucketed_by_the_database_created_at(app_db):
+    async with app_db.session_factory() as session:
+        user = User(email=EMAIL, username="rollup", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        with pytest.raises(ValueError):
+            route_snapshot(Route(user_id=user.id, title="Unsaved", origin="Home", destination="Park",
+                                 transport_mode=TransportMode.WALKING))
+
+        route = await create_route(
+            RouteCreate(title="To Park", origin="Home", destination="Park", transport_mode=TransportMode.WALKING),
+            current_user=user,
+            db=session
+        )
+        days, counts = await rollup_rows(session)
+
+    assert [day[:2] for day in days] == [(route.created_at.date(), 1)]
+    assert ("hour", str(route.created_at.hour)) in {(dimension, key) for _, dimension, key, *_ in counts}
+
+
+@pytest.mark.asyncio
+async def test_migration_backfill_matches_a_rebuild(tmp_path):
+    engine = create_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'backfill.db'}")
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: command.upgrade(get_alembic_config(sync_conn), "0003"))
+        async with session_factory() as session:
+            user = User(email=EMAIL, username="rollup", hashed_password="x")
+            session.add(user)
+            await session.flush()
+            session.add_all([
+                Route(user_id=user.id, title=f"Route {i}", origin="Home", destination=destination, transport_mode=mode,
+                      status=status, distance=i * 1.5, duration=i * 10.0, rating=rating,
+                      created_at=datetime(2026, 10, 1 + i // 3, 7 + i * 2, 30))
+                for i, (destination, mode, status, rating) in enumerate([
+                    ("Park", TransportMode.WALKING, RouteStatus.COMPLETED, 5),
+                    ("Park", TransportMode.CYCLING, RouteStatus.PLANNED, None),
+                    ("Gym", TransportMode.WALKING, RouteStatus.COMPLETED, 3),
+                    ("Cafe", TransportMode.TRANSIT, RouteStatus.CANCELLED, 4),
+                    ("Park", TransportMode.WALKING, RouteStatus.COMPLETED, None),
+                ])
+            ])
+            await session.commit()
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: command.upgrade(get_alembic_config(sync_conn), "head"))
+
+        async with session_factory() as session:
+            backfilled = await rollup_rows(session)
+            await rebuild_user_daily_stats(session, 1)
+            await session.commit()
+            rebuilt = await rollup_rows(session)
+    finally:
+        await engine.dispose()
+
+    assert len(backfilled[0]) == 2
+    assert backfilled == rebuilt
+
+
+def test_backfill_sql_is_not_sqlite_only():
+    sql = " ".join(
+        str(statement.compile(dialect=postgresql.dialect()))
+        for statement in BACKFILL.backfill_statements("postgresql")
+    )
+
+    assert "CAST(routes.created_at AS DATE)" in sql
+    assert "EXTRACT(hour FROM routes.created_at)" in sql
+    assert "strftime" not in sql.lower() and "date(" not in sql
+
+
+def test_upsert_rejects_dialects_without_on_conflict():
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=mysql.dialect()))
+
+    with pytest.raises(NotImplementedError):
+        _upsert(db, UserDailyStats, ["user_id", "day"], ["route_count"])
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Authenticated-user cache: repeat requests with the same token skip the
+users query, tokens carry the user id, and profile, preference and
+route-completion writes are visible on the next request
+"""
+
+import pytest
+from jose import jwt
+from sqlalchemy import event
+
+from app.core.auth import create_access_token, get_password_hash
+from app.core.config import settings
+from app.models import Route, TransportMode, User
+from app.services.user_cache import UserCache
+
+EMAIL = "cached@example.com"
+PASSWORD = "correct horse"
+
+
+async def exercise_auth_cache(app_db):
+    async with app_db.session_factory() as session:
+        user = User(email=EMAIL, username="cached", hashed_password=get_password_hash(PASSWORD))
+        session.add(user)
+        await session.flush()
+        session.add(Route(user_id=user.id, title="Loop", origin="A", destination="B",
+                          transport_mode=TransportMode.WALKING, distance=2.5))
+        await session.commit()
+
+    user_queries = []
+    event.listen(app_db.engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: user_queries.append(statement)
+                 if statement.startswith("SELECT users.") else None)
+
+    client = app_db.client
+    results = {}
+    login = await client.post("/api/v1/users/login", json={"email": EMAIL, "password": PASSWORD})
+    assert login.status_code == 200, login.text
+    token = login.json()["access_token"]
+    results["claims"] = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    headers = {"Authorization": f"Bearer {token}"}
+
+    user_queries.clear()
+    await client.get("/api/v1/users/me", headers=headers)
+    results["first_lookup"] = list(user_queries)
+    user_queries.clear()
+    await client.get("/api/v1/users/me", headers=headers)
+    await client.get("/api/v1/users/preferences", headers=headers)
+    results["cached_lookups"] = len(user_queries)
+
+    preferences = (await client.get("/api/v1/users/preferences", headers=headers)).json()
+    preferences["theme"] = "dark"
+    updated = await client.put("/api/v1/users/preferences", json=preferences, headers=headers)
+    assert updated.status_code == 200, updated.text
+    results["theme"] = (await client.get("/api/v1/users/preferences", headers=headers)).json()["theme"]
+
+    profile = await client.put("/api/v1/users/me", json={"bio": "Walker"}, headers=headers)
+    assert profile.status_code == 200, profile.text
+    completed = await client.post("/api/v1/routes/1/complete", headers=headers)
+    assert completed.status_code == 200, completed.text
+    me = (await client.get("/api/v1/users/me", headers=headers)).json()
+    results["bio"] = me["bio"]
+    results["stats"] = me["stats"]
+
+    legacy = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+    results["legacy_status"] = (await client.get("/api/v1/users/me", headers=legacy)).status_code
+    mismatched = {"Authorization": f"Bearer {create_access_token({'sub': 'other@example.com', 'uid': 1})}"}
+    results["mismatched_status"] = (await client.get("/api/v1/users/me", headers=mismatched)).status_code
+    return results
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_and_invalidated(app_db):
+    results = await exercise_auth_cache(app_db)
+
+    assert results["claims"]["sub"] == EMAIL
+    assert results["claims"]["uid"] == 1
+    assert "iat" in results["claims"]
+
+    # Looked up by primary key, once, then served from the cache
+    assert len(results["first_lookup"]) == 1
+    assert "WHERE users.id = ?" in results["first_lookup"][0]
+    assert results["cached_lookups"] == 0
+
+    assert results["theme"] == "dark"
+    assert results["bio"] == "Walker"
+    assert results["stats"]["routes_completed"] == 1
+    assert results["stats"]["total_distance"] == 2.5
+
+    assert results["legacy_status"] == 200
+    assert results["mismatched_status"] == 401
+
+
+def test_user_loaded_across_an_invalidation_is_not_cached():
+    cache = UserCache(max_entries=8, ttl=60)
+    generation = cache.generation()
+    cache.invalidate(1)  # a write lands while the user is being loaded
+    cache.set(("someone@example.com", 1), User(id=1, email="someone@example.com"), generation)
+    assert cache.stats()["entries"] == 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Conversation, goal and route deletes: child rows go in one set-based DELETE
+per table however many there are, the bulk endpoints only touch the
+caller's rows, and the daily stats rollup follows bulk route deletes
+"""
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api.v1.endpoints.routes import create_route
+from app.core.auth import create_access_token
+from app.models import (
+    AIConversation, AIMessage, Goal, GoalCategory, GoalProgressLog, MessageSender, Route, RouteEvent,
+    TransportMode, User, UserDailyStats
+)
+from app.schemas.route import RouteCreate
+from app.services.rollups import rebuild_user_daily_stats
+
+EMAIL = "cleanup@example.com"
+CHILDREN = 60
+
+
+async def seed(session):
+    owner = User(email=EMAIL, username="cleanup", hashed_password="x")
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    session.add_all([owner, other])
+    await session.flush()
+
+    conversations = [AIConversation(user_id=user.id, title="Chat") for user in (owner, owner, owner, other)]
+    goal = Goal(user_id=owner.id, title="Walk", category=GoalCategory.FITNESS, target="30 min daily")
+    session.add_all([*conversations, goal])
+    await session.flush()
+    session.add_all([
+        AIMessage(conversation_id=conversation.id, sender=MessageSender.USER, content=f"message {i}")
+        for conversation in conversations for i in range(CHILDREN)
+    ])
+    session.add_all([GoalProgressLog(goal_id=goal.id, progress_value=i) for i in range(CHILDREN)])
+    await session.commit()
+
+    routes = []
+    for user, destination in ((owner, "Park"), (owner, "Gym"), (owner, "Park"), (other, "Cafe")):
+        routes.append(await create_route(
+            RouteCreate(title=f"To {destination}", origin="Home", destination=destination,
+                        transport_mode=TransportMode.WALKING),
+            current_user=user,
+            db=session
+        ))
+    session.add_all([
+        RouteEvent(route_id=route.id, event_type="progress", event_data={"step": i})
+        for route in routes for i in range(CHILDREN)
+    ])
+    await session.commit()
+    return [c.id for c in conversations], goal.id, [r.id for r in routes]
+
+
+async def exercise_deletes(app_db, statements):
+    async with app_db.session_factory() as session:
+        conversation_ids, goal_id, route_ids = await seed(session)
+
+    client = app_db.client
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+
+    async def request(method, url, **kwargs):
+        statements.clear()
+        response = await client.request(method, url, headers=headers, **kwargs)
+        assert response.status_code == 200, response.text
+        return response.json(), sum(statement.startswith("DELETE") for statement in statements)
+
+    results = {}
+    results["conversation"] = await request("DELETE", f"/api/v1/ai/conversations/{conversation_ids[0]}")
+    results["conversations"] = await request(
+        "POST", "/api/v1/ai/conversations/bulk-delete",
+        json={"ids": [conversation_ids[1], conversation_ids[2], conversation_ids[3], 999]}
+    )
+    results["goal"] = await request("DELETE", f"/api/v1/goals/{goal_id}")
+    results["route"] = await request("DELETE", f"/api/v1/routes/{route_ids[0]}")
+    results["routes"] = await request(
+        "POST", "/api/v1/routes/bulk-delete",
+        json={"ids": [route_ids[1], route_ids[2], route_ids[3], route_ids[1]]}
+    )
+    missing = await client.delete(f"/api/v1/routes/{route_ids[3]}", headers=headers)
+    results["missing_status"] = missing.status_code
+    empty = await client.post("/api/v1/routes/bulk-delete", json={"ids": []}, headers=headers)
+    results["empty_status"] = empty.status_code
+
+    async with app_db.session_factory() as session:
+        results["remaining"] = {
+            model.__name__: await session.scalar(select(func.count()).select_from(model))
+            for model in (AIConversation, AIMessage, Goal, GoalProgressLog, Route, RouteEvent)
+        }
+        results["rollup"] = (await session.execute(
+            select(UserDailyStats.user_id, UserDailyStats.route_count)
+        )).all()
+        await rebuild_user_daily_stats(session, 1)
+        await rebuild_user_daily_stats(session, 2)
+        await session.commit()
+        results["rebuilt"] = (await session.execute(
+            select(UserDailyStats.user_id, UserDailyStats.route_count)
+        )).all()
+    results["ids"] = conversation_ids, route_ids
+    return results
+
+
+@pytest.mark.asyncio
+async def test_deletes_are_set_based_and_scoped_to_the_user(app_db, statements):
+    results = await exercise_deletes(app_db, statements)
+    conversation_ids, route_ids = results["ids"]
+
+    # One DELETE for the children and one for the parents, not one per row
+    assert results["conversation"] == ({"message": "Conversation deleted successfully"}, 2)
+    assert results["goal"] == ({"message": "Goal deleted successfully"}, 2)
+    # Plus the rollup's conditional DELETEs of rows the route's removal emptied
+    assert results["route"] == ({"message": "Route deleted successfully"}, 4)
+
+    body, deletes = results["conversations"]
+    assert body == {"deleted": conversation_ids[1:3], "not_found": [conversation_ids[3], 999]}
+    assert deletes == 2
+
+    # The other user's route stays; duplicate ids are reported once. The
+    # other two DELETEs drop the owner's emptied user_daily_stats and
+    # user_daily_counts rows
+    body, deletes = results["routes"]
+    assert body == {"deleted": route_ids[1:3], "not_found": [route_ids[3]]}
+    assert deletes == 4
+
+    assert results["missing_status"] == 404
+    assert results["empty_status"] == 422
+
+    assert results["remaining"] == {
+        "AIConversation": 1, "AIMessage": CHILDREN, "Goal": 0, "GoalProgressLog": 0,
+        "Route": 1, "RouteEvent": CHILDREN
+    }
+    # The owner's day row went with their last route
+    assert results["rollup"] == results["rebuilt"] == [(2, 1)]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Chat context loader: the last N messages within a token budget, read with an
+index-backed query, plus a rolling summary of older messages cached in
+AIConversation.context_data so each turn costs the same however long the
+conversation is
+"""
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints import ai
+from app.models import AIConversation, AIMessage, MessageSender, User
+from app.schemas.ai_chat import ChatRequest
+from app.services.chat_context import (
+    SUMMARY_KEY, ChatContext, load_chat_context, prompt_messages, recent_messages_query, summarize_messages
+)
+
+
+async def seed(session: AsyncSession, messages: int) -> AIConversation:
+    user = User(email="context@example.com", username="context", hashed_password="x")
+    session.add(user)
+    await session.flush()
+    conversation = AIConversation(user_id=user.id, title="Long chat", context_data={"origin": "home"})
+    session.add(conversation)
+    await add_messages(session, conversation, 0, messages)
+    return conversation
+
+
+async def add_messages(session: AsyncSession, conversation: AIConversation, start: int, count: int) -> None:
+    session.add_all([
+        AIMessage(
+            conversation=conversation,
+            sender=MessageSender.USER if i % 2 == 0 else MessageSender.AI,
+            content=f"message {i} " + "word " * 10
+        )
+        for i in range(start, start + count)
+    ])
+    await session.commit()
+
+
+async def save(session: AsyncSession, conversation: AIConversation, context: ChatContext) -> None:
+    """What the chat endpoints do with an advanced summary"""
+    conversation.context_data = context.context_data
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_window_is_most_recent_messages_within_budget(app_db):
+    async with app_db.session_factory() as session:
+        conversation = await seed(session, 30)
+
+        context = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        assert [m.content.split()[1] for m in context.messages] == [str(i) for i in range(20, 30)]
+
+        # Each message is ~14 estimated tokens, so 50 tokens keep the newest 3
+        context = await load_chat_context(session, conversation, max_messages=10, max_tokens=50)
+        assert [m.content.split()[1] for m in context.messages] == ["27", "28", "29"]
+
+        # Zero is a limit, not "use the default"
+        context = await load_chat_context(session, conversation, max_messages=0)
+        assert context.messages == []
+
+
+@pytest.mark.asyncio
+async def test_summary_is_cached_and_advances_incrementally(app_db, statements):
+    async with app_db.session_factory() as session:
+        conversation = await seed(session, 6)
+
+        # Short conversations fit the window: one query, no summary
+        statements.clear()
+        context = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        assert context.summary == "" and len(context.messages) == 6
+        assert len(statements) == 1
+
+        await add_messages(session, conversation, 6, 10)
+        context = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        # Loading writes nothing; the caller saves the new summary with its turn
+        assert conversation not in session.dirty
+        assert SUMMARY_KEY not in conversation.context_data
+        await save(session, conversation, context)
+        assert context.summary.splitlines()[0].startswith("User: message 0")
+        assert context.summary.splitlines()[-1].startswith("Assistant: message 5")
+        cached = conversation.context_data[SUMMARY_KEY]
+        assert cached["text"] == context.summary
+        assert conversation.context_data["origin"] == "home"
+
+        # Unchanged window: summary served from context_data
+        statements.clear()
+        again = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        assert again.summary == context.summary and again.context_data is None
+        assert len(statements) == 1
+
+        # Only the two messages that just left the window are folded in
+        await add_messages(session, conversation, 16, 2)
+        statements.clear()
+        context = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        assert len(statements) == 2
+        assert context.summary.splitlines()[-1].startswith("Assistant: message 7")
+        assert len(context.summary.splitlines()) == 8
+        assert context.context_data[SUMMARY_KEY]["window_start_id"] == context.messages[0].id
+
+
+@pytest.mark.asyncio
+async def test_summary_skips_the_gap_query_when_other_conversations_interleave(app_db, statements):
+    async with app_db.session_factory() as session:
+        conversation = await seed(session, 0)
+        other = AIConversation(user_id=conversation.user_id, title="Another chat")
+        session.add(other)
+        # Alternating writes, so this conversation's message ids are never consecutive
+        for i in range(16):
+            await add_messages(session, conversation, i, 1)
+            await add_messages(session, other, i, 1)
+
+        context = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        await save(session, conversation, context)
+        assert len(context.summary.splitlines()) == 6
+
+        # Unchanged window: no query for the (empty) range before it
+        statements.clear()
+        again = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        assert len(statements) == 1 and again.context_data is None
+
+        for i in (16, 17):
+            await add_messages(session, conversation, i, 1)
+            await add_messages(session, other, i, 1)
+        statements.clear()
+        context = await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        assert len(statements) == 2
+        await save(session, conversation, context)
+        assert context.summary.splitlines()[-1].startswith("Assistant: message 7")
+        assert len(context.summary.splitlines()) == 8
+
+        statements.clear()
+        await load_chat_context(session, conversation, max_messages=10, max_tokens=10_000)
+        assert len(statements) == 1
+
+
+def test_summary_keeps_its_tail_within_limit():
+    messages = [AIMessage(sender=MessageSender.USER, content=f"line {i} " + "x" * 300) for i in range(20)]
+
+    summary = summarize_messages("", messages, 1000)
+
+    assert len(summary) <= 1000
+    assert summary.splitlines()[-1].startswith("User: line 19")
+    assert all(len(line) <= 206 for line in summary.splitlines())
+
+
+def test_prompt_messages():
+    history = [
+        AIMessage(sender=MessageSender.USER, content="Find a route"),
+        AIMessage(sender=MessageSender.AI, content="Where to?")
+    ]
+
+    messages = prompt_messages(ChatContext("User: hi", history), "system prompt", "The park")
+
+    assert [m["role"] for m in messages] == ["system", "system", "user", "assistant", "user"]
+    assert messages[-1]["content"] == "The park"
+    assert len(prompt_messages(ChatContext("", []), "system prompt", "hi")) == 2
+
+
+@pytest.mark.asyncio
+async def test_window_query_uses_index_without_sorting(app_db):
+    query = recent_messages_query(1, 20)
+    sql = str(query.compile(app_db.engine.sync_engine, compile_kwargs={"literal_binds": True}))
+    async with app_db.engine.connect() as conn:
+        rows = (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+    query_plan = " | ".join(row[-1] for row in rows)
+    assert "ix_ai_messages_conversation_id_created_at" in query_plan, query_plan
+    assert "TEMP B-TREE" not in query_plan, query_plan
+
+
+@pytest.mark.asyncio
+async def test_chat_turn_holds_no_transaction_while_generating(app_db, statements, monkeypatch):
+    async with app_db.session_factory() as session:
+        conversation = await seed(session, 30)
+        user = await session.get(User, conversation.user_id)
+        generating = {}
+
+        async def reply(user_message, user, intent, context):
+            generating["in_transaction"] = session.in_transaction()
+            generating["summary"] = context.summary
+            generating["statements"] = len(statements)
+            yield "On my way"
+
+        monkeypatch.setattr(ai, "openai_enabled", lambda: True)
+        monkeypatch.setattr(ai, "stream_ai_response", reply)
+        statements.clear()
+        await ai.chat_with_ai(
+            ChatRequest(message="And now?", conversation_id=conversation.id), current_user=user, db=session
+        )
+
+        # The advanced summary went out with the turn's message-stats UPDATE
+        writes = [statement for statement in statements[generating["statements"]:] if statement.startswith("UPDATE")]
+        stored = await session.scalar(select(AIConversation.context_data).where(AIConversation.id == conversation.id))
+
+    assert generating["in_transaction"] is False
+    assert generating["summary"].splitlines()[0].startswith("User: message 0")
+    assert len(writes) == 1 and "context_data" in writes[0]
+    assert stored[SUMMARY_KEY]["text"] == generating["summary"]
+    assert stored["origin"] == "home"
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+GET /dashboard/: sections built from shared, concurrent queries, served
+from the per-user cache, and rebuilt after a route or goal changes
+"""
+
+import pytest
+
+from app.core.auth import create_access_token
+from app.models import Goal, GoalCategory, Route, TransportMode, User
+from app.services.dashboard_cache import DashboardCache
+
+EMAIL = "dash@example.com"
+
+
+async def exercise_dashboard(app_db, statements):
+    async with app_db.session_factory() as session:
+        user = User(email=EMAIL, username="dash", hashed_password="x", total_distance=12.0,
+                    routes_completed=3, time_saved=1.5, wellness_score=7.0)
+        session.add(user)
+        await session.flush()
+        session.add_all([
+            Route(user_id=user.id, title=f"Walk {i}", origin="A", destination="B",
+                  transport_mode=TransportMode.WALKING, distance=4.0, duration=40.0)
+            for i in range(3)
+        ])
+        session.add(Goal(user_id=user.id, title="Move", target="daily",
+                         category=GoalCategory.FITNESS, progress=10.0, is_active=True))
+        await session.commit()
+
+    client = app_db.client
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+    results = {}
+    statements.clear()
+    first = await client.get("/api/v1/dashboard/", headers=headers)
+    results["first"] = first.json()
+    results["first_queries"] = len(statements)
+
+    statements.clear()
+    second = await client.get("/api/v1/dashboard/", headers=headers)
+    results["second"] = second.json()
+    # The current user comes from the auth cache too, so nothing hits the database
+    results["second_queries"] = len(statements)
+
+    deleted = await client.delete(f"/api/v1/routes/{first.json()['recent_activities'][0]['id']}",
+                                  headers=headers)
+    assert deleted.status_code == 200, deleted.text
+    results["after_delete"] = (await client.get("/api/v1/dashboard/", headers=headers)).json()
+    return results
+
+
+@pytest.mark.asyncio
+async def test_dashboard_is_cached_and_invalidated(app_db, statements):
+    results = await exercise_dashboard(app_db, statements)
+
+    first = results["first"]
+    assert [stat["label"] for stat in first["stats"]] == [
+        "Total Distance", "Routes Completed", "Time Saved", "Wellness Score"
+    ]
+    assert first["stats"][0]["value"] == "12.0 km"
+    assert [insight["title"] for insight in first["insights"]] == ["Distance Champion", "Goal Progress"]
+    assert len(first["recent_activities"]) == 3
+    # user lookup + week's routes + active goals + recent activities
+    assert results["first_queries"] == 4
+
+    assert results["second"] == first
+    assert results["second_queries"] == 0
+
+    removed = first["recent_activities"][0]["id"]
+    remaining = [activity["id"] for activity in results["after_delete"]["recent_activities"]]
+    assert len(remaining) == 2
+    assert removed not in remaining
+
+
+def test_stale_build_is_not_cached_after_invalidation():
+    cache = DashboardCache(max_entries=8, ttl=60)
+    version = cache.version(1)
+    cache.invalidate(1)  # a write lands while the dashboard is being built
+    cache.set(1, "stale", version)
+    assert cache.get(1) is None
+
+    cache.set(1, "fresh", cache.version(1))
+    assert cache.get(1) == "fresh"
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
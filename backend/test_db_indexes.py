@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN QUERY PLAN checks for the composite indexes, run against a
+database built by the Alembic migrations (not create_all)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import select, text
+
+from app.core.database import Base
+from app.core.migrations import get_alembic_config
+from app.models import AIConversation, AIMessage, Goal, Route
+
+MIGRATION = ScriptDirectory.from_config(get_alembic_config()).get_revision("0002").module
+
+
+async def query_plans(engine, statements):
+    """The query plan text per statement"""
+    plans = []
+    async with engine.connect() as conn:
+        for statement in statements:
+            sql = str(statement.compile(engine.sync_engine, compile_kwargs={"literal_binds": True}))
+            rows = (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+            plans.append(" | ".join(row[-1] for row in rows))
+    return plans
+
+
+@pytest.mark.asyncio
+async def test_per_user_queries_use_composite_indexes(app_db):
+    since = datetime(2026, 1, 1) - timedelta(days=30)
+    cases = [
+        (
+            select(Route).where(Route.user_id == 1).order_by(Route.created_at.desc()).limit(20),
+            "ix_routes_user_id_created_at"
+        ),
+        (
+            select(Route).where(Route.user_id == 1, Route.created_at >= since),
+            "ix_routes_user_id_created_at"
+        ),
+        (
+            select(Goal).where(Goal.user_id == 1).order_by(Goal.created_at.desc()),
+            "ix_goals_user_id_created_at"
+        ),
+        (
+            select(AIConversation).where(AIConversation.user_id == 1).order_by(AIConversation.updated_at.desc()),
+            "ix_ai_conversations_user_id_updated_at"
+        ),
+        (
+            select(AIMessage).where(AIMessage.conversation_id == 1).order_by(AIMessage.created_at),
+            "ix_ai_messages_conversation_id_created_at"
+        ),
+    ]
+
+    plans = await query_plans(app_db.engine, [statement for statement, _ in cases])
+
+    for (_, index), plan in zip(cases, plans):
+        assert index in plan, plan
+        # The index already returns rows in order, so no sort step is needed
+        assert "TEMP B-TREE" not in plan, plan
+
+
+def test_migration_indexes_match_models():
+    model_indexes = {
+        (index.name, table.name, tuple(column.name for column in index.columns))
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if len(index.columns) > 1
+    }
+    migration_indexes = {(name, table, tuple(columns)) for name, table, columns in MIGRATION.INDEXES}
+
+    assert model_indexes == migration_indexes
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
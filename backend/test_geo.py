@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the geometry helpers used by the map service
+"""
+
+import math
+import random
+
+from app.services.geo import (
+    decode_polyline, encode_polyline, haversine_km, nearest, simplify_polyline, zoom_tolerance_m
+)
+from app.services.map_service import map_service
+
+
+def test_haversine_matches_scalar_distance():
+    random.seed(1)
+    lats = [28.6 + random.uniform(-1, 1) for _ in range(100)]
+    lngs = [77.2 + random.uniform(-1, 1) for _ in range(100)]
+
+    distances = haversine_km(28.6139, 77.2090, lats, lngs)
+
+    for lat, lng, distance in zip(lats, lngs, distances):
+        expected = map_service._calculate_distance(28.6139, 77.2090, lat, lng)
+        assert abs(round(float(distance), 2) - expected) < 1e-9
+
+
+def test_nearest_returns_top_k_sorted():
+    lats = [28.70, 28.62, 28.90, 28.61, 28.65]
+    lngs = [77.20, 77.20, 77.20, 77.20, 77.20]
+
+    order, distances = nearest(28.60, 77.20, lats, lngs, k=3)
+
+    assert order.tolist() == [3, 1, 4]
+    assert list(distances) == sorted(distances)
+
+
+def test_polyline_matches_reference_encoding():
+    points = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+
+    assert encode_polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@") == points
+    assert encode_polyline([]) == ""
+    assert decode_polyline("") == []
+
+
+def test_polyline_round_trips_at_precision_5_and_6():
+    random.seed(2)
+    points = [[random.uniform(-90, 90), random.uniform(-180, 180)] for _ in range(500)]
+
+    for precision, tolerance in ((5, 0.5e-5), (6, 0.5e-6)):
+        decoded = decode_polyline(encode_polyline(points, precision), precision)
+        assert len(decoded) == len(points)
+        for (lat, lng), (decoded_lat, decoded_lng) in zip(points, decoded):
+            assert abs(lat - decoded_lat) <= tolerance + 1e-12
+            assert abs(lng - decoded_lng) <= tolerance + 1e-12
+
+
+def test_simplify_keeps_endpoints_and_drops_detail():
+    # A gently wiggling line ~5km long with 2000 points
+    points = [[28.6 + i * 2e-5, 77.2 + 1e-5 * math.sin(i / 5)] for i in range(2000)]
+
+    simplified = simplify_polyline(points, 5.0)
+
+    assert 2 <= len(simplified) < len(points)
+    assert simplified[0].tolist() == points[0]
+    assert simplified[-1].tolist() == points[-1]
+    assert len(simplify_polyline(points, 0)) == len(points)
+
+    # Coarser zoom levels allow more error, so they keep fewer points
+    coarse = simplify_polyline(points, zoom_tolerance_m(10, 28.6))
+    fine = simplify_polyline(points, zoom_tolerance_m(18, 28.6))
+    assert len(coarse) <= len(fine)
+
+
+if __name__ == "__main__":
+    test_haversine_matches_scalar_distance()
+    test_nearest_returns_top_k_sorted()
+    test_polyline_matches_reference_encoding()
+    test_polyline_round_trips_at_precision_5_and_6()
+    test_simplify_keeps_endpoints_and_drops_detail()
+    print("✅ Geo tests passed")
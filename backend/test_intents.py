@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Intent classifier: one keyword pass decides the intent for the AI reply,
+suggestions and quick actions, with an optional model for messages that
+have no keyword
+"""
+
+import os
+import pickle
+import tempfile
+
+from app.api.v1.endpoints.ai import (
+    AI_RESPONSES, generate_ai_response, generate_quick_actions, generate_suggestions
+)
+from app.services.intents import ChatIntent, IntentClassifier, load_intent_model
+
+
+class FixedModel:
+    """Stands in for a fitted scikit-learn pipeline (predict_proba + classes_)"""
+
+    classes_ = ["safety", "wellness"]
+
+    def __init__(self, probabilities):
+        self.probabilities = probabilities
+
+    def predict_proba(self, messages):
+        return [self.probabilities for _ in messages]
+
+
+def test_keywords_pick_intent_in_priority_order():
+    classifier = IntentClassifier()
+
+    assert classifier.classify("Give me DIRECTIONS home").intent == ChatIntent.ROUTE
+    assert classifier.classify("I got rerouted twice").intent == ChatIntent.ROUTE
+    assert classifier.classify("how is my progress?").intent == ChatIntent.GOAL
+    assert classifier.classify("Is it secure at night").intent == ChatIntent.SAFETY
+    assert classifier.classify("health tips").intent == ChatIntent.WELLNESS
+
+    # Route outranks weather; confidence is its share of the matched keywords
+    mixed = classifier.classify("weather on my route, any directions?")
+    assert mixed.intent == ChatIntent.ROUTE
+    assert mixed.confidence == 2 / 3
+    assert mixed.source == "keywords"
+
+    assert classifier.classify("hello there") == (ChatIntent.GENERAL, 0.0, "default")
+
+
+def test_model_handles_messages_without_keywords():
+    confident = IntentClassifier(model=FixedModel([0.2, 0.8]), model_threshold=0.6)
+    assert confident.classify("feeling tired lately") == (ChatIntent.WELLNESS, 0.8, "model")
+    # Keywords still win over the model
+    assert confident.classify("route to the gym").intent == ChatIntent.ROUTE
+
+    unsure = IntentClassifier(model=FixedModel([0.45, 0.55]), model_threshold=0.6)
+    assert unsure.classify("feeling tired lately").intent == ChatIntent.GENERAL
+
+
+def test_load_intent_model():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "intent.pkl")
+        with open(path, "wb") as model_file:
+            pickle.dump(FixedModel([0.9, 0.1]), model_file)
+        assert load_intent_model(path).classes_ == ["safety", "wellness"]
+        assert load_intent_model(os.path.join(directory, "missing.pkl")) is None
+
+
+def test_helpers_share_one_intent():
+    intent = IntentClassifier().classify("directions to the gym").intent
+
+    assert generate_ai_response(intent, None) == AI_RESPONSES[ChatIntent.ROUTE]
+    assert generate_suggestions(intent)[0] == "Find scenic route to destination"
+    assert generate_quick_actions(intent)[0]["action"] == "find_route"
+    # Intents without their own suggestions fall back to the general ones
+    assert generate_suggestions(ChatIntent.SAFETY) == generate_suggestions(ChatIntent.GENERAL)
+
+
+if __name__ == "__main__":
+    test_keywords_pick_intent_in_priority_order()
+    test_model_handles_messages_without_keywords()
+    test_load_intent_model()
+    test_helpers_share_one_intent()
+    print("✅ Intent classifier tests passed")
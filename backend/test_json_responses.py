@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Fast JSON responses: the app-wide response class and ModelResponse produce
+the same JSON as FastAPI's default path, and a conversation's full history
+is served through ModelResponse in message order
+"""
+
+import json
+
+import pytest
+
+from app.core.auth import create_access_token
+from app.core.responses import FastJSONResponse, ModelResponse
+from app.models import AIConversation, AIMessage, MessageSender, User
+from app.schemas.map import RouteCalculationResponse
+
+EMAIL = "history@example.com"
+
+
+def test_responses_match_stdlib_json():
+    route = RouteCalculationResponse(
+        distance="1.2 km", duration="15 mins", distance_value=1200, duration_value=900,
+        points=[[28.61, 77.2], [28.62, 77.21]], steps=[], polyline="_p~iF~ps|U", summary={"mode": "walking"}
+    )
+    expected = json.loads(json.dumps(route.model_dump(mode="json")))
+
+    assert json.loads(ModelResponse(route).body) == expected
+    assert json.loads(FastJSONResponse(route.model_dump(mode="json")).body) == expected
+    # Non-string keys are stringified, as json.dumps does
+    assert json.loads(FastJSONResponse({8: 3, "label": "ü"}).body) == {"8": 3, "label": "ü"}
+
+
+async def fetch_history(app_db):
+    async with app_db.session_factory() as session:
+        user = User(email=EMAIL, username="history", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        conversation = AIConversation(user_id=user.id, title="Trip")
+        session.add(conversation)
+        await session.flush()
+        for i in range(6):
+            session.add(AIMessage(conversation_id=conversation.id, content=f"Message {i}",
+                                  sender=MessageSender.USER if i % 2 == 0 else MessageSender.AI))
+            await session.flush()
+        await session.commit()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+    response = await app_db.client.get(f"/api/v1/ai/conversations/{conversation.id}", headers=headers)
+    missing = await app_db.client.get("/api/v1/ai/conversations/999", headers=headers)
+    return response, missing
+
+
+@pytest.mark.asyncio
+async def test_conversation_history_is_served_in_order(app_db):
+    response, missing = await fetch_history(app_db)
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/json"
+    history = response.json()
+    assert history["title"] == "Trip"
+    assert [message["content"] for message in history["messages"]] == [f"Message {i}" for i in range(6)]
+    assert missing.status_code == 404
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
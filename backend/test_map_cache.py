@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the map result caches (no network required)
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+from app.services.cache import TTLCache, SQLiteCache, TieredCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_serves_stale_entries_within_window():
+    cache = TTLCache(max_entries=10, ttl=0.01, stale_ttl=60)
+    cache.set("route", {"polyline": "abc"})
+    time.sleep(0.02)
+
+    value, is_stale = cache.get_entry("route")
+    assert value == {"polyline": "abc"}
+    assert is_stale
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_tiered_cache_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "map_cache.db")
+
+        async def write():
+            disk = SQLiteCache(path)
+            await TieredCache("geocode", ttl=60, disk=disk).set("q", [{"name": "Cafe"}])
+            disk.close()
+
+        async def read():
+            disk = SQLiteCache(path)
+            cache = TieredCache("geocode", ttl=60, disk=disk)
+            value = await cache.get("q")
+            disk.close()
+            return value, cache.stats()
+
+        asyncio.run(write())
+        value, stats = asyncio.run(read())
+
+    assert value == [{"name": "Cafe"}]
+    assert stats["disk_hits"] == 1
+
+
+def test_sqlite_cache_migrates_files_without_fresh_until():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "map_cache.db")
+        # Schema written before stale-while-revalidate
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE cache_entries (namespace TEXT NOT NULL, key TEXT NOT NULL, "
+            "value TEXT NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("INSERT INTO cache_entries VALUES ('geocode', 'q', '[1]', ?)", (time.time() + 60,))
+        conn.commit()
+        conn.close()
+
+        disk = SQLiteCache(path)
+        old_value, fresh_until = disk.get("geocode", "q")
+        disk.set("route", "r", {"polyline": "abc"}, ttl=60, stale_ttl=60)
+        new_value = disk.get("route", "r")[0]
+        disk.close()
+
+    assert old_value == [1] and fresh_until > time.time()
+    assert new_value == {"polyline": "abc"}
+
+
+if __name__ == "__main__":
+    test_ttl_cache_evicts_least_recently_used()
+    test_ttl_cache_expires_entries()
+    test_ttl_cache_serves_stale_entries_within_window()
+    test_tiered_cache_survives_restart()
+    test_sqlite_cache_migrates_files_without_fresh_until()
+    print("✅ Cache tests passed")
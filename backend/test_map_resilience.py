@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the map service resilience helpers (no network required)
+"""
+
+import asyncio
+import time
+
+from app.services.resilience import (
+    CallPriority, CircuitBreaker, CircuitOpenError, Priority, RateLimiter, SingleFlight
+)
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flights.stats()["coalesced"] == 4
+
+
+def test_single_flight_shares_errors_and_then_retries():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        results = await asyncio.gather(
+            *(flights.do("key", fetch) for _ in range(3)),
+            return_exceptions=True
+        )
+        # A later call is not served from the failed flight
+        await asyncio.gather(flights.do("key", fetch), return_exceptions=True)
+        return results
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == 2
+
+
+def test_rate_limiter_releases_interactive_before_background():
+    limiter = RateLimiter(rate=50, burst=1)
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire()  # drain the bucket so every call below queues
+        await asyncio.gather(
+            call("background-1", Priority.BACKGROUND),
+            call("background-2", Priority.BACKGROUND),
+            call("interactive", Priority.INTERACTIVE)
+        )
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    assert order == ["interactive", "background-1", "background-2"]
+    assert elapsed >= 3 / 50 * 0.9
+    stats = limiter.stats()
+    assert stats["queued"] == 3
+    assert stats["peak_queue_depth"] == 3
+    assert stats["queue_depth"] == 0
+
+
+def test_interactive_caller_raises_a_background_flight():
+    limiter = RateLimiter(rate=50, burst=1)
+    flights = SingleFlight()
+    order = []
+
+    async def fetch(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+        return name
+
+    async def run():
+        await limiter.acquire()  # drain the bucket so every call below queues
+        other = asyncio.ensure_future(fetch("other-background", Priority.BACKGROUND))
+        refresh = asyncio.ensure_future(
+            flights.do("shared", lambda call_priority: fetch("shared", call_priority), Priority.BACKGROUND)
+        )
+        await asyncio.sleep(0.001)  # both are queued, the refresh last
+        assert limiter.queue_depth == 2
+
+        # Joins the refresh, moving it ahead of "other-background"
+        joined = await flights.do("shared", lambda call_priority: fetch("never", call_priority), Priority.INTERACTIVE)
+        await asyncio.gather(refresh, other)
+        return joined
+
+    joined = asyncio.run(run())
+
+    assert joined == "shared"
+    assert order == ["shared", "other-background"]
+    assert flights.stats()["coalesced"] == 1
+    assert limiter.stats()["queue_depth"] == 0
+
+
+def test_call_priority_only_goes_up():
+    call_priority = CallPriority(Priority.INTERACTIVE)
+    call_priority.raise_to(Priority.BACKGROUND)
+    assert call_priority.priority == Priority.INTERACTIVE
+
+
+def test_circuit_breaker_opens_then_probes_half_open():
+    now = [0.0]
+    breaker = CircuitBreaker("osrm", failure_threshold=2, recovery_timeout=10, clock=lambda: now[0])
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    try:
+        breaker.before_call()
+        assert False, "open circuit should fail fast"
+    except CircuitOpenError as e:
+        assert e.retry_after == 10
+
+    now[0] = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()  # the single probe
+    try:
+        breaker.before_call()
+        assert False, "only one half-open probe is allowed"
+    except CircuitOpenError:
+        pass
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["rejected"] == 2
+
+
+if __name__ == "__main__":
+    test_single_flight_coalesces_concurrent_calls()
+    test_single_flight_shares_errors_and_then_retries()
+    test_rate_limiter_releases_interactive_before_background()
+    test_interactive_caller_raises_a_background_flight()
+    test_call_priority_only_goes_up()
+    test_circuit_breaker_opens_then_probes_half_open()
+    print("✅ Resilience tests passed")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+MapService route calculation against a mocked OSRM (no network required)
+"""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.cache import TieredCache
+from app.services.map_service import MapService
+from app.services.resilience import Priority, RateLimiter
+
+ORIGIN = {"lat": 28.6139, "lng": 77.2090}
+DESTINATION = {"lat": 28.6145, "lng": 77.2095}
+
+
+def osrm_route(distance: float) -> dict:
+    return {
+        "code": "Ok",
+        "routes": [{
+            "geometry": {"coordinates": [[ORIGIN["lng"], ORIGIN["lat"]], [DESTINATION["lng"], DESTINATION["lat"]]]},
+            "legs": [{"distance": distance, "duration": distance, "steps": []}]
+        }]
+    }
+
+
+def mocked_service(handler) -> MapService:
+    """A MapService whose HTTP client is answered by handler(request)"""
+    service = MapService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_stale_route_is_served_while_it_revalidates():
+    distances = iter([100.0, 200.0])
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=osrm_route(next(distances)))
+
+    async def run():
+        service = mocked_service(handler)
+        service.route_cache = TieredCache("route", ttl=0.01, stale_ttl=60)
+        first = await service.calculate_route(ORIGIN, DESTINATION)
+        await asyncio.sleep(0.02)
+
+        # Stale: answered from the cache at once, refreshed in the background
+        stale = await service.calculate_route(ORIGIN, DESTINATION)
+        refreshing = len(service._background_tasks)
+        await asyncio.gather(*service._background_tasks)
+        refreshed = await service.calculate_route(ORIGIN, DESTINATION)
+        await service.shutdown()
+        return first, stale, refreshing, refreshed
+
+    first, stale, refreshing, refreshed = asyncio.run(run())
+
+    assert first["distance_value"] == stale["distance_value"] == 100.0
+    assert refreshing == 1
+    assert refreshed["distance_value"] == 200.0
+    assert len(requests) == 2
+
+
+def test_multi_mode_routes_run_concurrently_and_drop_slow_modes():
+    active = peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        profile = request.url.path.split("/")[3]
+        active += 1
+        peak = max(peak, active)
+        try:
+            if profile == "cycling":
+                await asyncio.sleep(5)  # past MAP_ROUTE_MODE_TIMEOUT
+            await asyncio.sleep(0.05)
+            if profile == "driving":
+                return httpx.Response(200, json={"code": "NoRoute", "routes": []})
+            return httpx.Response(200, json=osrm_route(100.0))
+        finally:
+            active -= 1
+
+    async def run():
+        service = mocked_service(handler)
+        started = time.perf_counter()
+        routes = await service.calculate_routes(ORIGIN, DESTINATION, ["walking", "cycling", "driving"])
+        elapsed = time.perf_counter() - started
+        await service.shutdown()
+        return routes, elapsed
+
+    previous = settings.MAP_ROUTE_MODE_TIMEOUT
+    settings.MAP_ROUTE_MODE_TIMEOUT = 0.2
+    try:
+        (walking, cycling, driving), elapsed = asyncio.run(run())
+    finally:
+        settings.MAP_ROUTE_MODE_TIMEOUT = previous
+
+    assert walking["distance_value"] == 100.0 and not walking["degraded"]
+    assert cycling is None  # timed out
+    assert driving is None  # OSRM found no route
+    assert peak == 3
+    assert elapsed < 1.0
+
+
+def test_interactive_request_raises_a_queued_background_refresh():
+    requested = []
+    elsewhere = {"lat": 28.70, "lng": 77.10}
+
+    async def handler(request):
+        requested.append(request.url.path)
+        return httpx.Response(200, json=osrm_route(100.0))
+
+    async def run():
+        service = mocked_service(handler)
+        limiter = RateLimiter(rate=50, burst=1)
+        service._rate_limiters = {host: limiter for host in service._rate_limiters}
+        await limiter.acquire()  # drain the bucket so every call below queues
+
+        other = asyncio.ensure_future(service.calculate_route(ORIGIN, elsewhere, priority=Priority.BACKGROUND))
+        refresh = asyncio.ensure_future(service.calculate_route(ORIGIN, DESTINATION, priority=Priority.BACKGROUND))
+        await asyncio.sleep(0.001)
+        # Shares the background flight for the same route and lifts it to interactive
+        await service.calculate_route(ORIGIN, DESTINATION)
+        await asyncio.gather(other, refresh)
+        await service.shutdown()
+
+    asyncio.run(run())
+
+    snapped = MapService()._snap_to_grid(DESTINATION)
+    assert len(requested) == 2
+    assert requested[0].endswith(f"{snapped['lng']},{snapped['lat']}")
+
+
+def test_failing_osrm_gets_the_flagged_estimate():
+    responses = {
+        "unavailable": httpx.Response(503),
+        "throttled": httpx.Response(429, headers={"Retry-After": "2"}),
+        "no-segment": httpx.Response(400, json={"code": "NoSegment", "message": "Could not find a matching segment"}),
+        "bad-request": httpx.Response(400, json={"code": "InvalidQuery"})
+    }
+
+    async def run():
+        outcomes = {}
+        for name, response in responses.items():
+            service = mocked_service(lambda request, response=response: response)
+            try:
+                outcomes[name] = await service.calculate_route(ORIGIN, DESTINATION)
+            except HTTPException as e:
+                outcomes[name] = e.status_code
+            await service.shutdown()
+        return outcomes
+
+    outcomes = asyncio.run(run())
+
+    for name in ("unavailable", "throttled"):
+        estimate = outcomes[name]
+        assert estimate["degraded"] and estimate["summary"]["estimated"], name
+        assert estimate["steps"] == [] and len(estimate["points"]) == 2
+    assert outcomes["no-segment"] == 404
+    assert outcomes["bad-request"] == 502
+
+
+def test_failing_nominatim_is_a_503():
+    async def run():
+        service = mocked_service(lambda request: httpx.Response(500))
+        try:
+            await service.search_places("cafe")
+        except HTTPException as e:
+            return e.status_code
+        finally:
+            await service.shutdown()
+
+    assert asyncio.run(run()) == 503
+
+
+if __name__ == "__main__":
+    test_stale_route_is_served_while_it_revalidates()
+    test_multi_mode_routes_run_concurrently_and_drop_slow_modes()
+    test_interactive_request_raises_a_queued_background_refresh()
+    test_failing_osrm_gets_the_flagged_estimate()
+    test_failing_nominatim_is_a_503()
+    print("✅ Map routing tests passed")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Keyset pagination: walking X-Next-Cursor pages returns every row exactly
+once, in order, even when many rows share a timestamp
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from app.core.auth import create_access_token
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_paginate
+from app.models import AIConversation, Goal, GoalCategory, Route, TransportMode, User
+
+EMAIL = "pages@example.com"
+
+
+async def seed(session_factory):
+    async with session_factory() as session:
+        user = User(email=EMAIL, username="pages", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        # Inserted in one statement per table, so most rows share created_at
+        session.add_all([
+            Route(user_id=user.id, title=f"Route {i}", origin="A", destination="B",
+                  transport_mode=TransportMode.WALKING)
+            for i in range(23)
+        ])
+        session.add_all([
+            Goal(user_id=user.id, title=f"Goal {i}", target="daily",
+                 category=GoalCategory.FITNESS if i % 2 else GoalCategory.WELLNESS)
+            for i in range(11)
+        ])
+        session.add_all([AIConversation(user_id=user.id, title=f"Chat {i}") for i in range(9)])
+        await session.flush()
+        # Some conversations have activity, the rest keep a NULL updated_at
+        await session.execute(text(
+            "UPDATE ai_conversations SET updated_at = datetime('2026-01-01', '+' || (id % 3) || ' hours') "
+            "WHERE id % 2 = 0"
+        ))
+        await session.commit()
+
+
+async def walk_pages(app_db):
+    await seed(app_db.session_factory)
+    client = app_db.client
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+    pages = {}
+    for path, limit in (("/api/v1/routes/", 5), ("/api/v1/goals/", 4),
+                        ("/api/v1/goals/categories/fitness", 2), ("/api/v1/ai/conversations", 2)):
+        ids, cursor = [], None
+        while True:
+            params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+            response = await client.get(path, params=params, headers=headers)
+            assert response.status_code == 200, response.text
+            ids.extend(item["id"] for item in response.json())
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+        pages[path] = ids
+
+    bad = await client.get("/api/v1/routes/", params={"cursor": "not-a-cursor"}, headers=headers)
+    pages["bad_cursor_status"] = bad.status_code
+
+    async with app_db.session_factory() as session:
+        pages["expected_routes"] = (await session.execute(
+            select(Route.id).order_by(Route.created_at.desc(), Route.id.desc())
+        )).scalars().all()
+        pages["expected_goals"] = (await session.execute(
+            select(Goal.id).order_by(Goal.created_at.desc(), Goal.id.desc())
+        )).scalars().all()
+        pages["expected_fitness"] = (await session.execute(
+            select(Goal.id).where(Goal.category == GoalCategory.FITNESS)
+            .order_by(Goal.created_at.desc(), Goal.id.desc())
+        )).scalars().all()
+        pages["expected_conversations"] = (await session.execute(
+            select(AIConversation.id)
+            .order_by(AIConversation.updated_at.desc().nulls_last(), AIConversation.id.desc())
+        )).scalars().all()
+    return pages
+
+
+def test_cursor_round_trip():
+    stamp = datetime(2026, 3, 4, 5, 6, 7)
+    assert decode_cursor(encode_cursor(stamp, 42)) == (stamp, 42)
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.asyncio
+async def test_walking_pages_returns_each_row_once_in_order(app_db):
+    pages = await walk_pages(app_db)
+
+    assert pages["/api/v1/routes/"] == pages["expected_routes"]
+    assert pages["/api/v1/goals/"] == pages["expected_goals"]
+    assert pages["/api/v1/goals/categories/fitness"] == pages["expected_fitness"]
+    assert pages["/api/v1/ai/conversations"] == pages["expected_conversations"]
+    assert len(pages["/api/v1/routes/"]) == 23
+    assert pages["bad_cursor_status"] == 400
+
+
+@pytest.mark.asyncio
+async def test_keyset_query_uses_index_without_sorting(app_db):
+    query = keyset_paginate(
+        select(Route).where(Route.user_id == 1), Route.created_at, Route.id,
+        encode_cursor(datetime(2026, 1, 1), 10), 20, "sqlite"
+    )
+    sql = str(query.compile(app_db.engine.sync_engine, compile_kwargs={"literal_binds": True}))
+    async with app_db.engine.connect() as conn:
+        rows = (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+    query_plan = " | ".join(row[-1] for row in rows)
+
+    assert "ix_routes_user_id_created_at" in query_plan, query_plan
+    assert "TEMP B-TREE" not in query_plan, query_plan
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
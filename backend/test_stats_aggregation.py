@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Check that the SQL-aggregated /routes/stats/summary and /goals/stats/summary
+return exactly what the previous load-everything-in-Python versions did
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app.api.v1.endpoints.goals import get_goal_stats
+from app.api.v1.endpoints.routes import get_route_stats
+from app.models import Goal, GoalCategory, Route, RouteStatus, TransportMode, User
+
+
+def legacy_route_stats(routes):
+    """Previous get_route_stats body, applied to the loaded routes"""
+    if not routes:
+        return {
+            "total_routes": 0,
+            "completed_routes": 0,
+            "total_distance": 0.0,
+            "total_time": 0.0,
+            "average_rating": 0.0,
+            "favorite_transport": None
+        }
+
+    rated_routes = [r for r in routes if r.rating is not None]
+    transport_counts = {}
+    for route in routes:
+        transport = route.transport_mode.value
+        transport_counts[transport] = transport_counts.get(transport, 0) + 1
+
+    return {
+        "total_routes": len(routes),
+        "completed_routes": len([r for r in routes if r.status == RouteStatus.COMPLETED]),
+        "total_distance": sum(r.distance or 0 for r in routes),
+        "total_time": sum(r.duration or 0 for r in routes),
+        "average_rating": sum(r.rating for r in rated_routes) / len(rated_routes) if rated_routes else 0.0,
+        "favorite_transport": max(transport_counts.items(), key=lambda x: x[1])[0] if transport_counts else None
+    }
+
+
+def legacy_goal_stats(goals):
+    """Previous get_goal_stats body, applied to the loaded goals"""
+    if not goals:
+        return dict(total_goals=0, active_goals=0, completed_goals=0,
+                    average_progress=0.0, total_streaks=0, longest_streak=0)
+
+    return dict(
+        total_goals=len(goals),
+        active_goals=len([g for g in goals if bool(g.is_active) and not bool(g.is_completed)]),
+        completed_goals=len([g for g in goals if bool(g.is_completed)]),
+        average_progress=sum(float(g.progress) if g.progress is not None else 0.0 for g in goals) / len(goals),
+        total_streaks=sum(int(g.current_streak) if g.current_streak is not None else 0 for g in goals),
+        longest_streak=max(int(g.longest_streak) if g.longest_streak is not None else 0 for g in goals)
+    )
+
+
+def make_routes(user_id):
+    modes = [TransportMode.CYCLING, TransportMode.WALKING, TransportMode.WALKING, TransportMode.CYCLING,
+             TransportMode.DRIVING, TransportMode.TRANSIT]
+    statuses = [RouteStatus.COMPLETED, RouteStatus.PLANNED, RouteStatus.COMPLETED, RouteStatus.CANCELLED]
+    return [
+        Route(
+            user_id=user_id,
+            title=f"Route {i}",
+            origin="A",
+            destination="B",
+            transport_mode=modes[i % len(modes)],
+            status=statuses[i % len(statuses)],
+            distance=None if i % 5 == 0 else i * 0.37,
+            duration=None if i % 7 == 0 else i * 1.9,
+            rating=None if i % 3 == 0 else i % 5 + 1
+        )
+        for i in range(53)
+    ]
+
+
+def make_goals(user_id):
+    return [
+        Goal(
+            user_id=user_id,
+            title=f"Goal {i}",
+            category=GoalCategory.FITNESS,
+            target="30 min daily",
+            progress=None if i % 4 == 0 else i * 3.3,
+            is_active=[True, False, None][i % 3],
+            is_completed=[False, True, None, False][i % 4],
+            current_streak=None if i % 6 == 0 else i,
+            longest_streak=None if i % 5 == 0 else i * 2
+        )
+        for i in range(29)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_route_and_goal_stats_match_python_aggregation(app_db):
+    async with app_db.session_factory() as session:
+        users = [User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x") for i in range(3)]
+        session.add_all(users)
+        await session.flush()
+        # users[2] has no routes or goals
+        session.add_all(make_routes(users[0].id) + make_routes(users[1].id)[:4])
+        session.add_all(make_goals(users[0].id) + make_goals(users[1].id)[:3])
+        await session.commit()
+
+        for user in users:
+            routes = (await session.execute(select(Route).where(Route.user_id == user.id))).scalars().all()
+            goals = (await session.execute(select(Goal).where(Goal.user_id == user.id))).scalars().all()
+            route_stats = await get_route_stats(current_user=user, db=session)
+            goal_stats = await get_goal_stats(current_user=user, db=session)
+
+            assert route_stats == legacy_route_stats(routes)
+            assert goal_stats.model_dump() == legacy_goal_stats(goals)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))